@@ -0,0 +1,387 @@
+"""Throughput and render cost benchmarks with baseline comparison.
+
+Logic cases run headless: 2048 line merges and board moves, Snake ticks at
+several board sizes and snake lengths, Snake autopilot decisions, arena
+ticks with growing snake counts, and Tic Tac Toe / Gomoku winner checks. Render cases open the real game views and report ms per frame and
+canvas items created per frame; they need a display, so on headless
+machines run under ``xvfb-run`` or pass ``--no-render``.
+
+Usage::
+
+    python benchmarks/bench.py --save-baseline        # store benchmarks/baseline.json
+    python benchmarks/bench.py                        # compare against it
+
+Results are written as JSON (``--output``). A case that is more than
+``--threshold`` worse than the baseline is reported as a regression and the
+exit status is 1.
+
+Timings only compare on the same machine, so no baseline is checked in.
+The first run on a machine has to be made with ``--save-baseline``; until
+then nothing is compared.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from collections import deque
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from games.arena_core import ArenaCore
+from games.game2048_core import DIRECTIONS, Game2048Core, merge_line, move_board
+from games.snake_ai import SnakeAutopilot, hamiltonian_cycle
+from games.snake_core import OFFSETS, SnakeCore
+from games.tictactoe_core import TicTacToeCore
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+
+def measure(batch, repeat, prepare=None, min_time=0.2):
+    """Best ops/s over ``repeat`` runs of at least ``min_time`` seconds.
+
+    ``batch`` returns how many operations it did. With ``prepare``, its
+    result is passed to every ``batch`` call and its cost is not timed.
+    """
+    best = 0.0
+    for _ in range(repeat):
+        ops = 0
+        elapsed = 0.0
+        while elapsed < min_time:
+            args = (prepare(),) if prepare else ()
+            start = time.perf_counter()
+            ops += batch(*args)
+            elapsed += time.perf_counter() - start
+        best = max(best, ops / elapsed)
+    return best
+
+
+def result(value, unit, higher_is_better=True):
+    return {'value': value, 'unit': unit, 'higher_is_better': higher_is_better}
+
+
+# Logic benchmarks
+
+def bench_2048(rng, scale, repeat):
+    lines = [[rng.choice((0, 0, 2, 4, 8, 16)) for _ in range(4)] for _ in range(1000)]
+    boards = []
+    core = Game2048Core(seed=rng.getrandbits(32))
+    while len(boards) < 1000:
+        if core.is_terminal():
+            core.reset(rng.getrandbits(32))
+        core.step(rng.choice(DIRECTIONS))
+        boards.append(core.board)
+
+    def merges():
+        for _ in range(scale):
+            for line in lines:
+                merge_line(line)
+        return scale * len(lines)
+
+    def moves():
+        for _ in range(scale):
+            for board in boards:
+                for direction in DIRECTIONS:
+                    move_board(board, direction)
+        return scale * len(boards) * 4
+
+    core = Game2048Core(seed=1)
+    actions = [rng.choice(DIRECTIONS) for _ in range(1000)]
+
+    def steps():
+        for _ in range(scale):
+            for action in actions:
+                if core.is_terminal():
+                    core.reset()
+                core.step(action)
+        return scale * len(actions)
+
+    return {
+        '2048.merge_line': result(measure(merges, repeat), 'lines/s'),
+        '2048.move_board': result(measure(moves, repeat), 'moves/s'),
+        '2048.core_step': result(measure(steps, repeat), 'steps/s'),
+    }
+
+
+def snake_on_cycle(size, length, seed):
+    """A core whose snake lies on the autopilot's tour, with the action for
+    every cell"""
+    cycle = [(cell % size, cell // size) for cell in hamiltonian_cycle(size)]
+    directions = {offset: name for name, offset in OFFSETS.items()}
+    actions = {}
+    for i, cell in enumerate(cycle):
+        following = cycle[(i + 1) % len(cycle)]
+        actions[cell] = directions[(following[0] - cell[0], following[1] - cell[1])]
+
+    core = SnakeCore(size, seed=seed)
+    core.snake = deque(cycle[length - 1::-1])
+    core.direction = actions[cycle[length - 2]] if length > 1 else 'Right'
+    core.food = None
+    # Rebuild the occupancy and free cell index from the new body. Restoring
+    # reseeds the core at random, seed it again so food lands the same way
+    # every run.
+    core.restore(core.snapshot())
+    core.seed_game(seed)
+    core.spawn_food()
+    return core, actions
+
+
+def bench_snake(rng, scale, repeat):
+    results = {}
+    for size, length in ((20, 4), (20, 200), (50, 4), (50, 1000), (100, 5000)):
+        def prepare(size=size, length=length):
+            return snake_on_cycle(size, length, rng.getrandbits(32))
+
+        def ticks(setup, size=size, length=length):
+            core, actions = setup
+            # Stop before the growing snake fills the board
+            limit = min(2000 * scale, size * size - length - 10)
+            for _ in range(limit):
+                core.step(actions[core.snake[0]])
+            return limit
+
+        results[f'snake.tick.{size}x{size}.len{length}'] = result(
+            measure(ticks, repeat, prepare), 'ticks/s')
+
+    # Autopilot decisions alone, the moves themselves are timed above
+    def autopilot_game():
+        core = SnakeCore(100, seed=rng.getrandbits(32))
+        pilot = SnakeAutopilot(100)
+        pilot.take_over(core)
+        return core, pilot
+
+    def autopilot_ticks(setup):
+        core, pilot = setup
+        elapsed = 0.0
+        for _ in range(2000 * scale):
+            start = time.perf_counter()
+            action = pilot.next_action(core)
+            elapsed += time.perf_counter() - start
+            core.step(action)
+        return 2000 * scale, elapsed
+
+    best = 0.0
+    for _ in range(repeat):
+        ticks, elapsed = autopilot_ticks(autopilot_game())
+        best = max(best, ticks / elapsed)
+    results['snake.autopilot.100x100'] = result(best, 'ticks/s')
+
+    # Arena ticks as the number of snakes on one board grows
+    for count in (8, 32, 128):
+        def arena_ticks(count=count):
+            core = ArenaCore(128, count, count, seed=rng.getrandbits(32))
+            for _ in range(500 * scale):
+                if core.done:
+                    core.reset()
+                core.step(None)
+            return 500 * scale
+
+        results[f'arena.tick.128x128.{count}snakes'] = result(
+            measure(arena_ticks, repeat), 'ticks/s')
+    return results
+
+
+def bench_tictactoe(rng, scale, repeat):
+    # Recorded random games, replayed so only the rules are timed
+    games = []
+    core = TicTacToeCore()
+    for _ in range(200):
+        core.reset(0)
+        moves = []
+        while not core.is_terminal():
+            moves.append(rng.choice(core.legal_actions()))
+            core.step(moves[-1])
+        games.append(moves)
+
+    def classic_games():
+        moves = 0
+        for _ in range(scale):
+            for game in games:
+                core.reset(0)
+                for move in game:
+                    core.step(move)
+                moves += len(game)
+        return moves
+
+    # A Gomoku board three quarters full, checked through every cell
+    gomoku = TicTacToeCore(15, 15, 5)
+    cells = [(r, c) for r in range(15) for c in range(15)]
+    rng.shuffle(cells)
+    for r, c in cells[:170]:
+        gomoku.board[r][c] = rng.choice('XO')
+
+    def gomoku_checks():
+        for _ in range(scale):
+            for r, c in cells:
+                gomoku.line_through(r, c, 'X')
+        return scale * len(cells)
+
+    return {
+        'tictactoe.classic_move': result(measure(classic_games, repeat), 'moves/s'),
+        'tictactoe.gomoku_line_check': result(measure(gomoku_checks, repeat), 'checks/s'),
+    }
+
+
+# Render benchmarks, run the Tk views for real
+
+def render_frames(root, game, advance, frames):
+    """ms per frame and canvas items created per frame over ``frames`` frames"""
+    canvas = game.canvas
+    root.update()
+    last_item = max(canvas.find_all(), default=0)
+    created = 0
+    elapsed = 0.0
+    for _ in range(frames):
+        start = time.perf_counter()
+        advance()
+        game.display()
+        root.update_idletasks()
+        elapsed += time.perf_counter() - start
+        items = canvas.find_all()
+        newest = max(items, default=0)
+        created += sum(1 for item in items if item > last_item)
+        last_item = max(last_item, newest)
+    return elapsed * 1000 / frames, created / frames
+
+
+def bench_render(rng, scale, repeat):
+    import tkinter as tk
+    try:
+        root = tk.Tk()
+    except tk.TclError as error:
+        print(f"render benchmarks skipped, no display: {error}", file=sys.stderr)
+        return {}
+    root.withdraw()
+
+    from games.game2048 import Game2048
+    from games.snake import Snake
+
+    results = {}
+    frames = 200 * scale
+
+    window = tk.Toplevel(root)
+    game = Game2048(window)
+    game.play()
+
+    def move_2048():
+        if game.core.is_terminal():
+            game.restart_game(rng.getrandbits(32))
+        game.core.step(rng.choice(DIRECTIONS))
+
+    ms, created = render_frames(root, game, move_2048, frames)
+    results['render.2048.frame'] = result(ms, 'ms/frame', False)
+    results['render.2048.items_created'] = result(created, 'items/frame', False)
+    game.close()
+
+    for size, length in ((20, 4), (20, 200), (50, 1000)):
+        window = tk.Toplevel(root)
+        game = Snake(window, board_size=size)
+        game.play()
+        game.stop_loop()
+        core, actions = snake_on_cycle(size, length, rng.getrandbits(32))
+        # Swap the long snake into the view and redraw it from scratch
+        game.core.restore(core.snapshot())
+        game.canvas.delete('snake')
+        game.snake_items.clear()
+        game.pending_moves = 0
+        game.display()
+
+        def tick(game=game):
+            game.core.step(actions[game.core.snake[0]])
+
+        ms, created = render_frames(root, game, tick, min(frames, size * size - length - 10))
+        results[f'render.snake.{size}x{size}.len{length}.frame'] = result(ms, 'ms/frame', False)
+        results[f'render.snake.{size}x{size}.len{length}.items_created'] = result(
+            created, 'items/frame', False)
+        game.close()
+
+    root.destroy()
+    return results
+
+
+# Baseline comparison
+
+def compare(results, baseline, threshold):
+    """Return report lines and the names of cases that regressed"""
+    lines = []
+    regressions = []
+    for name, current in sorted(results.items()):
+        previous = baseline.get(name)
+        value = current['value']
+        if previous is None or not previous['value']:
+            lines.append(f"{name:<45} {value:14.3f} {current['unit']:<12}   (new)")
+            continue
+        change = value / previous['value'] - 1
+        worse = -change if current['higher_is_better'] else change
+        flag = ''
+        if worse > threshold:
+            flag = '  REGRESSION'
+            regressions.append(name)
+        elif -worse > threshold:
+            flag = '  improved'
+        lines.append(f"{name:<45} {value:14.3f} {current['unit']:<12} {change:+7.1%}{flag}")
+    return lines, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--output', help="write results JSON here")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="store the results as the new baseline")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="relative slowdown reported as a regression")
+    parser.add_argument('--scale', type=int, default=1, help="work per measurement")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--no-render', action='store_true')
+    parser.add_argument('--seed', type=int, default=2048)
+    args = parser.parse_args()
+
+    # Keep the views' scores and saves out of the real database
+    os.environ['GAMECENTER_DB'] = os.path.join(tempfile.mkdtemp(), 'bench.db')
+
+    rng = random.Random(args.seed)
+    results = {}
+    for bench in (bench_2048, bench_snake, bench_tictactoe):
+        results.update(bench(rng, args.scale, args.repeat))
+    if not args.no_render:
+        results.update(bench_render(rng, args.scale, args.repeat))
+
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+
+    status = 0
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+        lines, regressions = compare(results, baseline, args.threshold)
+        print(f"compared with {args.baseline}")
+        print("\n".join(lines))
+        if regressions:
+            print(f"FAILED: {len(regressions)} regressions")
+            status = 1
+    else:
+        lines, _ = compare(results, {}, args.threshold)
+        print("\n".join(lines))
+        if not args.save_baseline:
+            print(f"no baseline at {args.baseline}, nothing compared; "
+                  f"run once with --save-baseline to store one")
+
+    for path in filter(None, (args.output, args.baseline if args.save_baseline else None)):
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"results written to {path}")
+    return status
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,237 @@
+"""Load test for spectator mode: one publisher, hundreds of local viewers.
+
+Starts ``python -m games.broadcast_server`` in a child process, plays
+Snake (autopilot) or 2048 (random moves) headless at ``--rate`` moves per
+second and publishes it the way a game window does, while ``--viewers``
+connections from this process watch. A ``--slow`` share of the viewers
+take ``--slow-delay`` seconds per message, slower than the game moves, so
+the server has to drop frames for them.
+
+Reports delivery latency for the other viewers, how many keyframes slow
+viewers needed to resync, and checks that every viewer ends on the
+publisher's final state. Exits 1 if any viewer does not.
+
+Usage: python benchmarks/broadcast_load.py [--viewers 300] [--game snake]
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from games import net_protocol as proto
+from games.broadcast import MIRRORS
+from games.game2048_core import DIRECTIONS, GridGame2048Core
+from games.snake_ai import SnakeAutopilot
+from games.snake_core import SnakeCore
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+async def start_server(port):
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'games.broadcast_server', '--port', str(port)],
+        cwd=ROOT, stdout=subprocess.DEVNULL)
+    for _ in range(100):
+        try:
+            _, writer = await asyncio.open_connection('127.0.0.1', port)
+        except OSError:
+            await asyncio.sleep(0.05)
+            continue
+        writer.close()
+        return server
+    server.kill()
+    raise RuntimeError("broadcast server did not start")
+
+
+def raise_file_limit(needed):
+    try:
+        import resource
+    except ImportError:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < needed:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (min(needed, hard), hard))
+
+
+class Player:
+    """Headless game producing one move per ``step``"""
+
+    def __init__(self, game, seed):
+        self.rng = random.Random(seed)
+        if game == 'snake':
+            self.core = SnakeCore(20, seed=seed)
+            self.pilot = SnakeAutopilot(20)
+            self.pilot.take_over(self.core)
+        else:
+            self.core = GridGame2048Core(8, seed=seed)
+            self.pilot = None
+
+    def step(self):
+        core = self.core
+        if core.is_terminal():
+            core.reset()
+            if self.pilot is not None:
+                self.pilot.take_over(core)
+        elif self.pilot is not None:
+            core.step(self.pilot.next_action(core))
+        else:
+            core.step(self.rng.choice(DIRECTIONS))
+
+
+class LoadViewer:
+    def __init__(self, slow_delay):
+        self.slow_delay = slow_delay
+        self.mirror = None
+        self.messages = 0
+        self.keyframes = 0
+        self.latencies = []
+
+    async def run(self, port, channel, sent_at):
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(proto.encode(proto.WATCH, channel))
+        buffer = bytearray()
+        try:
+            while True:
+                data = await reader.read(1 << 16)
+                if not data:
+                    break
+                now = time.perf_counter()
+                buffer += data
+                messages = proto.take_messages(buffer)
+                for kind, fields in messages:
+                    if kind == proto.STATE:
+                        game_id, seq, values = fields
+                        self.mirror = MIRRORS[game_id]()
+                        self.mirror.on_state(seq, values)
+                        self.keyframes += 1
+                    else:
+                        seq = fields[0]
+                        self.mirror.on_delta(*fields)
+                    if not self.slow_delay and seq in sent_at:
+                        self.latencies.append(now - sent_at[seq])
+                self.messages += len(messages)
+                if self.slow_delay:
+                    await asyncio.sleep(self.slow_delay * len(messages))
+                writer.write(proto.encode(proto.ACK, len(messages)))
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+async def run(args):
+    port = free_port()
+    server = await start_server(port)
+    try:
+        return await load(args, port)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+async def load(args, port):
+    channel = 'load'
+
+    player = Player(args.game, args.seed)
+    mirror = MIRRORS[player.core.game_id]()
+    sent_at = {}
+
+    _, publisher = await asyncio.open_connection('127.0.0.1', port)
+    publisher.write(proto.encode(proto.PUBLISH, channel))
+    publisher.write(mirror.publish(player.core, 'reset'))
+
+    def on_core_event(core, event):
+        message = mirror.publish(core, event)
+        if message is not None:
+            sent_at[mirror.seq] = time.perf_counter()
+            publisher.write(message)
+
+    player.core.subscribe(on_core_event)
+
+    slow_count = int(args.viewers * args.slow)
+    viewers = [LoadViewer(args.slow_delay if i < slow_count else 0)
+               for i in range(args.viewers)]
+    tasks = [asyncio.ensure_future(v.run(port, channel, sent_at)) for v in viewers]
+    # Everyone has joined once they got the first keyframe
+    while not all(v.mirror is not None for v in viewers):
+        await asyncio.sleep(0.01)
+
+    start = time.perf_counter()
+    interval = 1 / args.rate
+    moves = 0
+    while time.perf_counter() - start < args.seconds:
+        player.step()
+        moves += 1
+        await publisher.drain()
+        # Sleep until the next move is due, catching up if behind
+        delay = start + moves * interval - time.perf_counter()
+        await asyncio.sleep(max(0, delay))
+    elapsed = time.perf_counter() - start
+
+    # Let slow viewers drain and pick up the final keyframe
+    final = mirror.seq
+    deadline = time.perf_counter() + args.settle
+    while time.perf_counter() < deadline:
+        if all(v.mirror is not None and v.mirror.seq == final for v in viewers):
+            break
+        await asyncio.sleep(0.05)
+
+    expected = mirror.keyframe()
+    in_sync = sum(v.mirror is not None and v.mirror.seq == final
+                  and v.mirror.keyframe() == expected for v in viewers)
+
+    publisher.close()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    latencies = sorted(lat for v in viewers[slow_count:] for lat in v.latencies)
+    delivered = sum(v.messages for v in viewers)
+    print(f"{args.game}: {moves} moves in {elapsed:.1f}s to {args.viewers} viewers "
+          f"({slow_count} slow)")
+    print(f"messages delivered: {delivered} ({delivered / elapsed:.0f}/s)")
+    if latencies:
+        print("fast viewer latency ms: p50 %.2f  p99 %.2f  max %.2f" % (
+            statistics.median(latencies) * 1000,
+            latencies[int(len(latencies) * 0.99)] * 1000,
+            latencies[-1] * 1000))
+    if slow_count:
+        slow = viewers[:slow_count]
+        print(f"slow viewers: {statistics.mean(v.messages for v in slow):.0f} messages and "
+              f"{statistics.mean(v.keyframes for v in slow):.1f} keyframes each")
+    print(f"viewers on the final state: {in_sync}/{args.viewers}")
+    return 0 if in_sync == args.viewers else 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--viewers', type=int, default=300)
+    parser.add_argument('--game', choices=('snake', '2048'), default='snake')
+    parser.add_argument('--rate', type=float, default=60, help="moves per second")
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--slow', type=float, default=0.1,
+                        help="share of viewers that read slowly")
+    parser.add_argument('--slow-delay', type=float, default=0.05,
+                        help="seconds a slow viewer spends per message")
+    parser.add_argument('--settle', type=float, default=10,
+                        help="seconds to wait for viewers to catch up at the end")
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args(argv)
+    raise_file_limit(2 * args.viewers + 64)
+    return asyncio.run(run(args))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
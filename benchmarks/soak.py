@@ -0,0 +1,104 @@
+"""Open and close every game thousands of times and check nothing piles up.
+
+Compares Python memory, pending ``after`` callbacks, Tcl commands, widgets
+and per-game canvas item counts against a baseline taken after a warm-up,
+and exits non-zero if any of them keeps growing.
+
+Only the local games are cycled, the online ones and the spectator would
+connect to servers that are not running. Scores and saves go to a
+temporary database.
+
+Usage: python benchmarks/soak.py [--cycles 2000]
+Needs a display, on headless machines run it under ``xvfb-run``.
+"""
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import GameCenter
+
+
+def count_widgets(widget):
+    return 1 + sum(count_widgets(child) for child in widget.winfo_children())
+
+
+def snapshot(center):
+    gc.collect()
+    root = center.root
+    return {
+        'memory_kb': tracemalloc.get_traced_memory()[0] / 1024,
+        'after_callbacks': len(root.tk.splitlist(root.tk.call('after', 'info'))),
+        'tcl_commands': len(root.tk.splitlist(root.tk.call('info', 'commands'))),
+        'widgets': count_widgets(root),
+    }
+
+
+def run_cycle(center, item_counts):
+    for name, entry in center.games.items():
+        if entry.network:
+            continue
+        game = center.start_game(entry)
+        center.root.update()
+        canvas = getattr(game, 'canvas', None)
+        if canvas is not None:
+            item_counts.setdefault(name, set()).add(len(canvas.find_all()))
+        center.close_game(name)
+        center.root.update()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--cycles', type=int, default=2000)
+    parser.add_argument('--warmup', type=int, default=50)
+    parser.add_argument('--max-memory-growth-kb', type=float, default=512)
+    args = parser.parse_args()
+
+    # Keep the games' scores and saves out of the real database, and
+    # don't stream or record thousands of sessions
+    os.environ['GAMECENTER_DB'] = os.path.join(tempfile.mkdtemp(), 'soak.db')
+    os.environ.pop('GAMECENTER_BROADCAST', None)
+    os.environ.pop('GAMECENTER_REPLAY_DIR', None)
+
+    center = GameCenter()
+    center.root.update()
+    tracemalloc.start()
+
+    item_counts = {}
+    for _ in range(args.warmup):
+        run_cycle(center, item_counts)
+    baseline = snapshot(center)
+
+    for cycle in range(args.cycles):
+        run_cycle(center, item_counts)
+        if (cycle + 1) % 100 == 0:
+            print(f"cycle {cycle + 1}: {snapshot(center)}")
+    final = snapshot(center)
+    center.quit()
+
+    failures = []
+    growth = final['memory_kb'] - baseline['memory_kb']
+    if growth > args.max_memory_growth_kb:
+        failures.append(f"memory grew by {growth:.0f} KB")
+    for key in ('after_callbacks', 'tcl_commands', 'widgets'):
+        if final[key] > baseline[key]:
+            failures.append(f"{key} grew from {baseline[key]} to {final[key]}")
+    for name, counts in item_counts.items():
+        if len(counts) > 1:
+            failures.append(f"{name} canvas item count varied: {sorted(counts)}")
+
+    print(f"baseline: {baseline}")
+    print(f"final:    {final}")
+    if failures:
+        print("FAILED: " + "; ".join(failures))
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""Compact binary logs of a game session.
+
+A log holds everything needed to re-simulate a session: the game id, the
+core's constructor options, the RNG seed and the actions with the tick they
+were applied on. Layout, all integers as unsigned LEB128 varints::
+
+    b'GCRP' version
+    len(game id) game id (utf-8)
+    len(options) option...
+    seed
+    (tick delta, action code + 1)...   one pair per action
+    (tick delta, 0)                     end marker, gives the total ticks
+
+The tick delta counts ticks since the one after the previous action, so a
+game that acts every tick stores two bytes per action.
+"""
+MAGIC = b'GCRP'
+VERSION = 1
+
+
+def write_varint(buffer, value):
+    if value < 0:
+        raise ValueError("varints are unsigned")
+    while value >= 0x80:
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def read_varint(data, pos):
+    """Return ``(value, new_pos)`` for the varint starting at ``pos``"""
+    value = 0
+    shift = 0
+    while True:
+        if pos >= len(data):
+            raise ValueError("truncated action log")
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, pos
+        shift += 7
+
+
+class ActionLog:
+    """Recorder a core appends to on every step"""
+
+    def __init__(self, game_id, options, seed):
+        self.game_id = game_id
+        self.options = tuple(options)
+        self.seed = seed
+        self.body = bytearray()
+        self.ticks = 0
+        self.cursor = 0
+
+    def append(self, code):
+        """Record one tick, ``code`` is None when no action was taken"""
+        if code is not None:
+            write_varint(self.body, self.ticks - self.cursor)
+            write_varint(self.body, code + 1)
+            self.cursor = self.ticks + 1
+        self.ticks += 1
+
+    def to_bytes(self):
+        data = bytearray(MAGIC)
+        data.append(VERSION)
+        name = self.game_id.encode('utf-8')
+        write_varint(data, len(name))
+        data += name
+        write_varint(data, len(self.options))
+        for option in self.options:
+            write_varint(data, option)
+        write_varint(data, self.seed)
+        data += self.body
+        write_varint(data, self.ticks - self.cursor)
+        write_varint(data, 0)
+        return bytes(data)
+
+
+class Session:
+    """A parsed action log"""
+
+    def __init__(self, game_id, options, seed, actions, ticks):
+        self.game_id = game_id
+        self.options = options
+        self.seed = seed
+        # (tick, action code) pairs in tick order
+        self.actions = actions
+        self.ticks = ticks
+
+    @classmethod
+    def from_bytes(cls, data):
+        if data[:4] != MAGIC:
+            raise ValueError("not an action log")
+        if data[4] != VERSION:
+            raise ValueError(f"unsupported action log version {data[4]}")
+        pos = 5
+        length, pos = read_varint(data, pos)
+        game_id = bytes(data[pos:pos + length]).decode('utf-8')
+        pos += length
+        count, pos = read_varint(data, pos)
+        options = []
+        for _ in range(count):
+            option, pos = read_varint(data, pos)
+            options.append(option)
+        seed, pos = read_varint(data, pos)
+
+        actions = []
+        cursor = 0
+        while True:
+            delta, pos = read_varint(data, pos)
+            code, pos = read_varint(data, pos)
+            tick = cursor + delta
+            if code == 0:
+                return cls(game_id, tuple(options), seed, actions, tick)
+            actions.append((tick, code - 1))
+            cursor = tick + 1
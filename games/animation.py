@@ -0,0 +1,75 @@
+"""Time-based canvas animations.
+
+An ``Animator`` runs one animation at a time on a game's ``schedule``.
+Progress comes from the clock rather than from a frame count, so when the
+Tk loop falls behind, frames are dropped and the animation still ends on
+time. Starting a new animation fast-forwards the one in flight.
+"""
+import time
+
+
+def ease_out(t):
+    """Cubic ease-out, fast start and soft landing"""
+    return 1 - (1 - t) ** 3
+
+
+class Animator:
+    def __init__(self, game, fps=60):
+        self.game = game
+        self.frame_interval = 1 / fps
+        self.update = None
+        self.on_finish = None
+        self.start_time = None
+        self.duration = None
+        self.frame_index = 0
+        self.after_id = None
+        # Frames skipped because the loop woke up late, for profiling
+        self.dropped_frames = 0
+
+    @property
+    def active(self):
+        return self.update is not None
+
+    def start(self, duration_ms, update, on_finish=None):
+        """Call ``update(progress)`` every frame for ``duration_ms``.
+
+        ``progress`` runs from 0 to 1 with easing applied. ``on_finish`` is
+        called once the animation is done or fast-forwarded.
+        """
+        self.finish()
+        self.update = update
+        self.on_finish = on_finish
+        self.duration = duration_ms / 1000
+        self.start_time = time.perf_counter()
+        self.frame_index = 0
+        update(0.0)
+        self.after_id = self.game.schedule(round(self.frame_interval * 1000), self.frame)
+
+    def frame(self):
+        self.after_id = None
+        now = time.perf_counter()
+        elapsed = now - self.start_time
+        if elapsed >= self.duration:
+            self.finish()
+            return
+        self.update(ease_out(elapsed / self.duration))
+
+        # Sleep until the next frame boundary, frames already missed are skipped
+        index = int(elapsed / self.frame_interval)
+        self.dropped_frames += max(0, index - self.frame_index - 1)
+        self.frame_index = index
+        delay = (index + 1) * self.frame_interval - (time.perf_counter() - self.start_time)
+        self.after_id = self.game.schedule(max(1, round(delay * 1000)), self.frame)
+
+    def finish(self):
+        """Jump the running animation to its end state"""
+        if self.update is None:
+            return
+        if self.after_id is not None:
+            self.game.cancel(self.after_id)
+            self.after_id = None
+        update, on_finish = self.update, self.on_finish
+        self.update = self.on_finish = None
+        update(1.0)
+        if on_finish:
+            on_finish()
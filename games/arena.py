@@ -0,0 +1,218 @@
+from .arena_core import ArenaCore, EMPTY, FOOD
+from .base_game import BaseGame
+from . import storage
+from .snake_core import OPPOSITES
+from .sprites import SpriteCache
+import colorsys
+import tkinter as tk
+
+class Arena(BaseGame):
+    """Snake against a crowd of computer snakes on one large board.
+
+    Only cells the core reports as changed are redrawn. Each occupied cell
+    is one image item, and items of cells that empty out are hidden and
+    reused, so a frame costs the same however many snakes are on screen.
+    """
+
+    def __init__(self, master, board_size=64, snake_count=24, food_count=32, players=1):
+        super().__init__(master)
+        self.master.title("Snake Arena")
+        self.board_size = board_size
+        self.cell_size = max(2, min(20, 640 // board_size))
+        # Cell size at the opening window size, see on_layout()
+        self.base_cell_size = self.cell_size
+        self.canvas_size = self.board_size * self.cell_size
+        self.speed = 100
+
+        self.colors = {
+            'bg': '#1E1E2E',
+            'snake_head': '#50FA7B',
+            'snake_body': '#43B466',
+            'food': '#FF5555',
+            'text': '#F8F8F2',
+            'button': '#2A2A3C',
+        }
+
+        screen_width = self.master.winfo_screenwidth()
+        screen_height = self.master.winfo_screenheight()
+        window_width = self.canvas_size + 40
+        window_height = self.canvas_size + 150
+        x = (screen_width - window_width) // 2
+        y = (screen_height - window_height) // 2
+        self.master.geometry(f'{window_width}x{window_height}+{x}+{y}')
+        self.master.minsize(window_width, window_height)
+        self.master.configure(bg=self.colors['bg'])
+        self.frame.configure(bg=self.colors['bg'])
+
+        self.core = ArenaCore(board_size, snake_count, food_count, players)
+        # The snake the arrow keys steer
+        self.seat = 0
+        self.core.subscribe(self.on_core_event)
+        self.best_score = storage.get_store().best_score(self.core.score_key)
+        self.game_over_flag = False
+        self.restart_button = None
+        self.status = None
+
+        # Image item per occupied cell, plus hidden items ready for reuse
+        self.cell_items = {}
+        self.item_pool = []
+        self.sprites = SpriteCache(self.master)
+
+        self.bind_key('<Left>', lambda e: self.change_direction('Left'))
+        self.bind_key('<Right>', lambda e: self.change_direction('Right'))
+        self.bind_key('<Up>', lambda e: self.change_direction('Up'))
+        self.bind_key('<Down>', lambda e: self.change_direction('Down'))
+
+    def play(self):
+        self.game_frame = tk.Frame(self.frame, bg=self.colors['bg'])
+        self.game_frame.place(relx=0.5, rely=0.5, anchor='center')
+
+        self.canvas = tk.Canvas(
+            self.game_frame,
+            width=self.canvas_size,
+            height=self.canvas_size,
+            bg=self.colors['bg'],
+            highlightthickness=1,
+            highlightbackground=self.colors['button']
+        )
+        self.canvas.pack(padx=20, pady=20)
+
+        self.score_label = tk.Label(
+            self.game_frame,
+            text="",
+            font=('Helvetica', 16, 'bold'),
+            fg=self.colors['text'],
+            bg=self.colors['bg']
+        )
+        self.score_label.pack()
+
+        self.enable_layout(self.canvas)
+        self.display()
+        self.start_loop(self.speed)
+
+    def change_direction(self, new_direction):
+        self.queue_input(new_direction)
+
+    def accept_input(self, direction, previous):
+        current = previous or self.core.snakes[self.seat].direction
+        return direction != current and direction != OPPOSITES[current]
+
+    def tick(self):
+        if not self.game_over_flag:
+            self.core.step(self.next_input())
+
+    def on_core_event(self, core, event):
+        if event == 'over':
+            self.display()
+            self.game_over()
+
+    def snake_color(self, index, head):
+        if index == self.seat:
+            return self.colors['snake_head'] if head else self.colors['snake_body']
+        # Computer snakes get evenly spread hues away from the player's green
+        hue = (0.45 + 0.8 * index / self.core.snake_count) % 1
+        return '#%02x%02x%02x' % tuple(
+            round(c * 255) for c in colorsys.hls_to_rgb(hue, 0.7 if head else 0.55, 0.6))
+
+    def cell_image(self, value, cell):
+        self.sprites.set_size(self.cell_size)
+        size = round(self.cell_size)
+        if value == FOOD:
+            return self.sprites.disc(size, self.colors['food'])
+        snake = self.core.snakes[value - 1]
+        head = snake.body[0] == cell
+        return self.sprites.rounded_rect(size, size, size // 4,
+                                         self.snake_color(snake.index, head))
+
+    def on_layout(self, scale):
+        # Items are already in place, only their images change size
+        self.cell_size = self.base_cell_size * scale
+        self.canvas_size = self.board_size * self.cell_size
+        grid = self.core.grid
+        for cell, item in self.cell_items.items():
+            if grid[cell] != EMPTY:
+                # Emptied cells are hidden by the next display()
+                self.canvas.itemconfig(item, image=self.cell_image(grid[cell], cell))
+
+    def display(self):
+        grid = self.core.grid
+        size = self.board_size
+        for cell in self.core.take_changes():
+            value = grid[cell]
+            item = self.cell_items.get(cell)
+            if value == EMPTY:
+                if item is not None:
+                    self.canvas.itemconfig(item, state='hidden')
+                    self.item_pool.append(self.cell_items.pop(cell))
+                continue
+            image = self.cell_image(value, cell)
+            if item is None:
+                x = cell % size * self.cell_size
+                y = cell // size * self.cell_size
+                if self.item_pool:
+                    item = self.item_pool.pop()
+                    self.canvas.coords(item, x, y)
+                    self.canvas.itemconfig(item, image=image, state='normal')
+                else:
+                    item = self.canvas.create_image(x, y, anchor='nw', image=image,
+                                                    tags='cells')
+                self.cell_items[cell] = item
+            else:
+                self.canvas.itemconfig(item, image=image)
+
+        score = self.core.snakes[self.seat].score
+        status = f"Score: {score}   Snakes: {self.core.alive_count}"
+        if status != self.status:
+            self.status = status
+            self.score_label.config(text=status)
+
+    def game_over(self):
+        self.game_over_flag = True
+        self.stop_loop()
+        self.save_replay()
+        self.record_score()
+
+        text = self.game_over_text()
+        self.canvas.create_rectangle(
+            0, 0, self.canvas_size, self.canvas_size,
+            fill='black', stipple='gray50', tags='overlay'
+        )
+        self.canvas.create_text(
+            self.canvas_size // 2, self.canvas_size // 2 - 20,
+            text=text, fill=self.colors['text'],
+            font=('Helvetica', 24, 'bold'),
+            justify=tk.CENTER, tags='overlay'
+        )
+
+        self.restart_button = tk.Button(
+            self.game_frame,
+            text="Restart Game",
+            font=('Helvetica', 12, 'bold'),
+            fg=self.colors['text'],
+            bg=self.colors['button'],
+            activebackground=self.colors['snake_head'],
+            activeforeground=self.colors['text'],
+            bd=0,
+            padx=20,
+            pady=10,
+            cursor='hand2',
+            command=self.restart
+        )
+        self.restart_button.pack(pady=10)
+
+    def game_over_text(self):
+        return f"Game Over!\nScore: {self.core.score}\nBest: {self.best_score}"
+
+    def restart(self, seed=None):
+        self.core.reset(seed)
+        self.game_over_flag = False
+        self.clear_input()
+        if self.restart_button:
+            self.restart_button.destroy()
+            self.restart_button = None
+        self.canvas.delete('overlay')
+        self.display()
+        self.start_loop(self.speed)
+
+    def is_game_over(self):
+        return self.game_over_flag
@@ -0,0 +1,424 @@
+from .action_log import read_varint, write_varint
+from .base_core import BaseCore
+from .snake_core import DIRECTIONS, OFFSETS, OPPOSITES, FOOD_REWARD
+from collections import deque
+import itertools
+
+# Values in the occupancy grid, snake n is stored as n + 1
+EMPTY = 0
+FOOD = 255
+MAX_SNAKES = 254
+
+START_LENGTH = 3
+
+
+class ArenaSnake:
+    def __init__(self, index):
+        self.index = index
+        self.value = index + 1
+        self.body = deque()
+        self.direction = 'Right'
+        self.alive = False
+        self.score = 0
+        # Tick at which a dead computer snake comes back
+        self.respawn_at = None
+        # Food cell a computer snake is heading for
+        self.target = None
+
+
+class ArenaCore(BaseCore):
+    """Headless rules for many snakes sharing one board.
+
+    The first ``players`` snakes are steered by the actions passed to
+    ``step``, the others by a cheap greedy rule drawn from the core's RNG,
+    so a session replays from the players' actions alone. With one player
+    an action is a direction, with more it is a tuple holding a direction
+    or None per player. Every cell of the board is one byte of ``grid``:
+    EMPTY, FOOD or the value of the snake on it.
+
+    All snakes move in one pass per tick. Tails leave first, then every
+    head is checked against the grid and against the other heads: heads
+    meeting on a cell all die, and so does a head entering a wall or a
+    body. Dead computer snakes respawn after ``respawn_ticks``, the game
+    ends when a player dies. ``winner`` is then the one player still alive,
+    if there is exactly one.
+
+    Cells written since the view last looked are collected in ``changed``.
+    Events sent to listeners: ``reset``, ``move`` after every tick, ``eat``
+    when the player ate and ``over`` when the game ends.
+    """
+
+    game_id = 'arena'
+    respawn_ticks = 30
+
+    def __init__(self, board_size=64, snake_count=24, food_count=32, players=1,
+                 seed=None):
+        super().__init__()
+        if not 1 <= snake_count <= MAX_SNAKES:
+            raise ValueError(f"an arena holds 1 to {MAX_SNAKES} snakes")
+        if not 1 <= players <= snake_count:
+            raise ValueError("every player needs a snake")
+        self.board_size = board_size
+        self.snake_count = snake_count
+        self.food_count = food_count
+        self.players = players
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        self.seed_game(seed)
+        cells = self.board_size * self.board_size
+        self.grid = bytearray(cells)
+        self.food = []
+        self.ticks = 0
+        self.done = False
+        self.winner = None
+        # A reset redraws the whole board
+        self.changed = set(range(cells))
+
+        self.snakes = [ArenaSnake(i) for i in range(self.snake_count)]
+        for snake in self.snakes:
+            self.spawn_snake(snake)
+        self.spawn_food()
+        if self.listeners:
+            self.notify('reset')
+
+    @property
+    def player(self):
+        return self.snakes[0]
+
+    @property
+    def score(self):
+        return self.player.score
+
+    @property
+    def alive_count(self):
+        return sum(snake.alive for snake in self.snakes)
+
+    def random_empty_cell(self):
+        """A random empty cell, or None when the board is full"""
+        grid = self.grid
+        cells = len(grid)
+        for _ in range(8):
+            cell = self.random.randrange(cells)
+            if grid[cell] == EMPTY:
+                return cell
+        # Crowded board, scan on from a random cell instead
+        start = self.random.randrange(cells)
+        cell = grid.find(EMPTY, start)
+        if cell < 0:
+            cell = grid.find(EMPTY, 0, start)
+        return cell if cell >= 0 else None
+
+    def spawn_snake(self, snake):
+        """Place ``snake`` on a straight run of empty cells if there is one"""
+        size = self.board_size
+        for _ in range(20):
+            head = self.random_empty_cell()
+            if head is None:
+                return False
+            direction = self.random.choice(DIRECTIONS)
+            dx, dy = OFFSETS[direction]
+            x, y = head % size, head // size
+            # The body trails behind the head, with as many free cells ahead
+            # so a fresh snake never starts facing a wall
+            run = []
+            for i in range(-START_LENGTH, START_LENGTH):
+                bx, by = x - i * dx, y - i * dy
+                if not (0 <= bx < size and 0 <= by < size) or self.grid[by * size + bx]:
+                    break
+                run.append(by * size + bx)
+            if len(run) == 2 * START_LENGTH:
+                body = run[START_LENGTH:]
+                break
+        else:
+            return False
+
+        snake.body = deque(body)
+        snake.direction = direction
+        snake.alive = True
+        snake.score = 0
+        snake.respawn_at = None
+        snake.target = None
+        for cell in body:
+            self.grid[cell] = snake.value
+            self.changed.add(cell)
+        return True
+
+    def spawn_food(self):
+        while len(self.food) < self.food_count:
+            cell = self.random_empty_cell()
+            if cell is None:
+                return
+            self.grid[cell] = FOOD
+            self.food.append(cell)
+            self.changed.add(cell)
+
+    def next_cell(self, snake):
+        """Cell the head moves into, -1 when that is off the board"""
+        size = self.board_size
+        head = snake.body[0]
+        dx, dy = OFFSETS[snake.direction]
+        x, y = head % size + dx, head // size + dy
+        if 0 <= x < size and 0 <= y < size:
+            return y * size + x
+        return -1
+
+    def steer(self, snake):
+        """Turn a computer snake towards its food, avoiding occupied cells"""
+        grid = self.grid
+        size = self.board_size
+        if snake.target is None or grid[snake.target] != FOOD:
+            snake.target = self.random.choice(self.food) if self.food else None
+        head = snake.body[0]
+        x, y = head % size, head // size
+        best = None
+        for direction in DIRECTIONS:
+            if direction == OPPOSITES[snake.direction]:
+                continue
+            dx, dy = OFFSETS[direction]
+            nx, ny = x + dx, y + dy
+            if not (0 <= nx < size and 0 <= ny < size):
+                continue
+            value = grid[ny * size + nx]
+            if value != EMPTY and value != FOOD:
+                continue
+            if value == FOOD:
+                cost = -1
+            elif snake.target is None:
+                cost = 0
+            else:
+                cost = abs(nx - snake.target % size) + abs(ny - snake.target // size)
+            # Random tie breaks keep the snakes from moving in lockstep
+            cost += self.random.random()
+            if best is None or cost < best[0]:
+                best = (cost, direction)
+        if best is not None:
+            snake.direction = best[1]
+
+    def step(self, action=None):
+        """Turn the players towards ``action`` (None keeps going) and move
+        every snake one cell"""
+        if self.done:
+            return 0, True
+        if self.players > 1 and action is not None and not any(action):
+            action = None
+        self.record(action)
+        self.ticks += 1
+        grid = self.grid
+        changed = self.changed
+        player = self.player
+        actions = (action,) if self.players == 1 else action or ()
+        for snake, turn in zip(self.snakes, actions):
+            if turn is not None and OPPOSITES[turn] != snake.direction:
+                snake.direction = turn
+
+        # Pass 1: pick every head's target, tails of snakes not eating leave
+        moves = []
+        claims = {}
+        dying = []
+        for snake in self.snakes:
+            if not snake.alive:
+                continue
+            if snake.index >= self.players:
+                self.steer(snake)
+            cell = self.next_cell(snake)
+            if cell < 0:
+                dying.append(snake)
+                continue
+            if grid[cell] != FOOD:
+                tail = snake.body.pop()
+                grid[tail] = EMPTY
+                changed.add(tail)
+            moves.append((snake, cell))
+            claims[cell] = claims.get(cell, 0) + 1
+
+        # Pass 2: heads move in, unless they meet another head or a body
+        reward = 0
+        for snake, cell in moves:
+            value = grid[cell]
+            if claims[cell] > 1 or (value != EMPTY and value != FOOD):
+                dying.append(snake)
+                continue
+            if value == FOOD:
+                self.food.remove(cell)
+                snake.score += FOOD_REWARD
+                if snake is player:
+                    reward = FOOD_REWARD
+            changed.add(snake.body[0])
+            snake.body.appendleft(cell)
+            grid[cell] = snake.value
+            changed.add(cell)
+
+        # Pass 3: clear the dead, then refill food and respawn
+        for snake in dying:
+            snake.alive = False
+            for cell in snake.body:
+                grid[cell] = EMPTY
+                changed.add(cell)
+            snake.body.clear()
+            if snake.index < self.players:
+                self.done = True
+            else:
+                snake.respawn_at = self.ticks + self.respawn_ticks
+        if self.done:
+            alive = [s.index for s in self.snakes[:self.players] if s.alive]
+            self.winner = alive[0] if len(alive) == 1 else None
+        for snake in self.snakes:
+            if snake.respawn_at is not None and snake.respawn_at <= self.ticks:
+                self.spawn_snake(snake)
+        self.spawn_food()
+
+        if self.listeners:
+            self.notify('move')
+            if reward:
+                self.notify('eat')
+            if self.done:
+                self.notify('over')
+        return reward, self.done
+
+    def take_changes(self):
+        """Cells changed since the last call, for incremental redraws"""
+        changed = self.changed
+        self.changed = set()
+        return changed
+
+    def snapshot(self):
+        """Encode the board and every snake as varints after the grid bytes"""
+        data = bytearray()
+        winner = 0 if self.winner is None else self.winner + 1
+        for value in (*self.options(), self.ticks, self.done, winner):
+            write_varint(data, value)
+        data += self.grid
+        for snake in self.snakes:
+            write_varint(data, len(snake.body))
+            for cell in snake.body:
+                write_varint(data, cell)
+            write_varint(data, DIRECTIONS.index(snake.direction))
+            write_varint(data, snake.score)
+            write_varint(data, 0 if snake.respawn_at is None else snake.respawn_at + 1)
+            write_varint(data, 0 if snake.target is None else snake.target + 1)
+        write_varint(data, len(self.food))
+        for cell in self.food:
+            write_varint(data, cell)
+        return bytes(data)
+
+    def restore(self, data):
+        options = []
+        pos = 0
+        for _ in self.options():
+            value, pos = read_varint(data, pos)
+            options.append(value)
+        if tuple(options) != self.options():
+            raise ValueError(f"snapshot is for an arena with options {options}")
+        ticks, pos = read_varint(data, pos)
+        done, pos = read_varint(data, pos)
+        winner, pos = read_varint(data, pos)
+        cells = self.board_size * self.board_size
+        grid = bytearray(data[pos:pos + cells])
+        pos += cells
+
+        snakes = []
+        for index in range(self.snake_count):
+            snake = ArenaSnake(index)
+            length, pos = read_varint(data, pos)
+            for _ in range(length):
+                cell, pos = read_varint(data, pos)
+                snake.body.append(cell)
+            snake.alive = bool(length)
+            direction, pos = read_varint(data, pos)
+            if direction >= len(DIRECTIONS):
+                raise ValueError("arena snapshot has an unknown direction")
+            snake.direction = DIRECTIONS[direction]
+            snake.score, pos = read_varint(data, pos)
+            respawn_at, pos = read_varint(data, pos)
+            snake.respawn_at = respawn_at - 1 if respawn_at else None
+            target, pos = read_varint(data, pos)
+            snake.target = target - 1 if target else None
+            snakes.append(snake)
+        count, pos = read_varint(data, pos)
+        food = []
+        for _ in range(count):
+            cell, pos = read_varint(data, pos)
+            food.append(cell)
+        if pos != len(data) or len(grid) != cells:
+            raise ValueError("truncated arena snapshot")
+        # Checked before any state changes, so a bad save leaves the game as is
+        self.check_snapshot(grid, snakes, food, done, winner)
+
+        # Only cells that differ need redrawing, plus heads that may not
+        previous = self.grid
+        self.changed.update(i for i in range(cells) if previous[i] != grid[i])
+        self.changed.update(s.body[0] for s in self.snakes + snakes if s.body)
+
+        self.seed_game()
+        self.resumed = True
+        self.grid = grid
+        self.snakes = snakes
+        self.food = food
+        self.ticks = ticks
+        self.done = bool(done)
+        self.winner = winner - 1 if winner else None
+        if self.listeners:
+            self.notify('reset')
+
+    def check_snapshot(self, grid, snakes, food, done, winner):
+        """Raise ValueError unless a restored board is one ``step`` can play on"""
+        size = self.board_size
+        cells = size * size
+        if done > 1 or winner > self.players:
+            raise ValueError("arena snapshot has a bad game over state")
+        expected = bytearray(cells)
+        for snake in snakes:
+            body = snake.body
+            if snake.target is not None and snake.target >= cells:
+                raise ValueError("arena snapshot has a target off the board")
+            for i, cell in enumerate(body):
+                if cell >= cells or expected[cell]:
+                    raise ValueError("arena snapshot has a body off the board or overlapping")
+                if i and abs(cell % size - body[i - 1] % size) + abs(
+                        cell // size - body[i - 1] // size) != 1:
+                    raise ValueError("arena snapshot has a broken body")
+                expected[cell] = snake.value
+        for cell in food:
+            if cell >= cells or expected[cell]:
+                raise ValueError("arena snapshot has food off the board or covered")
+            expected[cell] = FOOD
+        if grid != expected:
+            raise ValueError("arena snapshot grid does not match its snakes and food")
+
+    def options(self):
+        return (self.board_size, self.snake_count, self.food_count, self.players)
+
+    def encode_action(self, action):
+        if self.players == 1:
+            return DIRECTIONS.index(action)
+        # One base-5 digit per player, 0 for no turn
+        code = 0
+        for turn in reversed(action):
+            code = code * 5 + (0 if turn is None else DIRECTIONS.index(turn) + 1)
+        return code
+
+    def decode_action(self, code):
+        if self.players == 1:
+            return DIRECTIONS[code]
+        action = []
+        for _ in range(self.players):
+            code, digit = divmod(code, 5)
+            action.append(DIRECTIONS[digit - 1] if digit else None)
+        return tuple(action)
+
+    def legal_actions(self, player=None):
+        """Directions ``player``'s snake can turn to.
+
+        Without ``player`` these are the actions ``step`` takes: the first
+        snake's directions with one player, with more every tuple holding
+        a direction or None per player.
+        """
+        if player is not None or self.players == 1:
+            direction = self.snakes[player or 0].direction
+            return [d for d in DIRECTIONS if OPPOSITES[d] != direction]
+        seats = [[None] + self.legal_actions(i) for i in range(self.players)]
+        return list(itertools.product(*seats))
+
+    def is_terminal(self):
+        return self.done
@@ -0,0 +1,96 @@
+from abc import ABC, abstractmethod
+from .action_log import ActionLog
+import random
+
+class BaseCore(ABC):
+    """Headless game rules with no tkinter dependency.
+
+    Views subscribe to a core and redraw when it notifies them, so the same
+    rules run unchanged in batch jobs without a display.
+
+    Each game draws from its own seeded RNG and records its actions in an
+    ``ActionLog``, so any session can be re-simulated exactly.
+    """
+
+    # Name of the game in action logs
+    game_id = None
+
+    def __init__(self):
+        self.listeners = []
+        self.seed = None
+        self.random = None
+        self.log = None
+        # Set when the state came from a snapshot, the log then can't replay it
+        self.resumed = False
+        self.last_action = None
+
+    def seed_game(self, seed=None):
+        """Start a fresh RNG and action log, called by ``reset``"""
+        if seed is None:
+            seed = random.getrandbits(32)
+        self.seed = seed
+        self.random = random.Random(seed)
+        self.log = ActionLog(self.game_id, self.options(), seed)
+        self.resumed = False
+
+    def record(self, action):
+        """Log one tick of the session, ``action`` may be None"""
+        self.last_action = action
+        self.log.append(None if action is None else self.encode_action(action))
+
+    def options(self):
+        """Constructor arguments needed to rebuild this core for a replay"""
+        return ()
+
+    @property
+    def score_key(self):
+        """Leaderboard and save slot name, one per game and board setup"""
+        return ':'.join([self.game_id, *map(str, self.options())])
+
+    def encode_action(self, action):
+        """Map an action to a small non-negative integer for the log"""
+        raise NotImplementedError
+
+    def decode_action(self, code):
+        raise NotImplementedError
+
+    def snapshot(self):
+        """Encode the game state as compact bytes for a later ``restore``"""
+        raise NotImplementedError
+
+    def restore(self, data):
+        """Continue from a ``snapshot``, raises ValueError if it doesn't fit"""
+        raise NotImplementedError
+
+    def subscribe(self, listener):
+        """Register ``listener(core, event)`` for state change events"""
+        self.listeners.append(listener)
+        return listener
+
+    def unsubscribe(self, listener):
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    def notify(self, event):
+        for listener in list(self.listeners):
+            listener(self, event)
+
+    @abstractmethod
+    def reset(self, seed=None):
+        """Start a new game, seeding its RNG with ``seed`` if given"""
+        pass
+
+    @abstractmethod
+    def step(self, action):
+        """Apply an action and return a ``(reward, done)`` tuple"""
+        pass
+
+    @abstractmethod
+    def legal_actions(self):
+        """List the actions that are valid in the current state"""
+        pass
+
+    @abstractmethod
+    def is_terminal(self):
+        """Check if the game has ended"""
+        pass
@@ -1,12 +1,54 @@
 from abc import ABC, abstractmethod
+from collections import deque
+import os
+import statistics
+import time
 import tkinter as tk
+from . import storage
+from .layout import Layout
 
 class BaseGame(ABC):
+    # Logic ticks run late by at most this many steps before being dropped
+    max_catch_up = 5
+
+    # Most buffered input actions, presses beyond this are dropped
+    input_queue_size = 3
+
+    # Scored games with a snapshot-capable core: keep high scores and save
+    # unfinished games on close
+    resumable = False
+
     def __init__(self, master):
         self.master = master
         self.frame = tk.Frame(master)
         self.frame.pack(expand=True, fill='both')
 
+        # Pending after() handles and key bindings, released by dispose()
+        self.after_ids = set()
+        self.bindings = []
+        self.disposed = False
+
+        # Set while games.replay drives the game, nothing is recorded then
+        self.replaying = False
+
+        # Streams the core to spectators, see start_broadcast()
+        self.publisher = None
+
+        # Scales the board with the window, see enable_layout()
+        self.layout = None
+
+        # Actions waiting for the next tick, oldest first
+        self.input_queue = deque()
+
+        # Fixed timestep loop state
+        self.loop_running = False
+        self.loop_after_id = None
+        self.tick_interval = None
+        self.frame_interval = None
+        self.accumulator = 0.0
+        self.last_loop_time = None
+        self.tick_times = deque(maxlen=100)
+
     @abstractmethod
     def play(self):
         """Initialize the game UI and start the game"""
@@ -22,6 +64,260 @@ class BaseGame(ABC):
         """Check if the game is over"""
         pass
 
-    def restart(self):
+    def restart(self, seed=None):
         """Reset the game state to start a new game"""
         pass
+
+    def save_replay(self):
+        """Write the finished session's action log to $GAMECENTER_REPLAY_DIR.
+
+        Does nothing unless the variable is set. Returns the file path.
+        """
+        directory = os.environ.get('GAMECENTER_REPLAY_DIR')
+        core = getattr(self, 'core', None)
+        if not directory or core is None or core.resumed or self.replaying:
+            # A resumed game's log does not start from the seeded position
+            return None
+        os.makedirs(directory, exist_ok=True)
+        name = f"{core.game_id}-{time.strftime('%Y%m%d-%H%M%S')}-{core.seed}.gcr"
+        path = os.path.join(directory, name)
+        with open(path, 'wb') as f:
+            f.write(core.log.to_bytes())
+        return path
+
+    def start_broadcast(self):
+        """Stream the game to $GAMECENTER_BROADCAST ("host:port[/channel]").
+
+        Does nothing unless the variable is set. Returns the publisher.
+        """
+        address = os.environ.get('GAMECENTER_BROADCAST')
+        if not address or self.publisher is not None:
+            return self.publisher
+        # Imported here so games that never broadcast don't load asyncio
+        from . import broadcast
+        self.publisher = broadcast.Publisher(self, *broadcast.parse_address(address))
+        return self.publisher
+
+    def enable_layout(self, widget):
+        """Resize ``widget``, the game's canvas or board frame, with the
+        window. See games.layout.
+
+        Called from play(), again when the board is rebuilt. Games update
+        their cell geometry in ``on_layout``.
+        """
+        if self.layout is None:
+            self.layout = Layout(self, widget)
+        else:
+            self.layout.widget = widget
+        return self.layout
+
+    def on_layout(self, scale):
+        """Board was resized to ``scale`` times its opening size.
+
+        Canvas items are already moved and resized by ``canvas.scale``.
+        Games recompute their cell geometry here, once per resize, and swap
+        in images and fonts for it.
+        """
+        pass
+
+    def load_progress(self):
+        """Read the best score and continue an unfinished saved game.
+
+        Called once when the game opens, the only synchronous database
+        access. Returns True if a saved game was restored.
+        """
+        store = storage.get_store()
+        # load_state waits for writes queued by the last close, read the
+        # best score after it so a score recorded then is counted
+        data = store.load_state(self.core.score_key)
+        self.best_score = store.best_score(self.core.score_key)
+        if data is None:
+            return False
+        try:
+            self.core.restore(data)
+        except ValueError:
+            # Saved with a different board setup
+            return False
+        return True
+
+    def record_score(self):
+        """Queue the finished game's score and drop its saved state"""
+        if self.replaying:
+            return
+        core = self.core
+        store = storage.get_store()
+        store.add_score(core.score_key, core.score,
+                        None if core.resumed else core.log.to_bytes())
+        store.delete_state(core.score_key)
+        self.best_score = max(self.best_score, core.score)
+
+    def save_progress(self):
+        """Queue a snapshot of an unfinished game so the next open resumes it"""
+        core = self.core
+        if self.replaying:
+            return
+        store = storage.get_store()
+        if core.is_terminal() or not (core.resumed or core.log.ticks):
+            # Nothing worth resuming, don't bring back an older save either
+            store.delete_state(core.score_key)
+        else:
+            store.save_state(core.score_key, core.snapshot())
+
+    def tick(self):
+        """Advance the game logic by one fixed timestep"""
+        pass
+
+    def queue_input(self, action):
+        """Buffer an action for a later tick. Returns False if it was dropped."""
+        previous = self.input_queue[-1] if self.input_queue else None
+        if len(self.input_queue) >= self.input_queue_size:
+            return False
+        if not self.accept_input(action, previous):
+            return False
+        self.input_queue.append(action)
+        return True
+
+    def accept_input(self, action, previous):
+        """Check an action against the one queued before it.
+
+        ``previous`` is None when the queue is empty, games then check
+        against their current state. Repeats are dropped by default.
+        """
+        return action != previous
+
+    def next_input(self):
+        """The oldest queued action, or None. Call once per tick."""
+        return self.input_queue.popleft() if self.input_queue else None
+
+    def clear_input(self):
+        self.input_queue.clear()
+
+    def bind_key(self, sequence, handler):
+        """Bind an event on the game window and remember it for dispose"""
+        funcid = self.master.bind(sequence, handler)
+        self.bindings.append((sequence, funcid))
+        return funcid
+
+    def dispose(self):
+        """Stop timers, drop key bindings and core listeners.
+
+        Subclasses holding other resources extend this and call super().
+        Calling it more than once is harmless.
+        """
+        if self.disposed:
+            return
+        self.disposed = True
+        self.stop_loop()
+        self.cancel_all()
+        if self.publisher is not None:
+            self.publisher.close()
+        if self.resumable:
+            self.save_progress()
+        for sequence, funcid in self.bindings:
+            try:
+                self.master.unbind(sequence, funcid)
+            except tk.TclError:
+                pass
+        self.bindings.clear()
+        core = getattr(self, 'core', None)
+        if core is not None:
+            core.listeners.clear()
+
+    def close(self):
+        """Dispose the game and destroy its window"""
+        self.dispose()
+        try:
+            self.master.destroy()
+        except tk.TclError:
+            pass
+
+    def schedule(self, delay, callback, *args):
+        """Call ``master.after`` and remember the handle until it fires"""
+        def run():
+            self.after_ids.discard(after_id)
+            callback(*args)
+
+        after_id = self.master.after(delay, run)
+        self.after_ids.add(after_id)
+        return after_id
+
+    def cancel(self, after_id):
+        if after_id in self.after_ids:
+            self.after_ids.discard(after_id)
+            self.master.after_cancel(after_id)
+
+    def cancel_all(self):
+        """Cancel every pending callback scheduled through ``schedule``"""
+        for after_id in list(self.after_ids):
+            try:
+                self.master.after_cancel(after_id)
+            except tk.TclError:
+                pass
+        self.after_ids.clear()
+        self.loop_after_id = None
+        self.loop_running = False
+
+    def start_loop(self, tick_ms, frame_ms=None):
+        """Run ``tick`` every ``tick_ms`` and ``display`` after ticks.
+
+        Ticks are driven by an accumulator so the simulation rate does not
+        drift with render time. ``frame_ms`` caps how long the loop sleeps
+        between wake-ups. Restarting cancels the previous loop first.
+        """
+        self.stop_loop()
+        self.tick_interval = tick_ms / 1000
+        self.frame_interval = frame_ms / 1000 if frame_ms else None
+        self.accumulator = 0.0
+        self.last_loop_time = time.perf_counter()
+        self.tick_times.clear()
+        self.loop_running = True
+        self.loop_after_id = self.schedule(tick_ms, self.run_loop)
+
+    def stop_loop(self):
+        self.loop_running = False
+        if self.loop_after_id is not None:
+            self.cancel(self.loop_after_id)
+            self.loop_after_id = None
+
+    def run_loop(self):
+        self.loop_after_id = None
+        if not self.loop_running:
+            return
+
+        now = time.perf_counter()
+        self.accumulator += now - self.last_loop_time
+        self.last_loop_time = now
+
+        steps = 0
+        while self.loop_running and self.accumulator >= self.tick_interval:
+            self.tick()
+            self.tick_times.append(time.perf_counter())
+            self.accumulator -= self.tick_interval
+            steps += 1
+            if steps >= self.max_catch_up:
+                # Too far behind, drop the backlog instead of spiralling
+                self.accumulator = 0.0
+                break
+
+        # Rendering happens once per wake-up, however many ticks ran
+        if steps:
+            self.display()
+
+        if self.loop_running:
+            delay = self.tick_interval - self.accumulator
+            if self.frame_interval:
+                delay = min(delay, self.frame_interval)
+            elapsed = time.perf_counter() - now
+            delay = max(0, round((delay - elapsed) * 1000))
+            self.loop_after_id = self.schedule(delay, self.run_loop)
+
+    def loop_stats(self):
+        """Measured tick rate in Hz and tick interval jitter in ms"""
+        times = list(self.tick_times)
+        if len(times) < 3:
+            return {'tick_rate': 0.0, 'jitter_ms': 0.0}
+        intervals = [b - a for a, b in zip(times, times[1:])]
+        return {
+            'tick_rate': len(intervals) / (times[-1] - times[0]),
+            'jitter_ms': statistics.pstdev(intervals) * 1000
+        }
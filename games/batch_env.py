@@ -0,0 +1,189 @@
+"""Vectorized environments running many independent games at once.
+
+Every game lives in a row of NumPy arrays and ``step`` applies one action
+per game in a single call, returning rewards and done flags. Finished games
+are reset automatically. Actions are indexes into the ``DIRECTIONS`` tuple
+of the matching core module. Requires NumPy.
+"""
+import numpy as np
+
+from . import game2048_core
+from . import snake_core
+
+LEFT, RIGHT, UP, DOWN = range(4)
+
+
+class Batch2048:
+    """N independent 4x4 2048 boards stored as an (N, 4, 4) exponent array"""
+
+    def __init__(self, n, seed=None):
+        self.n = n
+        self.rng = np.random.default_rng(seed)
+        left, right, score_left, score_right = game2048_core.row_tables()
+        self.row_left = np.array(left, dtype=np.uint16)
+        self.row_right = np.array(right, dtype=np.uint16)
+        self.score_left = np.array(score_left, dtype=np.int64)
+        self.score_right = np.array(score_right, dtype=np.int64)
+        self.shifts = np.array([0, 4, 8, 12], dtype=np.uint16)
+
+        self.boards = np.zeros((n, 4, 4), dtype=np.uint8)
+        self.scores = np.zeros(n, dtype=np.int64)
+        self.reset()
+
+    def reset(self, mask=None):
+        """Reset all boards, or only those selected by a boolean mask"""
+        if mask is None:
+            mask = np.ones(self.n, dtype=bool)
+        self.boards[mask] = 0
+        self.scores[mask] = 0
+        self.spawn(mask)
+        self.spawn(mask)
+
+    def spawn(self, mask):
+        """Add a 2 (90%) or 4 (10%) on a random empty cell of masked boards"""
+        flat = self.boards.reshape(self.n, 16)
+        rows = np.flatnonzero(mask)
+        if not len(rows):
+            return
+        empty = flat[rows] == 0
+        # The largest random key among empty cells is a uniform empty cell
+        keys = self.rng.random((len(rows), 16)) * empty
+        cells = keys.argmax(axis=1)
+        values = np.where(self.rng.random(len(rows)) < 0.9, 1, 2)
+        has_room = empty.any(axis=1)
+        flat[rows[has_room], cells[has_room]] = values[has_room]
+
+    def _pack(self, lines):
+        return (lines.astype(np.uint16) << self.shifts).sum(axis=-1, dtype=np.uint16)
+
+    def _unpack(self, packed):
+        return ((packed[..., None] >> self.shifts) & 0xF).astype(np.uint8)
+
+    def step(self, actions):
+        """Apply one action per board and return ``(rewards, dones)``"""
+        actions = np.asarray(actions)
+        vertical = (actions == UP) | (actions == DOWN)
+        towards_start = (actions == LEFT) | (actions == UP)
+
+        # Vertical moves work on columns, which are the rows of the transpose
+        lines = np.where(vertical[:, None, None],
+                         self.boards.transpose(0, 2, 1), self.boards)
+        packed = self._pack(lines)
+        merged = np.where(towards_start[:, None],
+                          self.row_left[packed], self.row_right[packed])
+        gained = np.where(towards_start[:, None],
+                          self.score_left[packed], self.score_right[packed])
+        rewards = gained.sum(axis=1)
+
+        moved_lines = self._unpack(merged)
+        new_boards = np.where(vertical[:, None, None],
+                              moved_lines.transpose(0, 2, 1), moved_lines)
+        moved = (merged != packed).any(axis=1)
+
+        self.boards[moved] = new_boards[moved]
+        self.scores += rewards
+        self.spawn(moved)
+
+        dones = ~self.can_move()
+        if dones.any():
+            self.reset(dones)
+        return rewards, dones
+
+    def can_move(self):
+        boards = self.boards
+        return ((boards == 0).any(axis=(1, 2))
+                | (boards[:, :, 1:] == boards[:, :, :-1]).any(axis=(1, 2))
+                | (boards[:, 1:, :] == boards[:, :-1, :]).any(axis=(1, 2)))
+
+
+class BatchSnake:
+    """N independent snake games on square boards.
+
+    Each body is a ring buffer of flat cell ids next to a per-game
+    occupancy grid, so moving, colliding and eating are array operations.
+    """
+
+    # Offsets for snake_core.DIRECTIONS: Left, Right, Up, Down
+    DX = np.array([-1, 1, 0, 0])
+    DY = np.array([0, 0, -1, 1])
+    OPPOSITE = np.array([RIGHT, LEFT, DOWN, UP])
+
+    def __init__(self, n, board_size=20, seed=None):
+        self.n = n
+        self.board_size = board_size
+        self.cells = board_size * board_size
+        self.rng = np.random.default_rng(seed)
+        self.index = np.arange(n)
+
+        self.body = np.zeros((n, self.cells), dtype=np.int32)
+        self.head = np.zeros(n, dtype=np.int64)
+        self.length = np.zeros(n, dtype=np.int64)
+        self.occupied = np.zeros((n, self.cells), dtype=bool)
+        self.direction = np.zeros(n, dtype=np.int64)
+        self.food = np.zeros(n, dtype=np.int64)
+        self.scores = np.zeros(n, dtype=np.int64)
+        self.reset()
+
+    def reset(self, mask=None):
+        """Reset all games, or only those selected by a boolean mask"""
+        if mask is None:
+            mask = np.ones(self.n, dtype=bool)
+        start = min(5, self.board_size // 2)
+        self.occupied[mask] = False
+        self.body[mask, 0] = start * self.board_size + start
+        self.occupied[mask, start * self.board_size + start] = True
+        self.head[mask] = 0
+        self.length[mask] = 1
+        self.direction[mask] = RIGHT
+        self.scores[mask] = 0
+        self.spawn_food(np.flatnonzero(mask))
+
+    def spawn_food(self, rows):
+        """Place food on a random free cell, returns rows with a full board"""
+        if not len(rows):
+            return rows
+        free = ~self.occupied[rows]
+        keys = self.rng.random((len(rows), self.cells)) * free
+        self.food[rows] = keys.argmax(axis=1)
+        return rows[~free.any(axis=1)]
+
+    def step(self, actions):
+        """Move every snake once and return ``(rewards, dones)``.
+
+        An action of -1 keeps the current direction, reversing is ignored.
+        """
+        actions = np.asarray(actions)
+        turn = (actions >= 0) & (actions != self.OPPOSITE[self.direction])
+        self.direction = np.where(turn, actions, self.direction)
+
+        size = self.board_size
+        head_cell = self.body[self.index, self.head]
+        x = head_cell % size + self.DX[self.direction]
+        y = head_cell // size + self.DY[self.direction]
+        inside = (x >= 0) & (x < size) & (y >= 0) & (y < size)
+        new_cell = np.where(inside, y * size + x, 0)
+
+        dones = ~inside | self.occupied[self.index, new_cell]
+        alive = ~dones
+        eats = alive & (new_cell == self.food)
+        rewards = np.where(eats, snake_core.FOOD_REWARD, 0)
+
+        # Tails move away for snakes that did not eat
+        shrink = np.flatnonzero(alive & ~eats)
+        tail = (self.head[shrink] - self.length[shrink] + 1) % self.cells
+        self.occupied[shrink, self.body[shrink, tail]] = False
+
+        # Heads advance for every snake still alive
+        moving = np.flatnonzero(alive)
+        self.head[moving] = (self.head[moving] + 1) % self.cells
+        self.body[moving, self.head[moving]] = new_cell[moving]
+        self.occupied[moving, new_cell[moving]] = True
+        self.length += eats
+        self.scores += rewards
+
+        full = self.spawn_food(np.flatnonzero(eats))
+        dones[full] = True
+
+        if dones.any():
+            self.reset(dones)
+        return rewards, dones
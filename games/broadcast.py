@@ -0,0 +1,296 @@
+"""Stream a live 2048 or Snake session to spectators.
+
+A game started with GAMECENTER_BROADCAST=host:port[/channel] publishes
+its core to ``games.broadcast_server``, which fans it out to every
+``games.spectator`` watching the same channel (``main`` by default).
+
+The stream is a STATE keyframe holding the whole game followed by one
+DELTA per move with only what the move changed: the 2048 cells that
+changed, or the Snake's new head, how many tail cells left and where the
+food is. A mirror keeps the state those messages describe. The publisher
+diffs the core against its mirror, and the server and viewers apply the
+messages to theirs, so anyone can build a keyframe to resync a viewer
+that fell behind.
+"""
+import asyncio
+from collections import deque
+
+from . import net_protocol as proto
+from .netplay import AsyncioPump
+
+DEFAULT_SERVER = ('127.0.0.1', 8766)
+DEFAULT_CHANNEL = 'main'
+
+
+def parse_address(address):
+    """``host, port, channel`` from "host:port[/channel]", parts may be left
+    out"""
+    address, _, channel = (address or '').partition('/')
+    host, _, port = address.rpartition(':')
+    if not host and not port.isdigit():
+        host, port = port, ''
+    return (host or DEFAULT_SERVER[0], int(port) if port else DEFAULT_SERVER[1],
+            channel or DEFAULT_CHANNEL)
+
+
+class Mirror:
+    """Drawable state of one game, kept current by STATE and DELTA messages.
+
+    ``seq`` counts the changes so far, a DELTA only applies on top of the
+    state right before it. Subclasses lay out the values: ``keyframe`` and
+    ``load`` for the whole state, ``diff`` and ``apply`` for one change.
+    ``load`` and ``apply`` return the cells they changed.
+    """
+
+    game_id = None
+
+    def __init__(self):
+        self.seq = 0
+        self.size = 0
+        self.score = 0
+        self.done = False
+
+    def publish(self, core, event):
+        """Message bringing the mirror up to ``core``, None if nothing
+        changed"""
+        if event == 'reset':
+            self.capture(core)
+            self.seq += 1
+            return self.state_message()
+        values = self.diff(core)
+        if values is None:
+            return None
+        self.seq += 1
+        self.apply(values)
+        return proto.encode(proto.DELTA, self.seq, values)
+
+    def state_message(self):
+        return proto.encode(proto.STATE, self.game_id, self.seq, self.keyframe())
+
+    def on_state(self, seq, values):
+        self.seq = seq
+        return self.load(values)
+
+    def on_delta(self, seq, values):
+        if seq != self.seq + 1:
+            raise ValueError(f"delta {seq} does not follow state {self.seq}")
+        self.seq = seq
+        return self.apply(values)
+
+
+class Board2048Mirror(Mirror):
+    """2048 board as a flat list of tile exponents, 0 for an empty cell"""
+
+    game_id = '2048'
+
+    def __init__(self):
+        super().__init__()
+        self.cells = []
+
+    @staticmethod
+    def exponents(core):
+        return [value.bit_length() - 1 if value else 0
+                for row in core.grid for value in row]
+
+    def capture(self, core):
+        self.cells = self.exponents(core)
+        self.size = len(core.grid)
+        self.score = core.score
+        self.done = core.is_terminal()
+
+    def keyframe(self):
+        return [self.size, self.score, self.done, *self.cells]
+
+    def load(self, values):
+        self.size, self.score, done = values[:3]
+        self.done = bool(done)
+        self.cells = list(values[3:])
+        if len(self.cells) != self.size * self.size:
+            raise ValueError("2048 keyframe has the wrong number of cells")
+        return set(range(len(self.cells)))
+
+    def diff(self, core):
+        # Score and done, then (cell, exponent) for every cell that changed
+        values = [core.score, core.is_terminal()]
+        for index, (old, new) in enumerate(zip(self.cells, self.exponents(core))):
+            if old != new:
+                values += (index, new)
+        if len(values) == 2 and values[0] == self.score and values[1] == self.done:
+            return None
+        return values
+
+    def apply(self, values):
+        self.score, done = values[:2]
+        self.done = bool(done)
+        changed = set()
+        for i in range(2, len(values) - 1, 2):
+            index = values[i]
+            self.cells[index] = values[i + 1]
+            changed.add(index)
+        return changed
+
+
+class SnakeMirror(Mirror):
+    """Snake body as cell ids ``y * size + x``, head first, and the food"""
+
+    game_id = 'snake'
+
+    def __init__(self):
+        super().__init__()
+        self.body = deque()
+        self.occupied = set()
+        self.food = None
+
+    def cell_id(self, cell):
+        return cell[1] * self.size + cell[0]
+
+    def capture(self, core):
+        self.size = core.board_size
+        self.body = deque(self.cell_id(segment) for segment in core.snake)
+        self.occupied = set(self.body)
+        self.food = None if core.food is None else self.cell_id(core.food)
+        self.score = core.score
+        self.done = core.done
+
+    def keyframe(self):
+        food = 0 if self.food is None else self.food + 1
+        return [self.size, self.score, self.done, food, *self.body]
+
+    def load(self, values):
+        self.size, self.score, done, food = values[:4]
+        self.done = bool(done)
+        self.food = food - 1 if food else None
+        self.body = deque(values[4:])
+        self.occupied = set(self.body)
+        return set(range(self.size * self.size))
+
+    def diff(self, core):
+        # Score, done, food + 1, new head + 1 (0 if it did not move) and the
+        # number of tail cells that left
+        head = self.cell_id(core.snake[0])
+        food = 0 if core.food is None else self.cell_id(core.food) + 1
+        moved = head != self.body[0]
+        values = [core.score, core.done, food, head + 1 if moved else 0,
+                  len(self.body) + 1 - len(core.snake) if moved else 0]
+        if (not moved and values[0] == self.score and values[1] == self.done
+                and values[2] == (0 if self.food is None else self.food + 1)):
+            return None
+        return values
+
+    def apply(self, values):
+        self.score, done, food, head, tails = values
+        self.done = bool(done)
+        changed = set()
+        if head:
+            # The old head turns into a body segment
+            changed.add(self.body[0])
+        for _ in range(tails):
+            tail = self.body.pop()
+            self.occupied.discard(tail)
+            changed.add(tail)
+        if head:
+            self.body.appendleft(head - 1)
+            self.occupied.add(head - 1)
+            changed.add(head - 1)
+        food = food - 1 if food else None
+        if food != self.food:
+            changed.update(cell for cell in (self.food, food) if cell is not None)
+            self.food = food
+        return changed
+
+
+# Mirror per core game id
+MIRRORS = {
+    '2048': Board2048Mirror,
+    '2048-grid': Board2048Mirror,
+    'snake': SnakeMirror,
+}
+
+
+class Publisher:
+    """Send a game's moves to the broadcast server as they happen.
+
+    Messages are written without waiting; while more than ``high_water``
+    bytes are unsent, deltas are dropped and the next message that gets
+    through is a keyframe instead, so a slow link never stalls the game.
+    """
+
+    high_water = 64 * 1024
+
+    def __init__(self, game, host, port, channel=DEFAULT_CHANNEL):
+        self.game = game
+        self.mirror = MIRRORS[game.core.game_id]()
+        self.mirror.publish(game.core, 'reset')
+        self.writer = None
+        self.stale = True
+        self.sent = 0
+        self.dropped = 0
+        game.core.subscribe(self.on_core_event)
+        self.pump = AsyncioPump(game)
+        self.pump.run(self.connect(host, port, channel))
+
+    async def connect(self, host, port, channel):
+        try:
+            _, self.writer = await asyncio.open_connection(host, port)
+        except OSError:
+            # No server, the game plays on without an audience
+            return
+        self.writer.write(proto.encode(proto.PUBLISH, channel))
+        self.send(self.mirror.state_message())
+
+    def on_core_event(self, core, event):
+        message = self.mirror.publish(core, event)
+        if message is not None:
+            self.send(message)
+
+    def send(self, message):
+        writer = self.writer
+        if (writer is None or writer.is_closing()
+                or writer.transport.get_write_buffer_size() > self.high_water):
+            self.stale = True
+            self.dropped += 1
+            return
+        if self.stale:
+            # Deltas were lost, the keyframe already includes this change
+            message = self.mirror.state_message()
+            self.stale = False
+        writer.write(message)
+        self.sent += 1
+
+    def close(self):
+        self.game.core.unsubscribe(self.on_core_event)
+        if self.writer is not None:
+            self.writer.close()
+        self.pump.close()
+
+
+async def watch(host, port, channel, on_message):
+    """Follow ``channel``, passing every STATE and DELTA to
+    ``on_message(kind, fields)`` until the connection ends.
+
+    Everything that arrived is handled before one ACK for all of it goes
+    back, so a viewer acknowledges as fast as it reads. A refused or lost
+    connection is reported as an ERROR message.
+    """
+    try:
+        reader, writer = await asyncio.open_connection(host, port)
+    except OSError as error:
+        on_message(proto.ERROR, [f"can't reach {host}:{port}: {error.strerror}"])
+        return
+    buffer = bytearray()
+    try:
+        writer.write(proto.encode(proto.WATCH, channel))
+        while True:
+            data = await reader.read(1 << 16)
+            if not data:
+                raise ConnectionResetError
+            buffer += data
+            messages = proto.take_messages(buffer)
+            for kind, fields in messages:
+                on_message(kind, fields)
+            if messages:
+                writer.write(proto.encode(proto.ACK, len(messages)))
+    except (ConnectionError, ValueError):
+        on_message(proto.ERROR, ["connection to the broadcast server lost"])
+    finally:
+        writer.close()
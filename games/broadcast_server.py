@@ -0,0 +1,197 @@
+"""Fan-out server for spectator mode.
+
+A game sends PUBLISH and then its STATE and DELTA messages (see
+games.broadcast). The server applies them to a mirror of the channel and
+forwards the same bytes to every viewer that sent WATCH for it.
+
+Viewers ACK what they have applied. A viewer that reads slower than the
+game moves piles up unacknowledged messages; past a limit the deltas
+for it are stale, so they are dropped and it gets one keyframe of the
+current state once it has caught up with what was already sent. Slow
+viewers skip frames, nobody else waits for them.
+
+Usage::
+
+    python -m games.broadcast_server [--host 127.0.0.1] [--port 8766]
+"""
+import argparse
+import asyncio
+from collections import deque
+
+from . import net_protocol as proto
+from .broadcast import DEFAULT_SERVER, MIRRORS
+
+
+class Channel:
+    def __init__(self, name):
+        self.name = name
+        self.mirror = None
+        self.viewers = set()
+        # Encoded keyframe of the mirror and the seq it was built at
+        self.keyframe = None
+        self.keyframe_seq = None
+
+    def state_message(self):
+        """Keyframe of the current state, built once per change at most"""
+        if self.keyframe_seq != self.mirror.seq:
+            self.keyframe = self.mirror.state_message()
+            self.keyframe_seq = self.mirror.seq
+        return self.keyframe
+
+
+class Viewer:
+    """One spectator connection and the messages it has not acknowledged.
+
+    Messages are written as they come. Once ``max_lag`` of them are in
+    flight the viewer is behind: further deltas are dropped, and when it
+    has acknowledged everything already sent it gets one keyframe of the
+    current state. Lag is counted in messages rather than bytes because
+    deltas are tiny, socket buffers would hide minutes of them.
+    """
+
+    max_lag = 64
+
+    def __init__(self, channel, writer):
+        self.channel = channel
+        self.writer = writer
+        # Messages written and not acknowledged yet
+        self.in_flight = 0
+        self.behind = False
+        self.sent = 0
+        self.resyncs = 0
+
+    def push(self, message, keyframe=False):
+        if keyframe:
+            # A fresh keyframe fixes whatever was missed
+            self.behind = False
+        elif self.behind:
+            return
+        elif self.in_flight >= self.max_lag:
+            self.behind = True
+            self.resyncs += 1
+            return
+        self.write(message)
+
+    def write(self, message):
+        if not self.writer.is_closing():
+            self.writer.write(message)
+            self.in_flight += 1
+            self.sent += 1
+
+    def ack(self, count):
+        self.in_flight = max(0, self.in_flight - count)
+        if self.behind and not self.in_flight:
+            # Caught up with what was sent, jump straight to the present
+            self.behind = False
+            self.write(self.channel.state_message())
+
+
+class BroadcastServer:
+    def __init__(self):
+        self.channels = {}
+        self.server = None
+        self.published = 0
+
+    async def start(self, host=DEFAULT_SERVER[0], port=DEFAULT_SERVER[1]):
+        self.server = await asyncio.start_server(self.handle, host, port)
+        return self.server
+
+    @property
+    def port(self):
+        return self.server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    def channel(self, name):
+        channel = self.channels.get(name)
+        if channel is None:
+            channel = self.channels[name] = Channel(name)
+        return channel
+
+    @property
+    def viewers(self):
+        return [viewer for channel in self.channels.values() for viewer in channel.viewers]
+
+    async def handle(self, reader, writer):
+        try:
+            kind, fields = await proto.read_message(reader)
+            if kind == proto.PUBLISH:
+                await self.publish(self.channel(fields[0]), reader)
+            elif kind == proto.WATCH:
+                await self.watch(self.channel(fields[0]), reader, writer)
+            else:
+                raise ValueError("expected PUBLISH or WATCH")
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except ValueError as error:
+            writer.write(proto.encode(proto.ERROR, str(error)))
+        finally:
+            writer.close()
+
+    async def publish(self, channel, reader):
+        while True:
+            header = await reader.readexactly(proto.HEADER.size)
+            (length,) = proto.HEADER.unpack(header)
+            if length > proto.MAX_FRAME:
+                raise ValueError("frame too large")
+            payload = await reader.readexactly(length)
+            kind, fields = proto.decode(payload)
+            # Viewers get the publisher's bytes as they are
+            message = header + payload
+            if kind == proto.STATE:
+                game_id, seq, values = fields
+                if game_id not in MIRRORS:
+                    raise ValueError(f"can't broadcast {game_id!r}")
+                channel.mirror = MIRRORS[game_id]()
+                channel.mirror.on_state(seq, values)
+                # A new publisher may start over at the same seq
+                channel.keyframe = message
+                channel.keyframe_seq = seq
+                keyframe = True
+            elif kind == proto.DELTA and channel.mirror is not None:
+                channel.mirror.on_delta(*fields)
+                keyframe = False
+            else:
+                raise ValueError("expected STATE or DELTA")
+            self.published += 1
+            for viewer in channel.viewers:
+                viewer.push(message, keyframe)
+
+    async def watch(self, channel, reader, writer):
+        viewer = Viewer(channel, writer)
+        if channel.mirror is not None:
+            viewer.push(channel.state_message(), keyframe=True)
+        channel.viewers.add(viewer)
+        try:
+            while True:
+                kind, fields = await proto.read_message(reader)
+                if kind != proto.ACK:
+                    raise ValueError("viewers only send ACK")
+                viewer.ack(fields[0])
+        finally:
+            channel.viewers.discard(viewer)
+
+
+async def serve(host, port):
+    server = BroadcastServer()
+    await server.start(host, port)
+    print(f"broadcast server listening on {host}:{server.port}")
+    async with server.server:
+        await server.server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default=DEFAULT_SERVER[0])
+    parser.add_argument('--port', type=int, default=DEFAULT_SERVER[1])
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
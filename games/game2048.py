@@ -1,18 +1,44 @@
+from .animation import Animator
 from .base_game import BaseGame
+from .game2048_core import Game2048Core, GridGame2048Core, tile_moves
+from .solver2048 import Solver2048
+from .sprites import SpriteCache
+import colorsys
 import tkinter as tk
 from tkinter import ttk
-import random
+import queue
+import threading
 
 class Game2048(BaseGame):
-    def __init__(self, master):
+    resumable = True
+
+    # Solver settings for hints and autopilot
+    solver_mode = 'expectimax'
+    solver_time_budget = 0.1
+    autopilot_delay = 50
+    search_poll_interval = 15
+
+    # Queued moves are applied one per this many ms
+    input_interval = 16
+
+    # Tile slide length in ms (0 turns animations off) and its frame rate
+    animation_duration = 100
+    animation_fps = 60
+
+    def __init__(self, master, grid_size=4):
         super().__init__(master)
-        self.master.title("2048")
+        self.master.title("2048" if grid_size == 4 else f"2048 {grid_size}x{grid_size}")
         
-        # Make cell size responsive to screen size
+        # Make cell size responsive to screen size, big boards get smaller cells
         screen_width = self.master.winfo_screenwidth()
-        self.cell_size = min(100, screen_width // 16)  # Adjust cell size based on screen
-        self.padding = self.cell_size // 10
-        self.grid_size = 4
+        screen_height = self.master.winfo_screenheight()
+        self.grid_size = grid_size
+        self.cell_size = max(16, min(100, screen_width // (4 * grid_size),
+                                     (screen_height - 250) // grid_size))
+        self.padding = max(2, self.cell_size // 10)
+        self.corner_radius = max(2, self.cell_size // 10)
+        # Geometry at the opening window size, see on_layout()
+        self.base_geometry = (self.cell_size, self.padding, self.corner_radius)
 
         # Modern color scheme
         self.colors = {
@@ -41,21 +67,52 @@ class Game2048(BaseGame):
         # Adjust window size
         window_width = max(min_window_width, screen_width // 4)
         window_height = window_width + 150  # Extra space for score and buttons
-        screen_height = self.master.winfo_screenheight()
         x = (screen_width - window_width) // 2
         y = (screen_height - window_height) // 2
         self.master.geometry(f"{window_width}x{window_height}+{x}+{y}")
         self.master.configure(bg=self.colors['bg'])
 
-        self.grid = [[0] * self.grid_size for _ in range(self.grid_size)]
-        self.score = 0
+        # All game rules live in the headless core, this class only draws it.
+        # The classic board uses the bitboard core, larger ones the grid core.
+        if grid_size == 4:
+            self.core = Game2048Core()
+        else:
+            self.core = GridGame2048Core(grid_size)
+        self.core.subscribe(self.on_core_event)
         self.game_over_flag = False
+        self.load_progress()
+
+        # Tile backgrounds are pre-rendered images, one per color
+        self.sprites = SpriteCache(self.master)
+
+        # Moving tiles are drawn by pooled slider items while they animate
+        self.animator = Animator(self, self.animation_fps)
+        self.slider_pool = []
+        self.active_sliders = []
+        self.input_after_id = None
+
+        # Search runs on a worker thread and hands results back via a queue.
+        # The solver works on bitboards, so only the classic board has one.
+        self.solver = None
+        if grid_size == 4:
+            self.solver = Solver2048(self.solver_mode, self.solver_time_budget)
+        self.search_results = queue.Queue()
+        self.search_thread = None
+        self.autopilot = False
 
         # Bind arrow keys
-        self.master.bind('<Left>', lambda e: self.move('left'))
-        self.master.bind('<Right>', lambda e: self.move('right'))
-        self.master.bind('<Up>', lambda e: self.move('up'))
-        self.master.bind('<Down>', lambda e: self.move('down'))
+        self.bind_key('<Left>', lambda e: self.move('left'))
+        self.bind_key('<Right>', lambda e: self.move('right'))
+        self.bind_key('<Up>', lambda e: self.move('up'))
+        self.bind_key('<Down>', lambda e: self.move('down'))
+
+    @property
+    def grid(self):
+        return self.core.grid
+
+    @property
+    def score(self):
+        return self.core.score
 
     def play(self):
         self.frame.configure(bg=self.colors['bg'])
@@ -85,9 +142,9 @@ class Game2048(BaseGame):
         button_font_size = min(12, self.cell_size // 6)
         button_padding_x = self.cell_size // 4
         button_padding_y = self.cell_size // 8
-        self.restart_button = tk.Button(
-            self.frame,
-            text="Restart Game",
+        controls = tk.Frame(self.frame, bg=self.colors['bg'])
+        controls.pack(pady=self.padding * 2)
+        button_style = dict(
             font=('Helvetica', button_font_size, 'bold'),
             bg=self.colors['grid_bg'],
             fg=self.colors['text'],
@@ -97,177 +154,338 @@ class Game2048(BaseGame):
             borderwidth=0,
             padx=button_padding_x,
             pady=button_padding_y,
-            cursor='hand2',
-            command=self.restart_game
+            cursor='hand2'
+        )
+        self.restart_button = tk.Button(
+            controls,
+            text="Restart Game",
+            command=self.restart_game,
+            **button_style
         )
-        self.restart_button.pack(pady=self.padding * 2)
+        self.restart_button.pack(side='left', padx=self.padding)
+        self.hint_button = self.autopilot_button = None
+        if self.solver is not None:
+            self.create_solver_buttons(controls, button_style)
+
+        self.hint_label = tk.Label(
+            self.frame,
+            text="",
+            font=('Helvetica', button_font_size),
+            bg=self.colors['bg'],
+            fg=self.colors['text']
+        )
+        self.hint_label.pack()
 
         # Initialize game
-        self.add_new_tile()
-        self.add_new_tile()
+        self.draw_board()
+        self.enable_layout(self.canvas)
         self.display()
+        self.start_broadcast()
 
-    def add_new_tile(self):
-        empty_cells = [(i, j) for i in range(self.grid_size) 
-                      for j in range(self.grid_size) if self.grid[i][j] == 0]
-        if empty_cells:
-            i, j = random.choice(empty_cells)
-            self.grid[i][j] = 2 if random.random() < 0.9 else 4
+    def create_solver_buttons(self, controls, button_style):
+        self.hint_button = tk.Button(
+            controls,
+            text="Hint",
+            command=self.show_hint,
+            **button_style
+        )
+        self.hint_button.pack(side='left', padx=self.padding)
+        self.autopilot_button = tk.Button(
+            controls,
+            text="Autopilot",
+            command=self.toggle_autopilot,
+            **button_style
+        )
+        self.autopilot_button.pack(side='left', padx=self.padding)
 
     def move(self, direction):
         if self.game_over_flag:
             return
+        if self.queue_input(direction) and self.input_after_id is None:
+            # Keys already waiting in Tk's event queue get buffered first,
+            # then moves apply one per frame with one redraw each
+            self.input_after_id = self.schedule(0, self.process_input)
 
-        original_grid = [row[:] for row in self.grid]
-        shifted = False
-
-        if direction in ['left', 'right']:
-            for i in range(self.grid_size):
-                line = self.grid[i][:]
-                if direction == 'right':
-                    line.reverse()
-                new_line = self.merge_line(line)
-                if direction == 'right':
-                    new_line.reverse()
-                if line != new_line:
-                    shifted = True
-                self.grid[i] = new_line
-
-        else:  # up or down
-            for j in range(self.grid_size):
-                line = [self.grid[i][j] for i in range(self.grid_size)]
-                if direction == 'down':
-                    line.reverse()
-                new_line = self.merge_line(line)
-                if direction == 'down':
-                    new_line.reverse()
-                if line != new_line:
-                    shifted = True
-                for i in range(self.grid_size):
-                    self.grid[i][j] = new_line[i]
-
-        if shifted:
-            self.add_new_tile()
-            self.display()
+    def accept_input(self, direction, previous):
+        if previous is None:
+            # Moves that would not change the board are dropped
+            return direction in self.core.legal_actions()
+        return direction != previous
+
+    def process_input(self):
+        self.input_after_id = None
+        direction = self.next_input()
+        if direction is not None and not self.game_over_flag:
+            self.core.step(direction)
+        if self.input_queue and not self.game_over_flag:
+            self.input_after_id = self.schedule(self.input_interval, self.process_input)
+
+    def on_core_event(self, core, event):
+        if event == 'move':
+            self.hint_label.config(text="")
+            self.animate_move(core.last_action)
             if self.is_game_over():
+                self.animator.finish()
                 self.game_over()
 
-    def merge_line(self, line):
-        # Remove zeros
-        new_line = [x for x in line if x != 0]
-        # Merge identical pairs
-        for i in range(len(new_line) - 1):
-            if new_line[i] == new_line[i + 1]:
-                new_line[i] *= 2
-                self.score += new_line[i]
-                new_line.pop(i + 1)
-                new_line.append(0)
-        # Add zeros to maintain size
-        while len(new_line) < self.grid_size:
-            new_line.append(0)
-        return new_line
+    def animate_move(self, direction):
+        """Slide the tiles on screen to where ``direction`` moved them.
 
-    def display(self):
-        self.canvas.delete('all')
+        A move arriving while the previous one is still sliding lands that
+        one first, so held keys are never queued behind animations. The
+        core has already made the move, so a slide lands on the board it
+        was started for rather than on the core's current one.
+        """
+        self.animator.finish()
         self.score_label.config(text=f"Score: {self.score}")
-        
-        # Draw background grid
+        grid = [[self.drawn_values[(i, j)] for j in range(self.grid_size)]
+                for i in range(self.grid_size)]
+        moves = [move for move in tile_moves(grid, direction) if move[0] != move[1]]
+        if not moves or not self.animation_duration:
+            self.display()
+            return
+        board, final_grid = self.core.board, self.grid
+
+        paths = []
+        for source, destination, value in moves:
+            # The tile leaves its cell, the final board is drawn on landing
+            self.set_cell_value(source, 0)
+            image, label = self.take_slider(value)
+            x0, y0 = self.cell_bounds(*source)[:2]
+            x1, y1 = self.cell_bounds(*destination)[:2]
+            paths.append((image, label, x0, y0, x1 - x0, y1 - y0))
+        half = self.cell_size / 2
+
+        def update(progress):
+            for image, label, x, y, dx, dy in paths:
+                x += dx * progress
+                y += dy * progress
+                self.canvas.coords(image, x, y)
+                self.canvas.coords(label, x + half, y + half)
+
+        def on_finish():
+            self.release_sliders()
+            self.draw_grid(final_grid)
+            self.drawn_board = board
+
+        self.animator.start(self.animation_duration, update, on_finish)
+
+    def take_slider(self, value):
+        image, font = self.tile_style(value)
+        if self.slider_pool:
+            slider = self.slider_pool.pop()
+            self.canvas.itemconfig(slider[0], image=image, state='normal')
+            self.canvas.itemconfig(slider[1], text=str(value), font=font, state='normal')
+        else:
+            slider = (
+                self.canvas.create_image(0, 0, anchor='nw', image=image, tags='slider'),
+                self.canvas.create_text(0, 0, text=str(value), font=font,
+                                        fill=self.colors['text'], tags='slider')
+            )
+        self.active_sliders.append(slider)
+        return slider
+
+    def release_sliders(self):
+        for image, label in self.active_sliders:
+            self.canvas.itemconfig(image, state='hidden')
+            self.canvas.itemconfig(label, state='hidden')
+        self.slider_pool.extend(self.active_sliders)
+        self.active_sliders.clear()
+
+    def start_search(self, on_result):
+        """Search the current board off the main thread.
+
+        ``on_result`` is called on the Tk thread with the suggested direction,
+        unless the board changed while the search was running. A search
+        that fails suggests None, like a board without moves.
+        """
+        if self.search_thread is not None:
+            return
+        board = self.core.board
+
+        def worker():
+            try:
+                direction = self.solver.best_move(board)
+            except Exception:
+                # A dead worker pool must not leave poll_search waiting forever
+                direction = None
+            self.search_results.put((board, direction))
+
+        self.search_thread = threading.Thread(target=worker, daemon=True)
+        self.search_thread.start()
+        self.schedule(self.search_poll_interval, self.poll_search, on_result)
+
+    def poll_search(self, on_result):
+        try:
+            board, direction = self.search_results.get_nowait()
+        except queue.Empty:
+            self.schedule(self.search_poll_interval, self.poll_search, on_result)
+            return
+        self.search_thread = None
+        if self.game_over_flag:
+            return
+        if board == self.core.board:
+            on_result(direction)
+        elif self.autopilot:
+            # The board moved on while searching, search the new one
+            self.autopilot_step()
+
+    def show_hint(self):
+        arrows = {'left': '←', 'right': '→', 'up': '↑', 'down': '↓'}
+
+        def on_result(direction):
+            if direction is not None:
+                self.hint_label.config(text=f"Hint: {arrows[direction]}")
+
+        self.start_search(on_result)
+
+    def toggle_autopilot(self):
+        self.autopilot = not self.autopilot
+        self.autopilot_button.config(text="Stop" if self.autopilot else "Autopilot")
+        if self.autopilot:
+            self.autopilot_step()
+
+    def autopilot_step(self):
+        if not self.autopilot or self.game_over_flag:
+            return
+
+        def on_result(direction):
+            if not self.autopilot:
+                return
+            if direction is None:
+                # No move to make, hand control back to the player
+                self.toggle_autopilot()
+                return
+            self.move(direction)
+            self.schedule(self.autopilot_delay, self.autopilot_step)
+
+        self.start_search(on_result)
+
+    def dispose(self):
+        self.autopilot = False
+        if self.solver is not None:
+            self.solver.close()
+        super().dispose()
+
+    def cell_bounds(self, i, j):
+        x1 = j * self.cell_size + (j + 1) * self.padding
+        y1 = i * self.cell_size + (i + 1) * self.padding
+        return x1, y1, x1 + self.cell_size, y1 + self.cell_size
+
+    def draw_board(self):
+        """Create the static background and the persistent per-cell items"""
+        self.canvas.delete('all')
+        self.cell_items = {}
+        self.drawn_values = {}
+        self.drawn_board = None
+        self.tile_styles = {}
+        self.sprites.set_size(self.cell_size)
+        self.slider_pool = []
+        self.active_sliders = []
+
         for i in range(self.grid_size):
             for j in range(self.grid_size):
-                x1 = j * self.cell_size + (j + 1) * self.padding
-                y1 = i * self.cell_size + (i + 1) * self.padding
-                x2 = x1 + self.cell_size
-                y2 = y1 + self.cell_size
-                
-                # Draw empty cell background
-                self.rounded_rect(x1, y1, x2, y2, 10, self.colors['grid_bg'])
-
-        # Draw tiles
+                x1, y1, x2, y2 = self.cell_bounds(i, j)
+
+                # Empty cell background is only touched again on resize
+                self.canvas.create_image(x1, y1, anchor='nw',
+                                         image=self.tile_image(self.colors['grid_bg']),
+                                         tags='cell_bg')
+
+                # Tile and label stay hidden until the cell holds a value
+                tile = self.canvas.create_image(x1, y1, anchor='nw',
+                                                image=self.tile_image(self.colors[0]),
+                                                state='hidden')
+                label = self.canvas.create_text(
+                    (x1 + x2) / 2,
+                    (y1 + y2) / 2,
+                    text='',
+                    fill=self.colors['text'],
+                    state='hidden'
+                )
+                self.cell_items[(i, j)] = (tile, label)
+                self.drawn_values[(i, j)] = 0
+
+    def tile_style(self, value):
+        """Return the cached (image, font) pair used to draw a tile value"""
+        style = self.tile_styles.get(value)
+        if style is None:
+            color = self.colors.get(value) or self.big_tile_color(value)
+
+            # Shrink the font with the cell size and the number of digits
+            digits = len(str(value))
+            font_size = min(36, self.cell_size // max(2, 0.5 * digits + 1))
+            style = (self.tile_image(color), ('Helvetica', max(6, int(font_size)), 'bold'))
+            self.tile_styles[value] = style
+        return style
+
+    def tile_image(self, color):
+        size = round(self.cell_size)
+        return self.sprites.rounded_rect(size, size, round(self.corner_radius), color)
+
+    def on_layout(self, scale):
+        # The sliding tiles were placed for the old size, land them first
+        self.animator.finish()
+        self.cell_size, self.padding, self.corner_radius = (
+            value * scale for value in self.base_geometry)
+        self.sprites.set_size(self.cell_size)
+        self.tile_styles = {}
+        self.canvas.itemconfig('cell_bg', image=self.tile_image(self.colors['grid_bg']))
+        for cell, value in self.drawn_values.items():
+            if value:
+                image, font = self.tile_style(value)
+                tile, label = self.cell_items[cell]
+                self.canvas.itemconfig(tile, image=image)
+                self.canvas.itemconfig(label, font=font)
+
+    def big_tile_color(self, value):
+        """Colors past 2048 keep cycling through hues, getting darker"""
+        exponent = value.bit_length() - 1
+        hue = (exponent - 12) * 0.13 % 1.0
+        lightness = max(0.3, 0.6 - 0.02 * (exponent - 12))
+        r, g, b = colorsys.hls_to_rgb(hue, lightness, 0.8)
+        return f'#{int(r * 255):02x}{int(g * 255):02x}{int(b * 255):02x}'
+
+    def display(self):
+        self.score_label.config(text=f"Score: {self.score}")
+        if self.animator.active:
+            # The running slide draws the final board when it lands
+            return
+        if self.core.board == self.drawn_board:
+            return
+        self.drawn_board = self.core.board
+        self.draw_grid(self.grid)
+
+    def draw_grid(self, grid):
+        # Only touch the cells whose value changed since the last frame
         for i in range(self.grid_size):
             for j in range(self.grid_size):
-                x1 = j * self.cell_size + (j + 1) * self.padding
-                y1 = i * self.cell_size + (i + 1) * self.padding
-                x2 = x1 + self.cell_size
-                y2 = y1 + self.cell_size
-                
-                value = self.grid[i][j]
-                if value != 0:  # Only draw non-empty cells
-                    color = self.colors.get(value, self.colors[2048])
-                    
-                    # Create tile with rounded corners
-                    self.rounded_rect(x1, y1, x2, y2, 10, color)
-                    
-                    # Adjust font sizes in tiles based on cell size
-                    font_size = min(
-                        36,
-                        self.cell_size // 2 if value < 100 
-                        else self.cell_size // 2.5 if value < 1000 
-                        else self.cell_size // 3
-                    )
-                    self.canvas.create_text(
-                        (x1 + x2) / 2,
-                        (y1 + y2) / 2,
-                        text=str(value),
-                        font=('Helvetica', font_size, 'bold'),
-                        fill=self.colors['text']
-                    )
-
-    def rounded_rect(self, x1, y1, x2, y2, radius, color):
-        # Draw rounded rectangle
-        self.canvas.create_rectangle(
-            x1 + radius, y1,
-            x2 - radius, y2,
-            fill=color,
-            outline=""
-        )
-        self.canvas.create_rectangle(
-            x1, y1 + radius,
-            x2, y2 - radius,
-            fill=color,
-            outline=""
-        )
-        
-        # Draw corners
-        self.canvas.create_oval(
-            x1, y1,
-            x1 + 2*radius, y1 + 2*radius,
-            fill=color,
-            outline=""
-        )
-        self.canvas.create_oval(
-            x2 - 2*radius, y1,
-            x2, y1 + 2*radius,
-            fill=color,
-            outline=""
-        )
-        self.canvas.create_oval(
-            x1, y2 - 2*radius,
-            x1 + 2*radius, y2,
-            fill=color,
-            outline=""
-        )
-        self.canvas.create_oval(
-            x2 - 2*radius, y2 - 2*radius,
-            x2, y2,
-            fill=color,
-            outline=""
-        )
+                self.set_cell_value((i, j), grid[i][j])
+
+    def set_cell_value(self, cell, value):
+        if value == self.drawn_values[cell]:
+            return
+        self.drawn_values[cell] = value
+
+        tile, label = self.cell_items[cell]
+        if value == 0:
+            self.canvas.itemconfig(tile, state='hidden')
+            self.canvas.itemconfig(label, state='hidden')
+        else:
+            image, font = self.tile_style(value)
+            self.canvas.itemconfig(tile, image=image, state='normal')
+            self.canvas.itemconfig(label, text=str(value), font=font,
+                                   state='normal')
 
     def is_game_over(self):
-        if any(0 in row for row in self.grid):
-            return False
-        
-        # Check for possible merges
-        for i in range(self.grid_size):
-            for j in range(self.grid_size - 1):
-                if self.grid[i][j] == self.grid[i][j + 1]:
-                    return False
-                if self.grid[j][i] == self.grid[j + 1][i]:
-                    return False
-        return True
+        return self.core.is_game_over()
 
     def game_over(self):
         self.game_over_flag = True
+        self.save_replay()
+        self.record_score()
+        if self.autopilot:
+            self.toggle_autopilot()
         
         # Semi-transparent overlay
         self.canvas.create_rectangle(
@@ -275,31 +493,40 @@ class Game2048(BaseGame):
             self.canvas.winfo_width(),
             self.canvas.winfo_height(),
             fill='black',
-            stipple='gray50'
+            stipple='gray50',
+            tags='overlay'
         )
         
         # Game over text with shadow
         self.canvas.create_text(
             self.canvas.winfo_width() / 2 + 2,
             self.canvas.winfo_height() / 2 - 18,
-            text=f"Game Over!\nScore: {self.score}",
+            text=f"Game Over!\nScore: {self.score}\nBest: {self.best_score}",
             font=('Helvetica', 24, 'bold'),
             fill='black',
-            justify=tk.CENTER
+            justify=tk.CENTER,
+            tags='overlay'
         )
         self.canvas.create_text(
             self.canvas.winfo_width() / 2,
             self.canvas.winfo_height() / 2 - 20,
-            text=f"Game Over!\nScore: {self.score}",
+            text=f"Game Over!\nScore: {self.score}\nBest: {self.best_score}",
             font=('Helvetica', 24, 'bold'),
             fill=self.colors['text'],
-            justify=tk.CENTER
+            justify=tk.CENTER,
+            tags='overlay'
         )
 
-    def restart_game(self):
-        self.grid = [[0] * self.grid_size for _ in range(self.grid_size)]
-        self.score = 0
+    def restart(self, seed=None):
+        self.restart_game(seed)
+
+    def restart_game(self, seed=None):
+        self.animator.finish()
+        self.clear_input()
+        self.core.reset(seed)
         self.game_over_flag = False
-        self.add_new_tile()
-        self.add_new_tile()
+        self.hint_label.config(text="")
+        self.canvas.delete('overlay')
         self.display()
+        if self.autopilot:
+            self.autopilot_step()
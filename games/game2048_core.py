@@ -0,0 +1,487 @@
+from .action_log import read_varint, write_varint
+from .base_core import BaseCore
+
+# The 4x4 board is packed into a single 64-bit integer: each cell holds a
+# 4-bit exponent (0 = empty, 1 = 2, 2 = 4, ... 15 = 32768). Row r lives in
+# bits 16*r .. 16*r+15 and column c is the c-th nibble inside that row.
+SIZE = 4
+ROW_MASK = 0xFFFF
+MAX_EXPONENT = 15
+
+DIRECTIONS = ('left', 'right', 'up', 'down')
+
+# Lookup tables indexed by a 16-bit row, built lazily on first use
+_row_left = None
+_row_right = None
+_score_left = None
+_score_right = None
+
+
+def merge_plan(line):
+    """Where every tile of ``line`` slides when the line moves towards 0.
+
+    ``line`` holds tile values or exponents, 0 for an empty cell. Returns
+    ``(source, destination, merges)`` per tile, ``merges`` is true for the
+    second tile of a pair. This is the only place the merge rule lives:
+    the row tables, the NxN core and the slide animation all use it.
+    """
+    plan = []
+    dest = 0
+    waiting = None  # tile at dest - 1 that may still merge
+    for source, value in enumerate(line):
+        if not value:
+            continue
+        if value == waiting:
+            plan.append((source, dest - 1, True))
+            waiting = None
+        else:
+            plan.append((source, dest, False))
+            waiting = value
+            dest += 1
+    return plan
+
+
+def merge_exponents(line, max_exponent=None):
+    """Slide and merge a line of exponents towards index 0.
+
+    Returns the new line and the score gained. Merged exponents are capped
+    at ``max_exponent`` if given.
+    """
+    merged = [0] * len(line)
+    gained = 0
+    for source, dest, merges in merge_plan(line):
+        exponent = line[source]
+        if merges:
+            exponent += 1
+            if max_exponent is not None:
+                exponent = min(exponent, max_exponent)
+            gained += 1 << exponent
+        merged[dest] = exponent
+    return merged, gained
+
+
+def merge_line(line):
+    """Slide and merge a line of tile values towards index 0.
+
+    Returns the new line and the score gained by the merges.
+    """
+    merged, gained = merge_exponents([value.bit_length() - 1 if value else 0
+                                      for value in line])
+    return [1 << exponent if exponent else 0 for exponent in merged], gained
+
+
+def _reverse_row(row):
+    return (((row & 0xF) << 12) | ((row >> 4) & 0xF) << 8 |
+            ((row >> 8) & 0xF) << 4 | (row >> 12))
+
+
+def _build_tables():
+    global _row_left, _row_right, _score_left, _score_right
+    left = [0] * 65536
+    right = [0] * 65536
+    score = [0] * 65536
+    score_right = [0] * 65536
+
+    for row in range(65536):
+        line = [(row >> (4 * i)) & 0xF for i in range(4)]
+        # Two 32768 tiles cannot be represented, keep the cap
+        merged, gained = merge_exponents(line, MAX_EXPONENT)
+
+        result = 0
+        for i, exponent in enumerate(merged):
+            result |= exponent << (4 * i)
+        left[row] = result
+        score[row] = gained
+
+    for row in range(65536):
+        rev = _reverse_row(row)
+        right[row] = _reverse_row(left[rev])
+        score_right[row] = score[rev]
+
+    _row_left, _row_right = left, right
+    _score_left, _score_right = score, score_right
+
+
+def ensure_tables():
+    """Build the row lookup tables if they have not been built yet"""
+    if _row_left is None:
+        _build_tables()
+
+
+def row_tables():
+    """Return the ``(left, right, score_left, score_right)`` row tables"""
+    ensure_tables()
+    return _row_left, _row_right, _score_left, _score_right
+
+
+def transpose(board):
+    """Swap rows and columns of a packed board"""
+    a1 = board & 0xF0F00F0FF0F00F0F
+    a2 = board & 0x0000F0F00000F0F0
+    a3 = board & 0x0F0F00000F0F0000
+    a = a1 | (a2 << 12) | (a3 >> 12)
+    b1 = a & 0xFF00FF0000FF00FF
+    b2 = a & 0x00FF00FF00000000
+    b3 = a & 0x00000000FF00FF00
+    return b1 | (b2 >> 24) | (b3 << 24)
+
+
+def move_board(board, direction):
+    """Apply a move to a packed board.
+
+    Returns a ``(new_board, gained)`` tuple. The board is unchanged when the
+    move is not possible in that direction.
+    """
+    if _row_left is None:
+        _build_tables()
+
+    if direction == 'left' or direction == 'up':
+        table, score = _row_left, _score_left
+    else:
+        table, score = _row_right, _score_right
+    vertical = direction == 'up' or direction == 'down'
+    rows = transpose(board) if vertical else board
+
+    result = 0
+    gained = 0
+    for shift in (0, 16, 32, 48):
+        row = (rows >> shift) & ROW_MASK
+        result |= table[row] << shift
+        gained += score[row]
+
+    if vertical:
+        result = transpose(result)
+    return result, gained
+
+
+def count_empty(board):
+    """Count empty cells of a packed board"""
+    # Collapse every nibble into its lowest bit: 1 if the cell is occupied
+    board |= (board >> 2) & 0x3333333333333333
+    board |= board >> 1
+    board = ~board & 0x1111111111111111
+    return bin(board).count('1')
+
+
+def empty_cells(board):
+    """Return the nibble indexes (4*row + col) of empty cells"""
+    return [i for i in range(16) if not (board >> (4 * i)) & 0xF]
+
+
+def get_exponent(board, row, col):
+    return (board >> (4 * (SIZE * row + col))) & 0xF
+
+
+def set_exponent(board, row, col, exponent):
+    shift = 4 * (SIZE * row + col)
+    return (board & ~(0xF << shift)) | (exponent << shift)
+
+
+def max_exponent(board):
+    return max((board >> (4 * i)) & 0xF for i in range(16))
+
+
+def can_move(board):
+    """Check whether any move changes the board"""
+    if count_empty(board):
+        return True
+    for direction in DIRECTIONS:
+        if move_board(board, direction)[0] != board:
+            return True
+    return False
+
+
+def board_to_grid(board):
+    """Unpack a board into a list of rows holding tile values"""
+    grid = []
+    for row in range(SIZE):
+        line = []
+        for col in range(SIZE):
+            exponent = get_exponent(board, row, col)
+            line.append(1 << exponent if exponent else 0)
+        grid.append(line)
+    return grid
+
+
+def grid_to_board(grid):
+    """Pack a list of rows holding tile values into a board"""
+    board = 0
+    for row in range(SIZE):
+        for col in range(SIZE):
+            value = grid[row][col]
+            if value:
+                board = set_exponent(board, row, col, value.bit_length() - 1)
+    return board
+
+
+class Game2048Core(BaseCore):
+    """Headless 2048 rules working on a packed 64-bit board"""
+
+    game_id = '2048'
+
+    def __init__(self, seed=None):
+        super().__init__()
+        ensure_tables()
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        self.seed_game(seed)
+        self.board = 0
+        self.score = 0
+        self.add_new_tile()
+        self.add_new_tile()
+        if self.listeners:
+            self.notify('reset')
+
+    @property
+    def grid(self):
+        return board_to_grid(self.board)
+
+    def add_new_tile(self):
+        empty = empty_cells(self.board)
+        if empty:
+            index = self.random.choice(empty)
+            exponent = 1 if self.random.random() < 0.9 else 2
+            self.board |= exponent << (4 * index)
+
+    def move(self, direction):
+        """Apply a move and spawn a tile. Returns True if the board changed."""
+        new_board, gained = move_board(self.board, direction)
+        if new_board == self.board:
+            return False
+        self.board = new_board
+        self.score += gained
+        self.add_new_tile()
+        if self.listeners:
+            self.notify('move')
+        return True
+
+    def step(self, action):
+        self.record(action)
+        score = self.score
+        self.move(action)
+        return self.score - score, self.is_terminal()
+
+    def snapshot(self):
+        # The packed board and the score as two varints, at most 14 bytes
+        data = bytearray()
+        write_varint(data, self.board)
+        write_varint(data, self.score)
+        return bytes(data)
+
+    def restore(self, data):
+        board, pos = read_varint(data, 0)
+        score, pos = read_varint(data, pos)
+        if board >> 64 or pos != len(data):
+            raise ValueError("not a 2048 snapshot")
+        self.seed_game()
+        self.resumed = True
+        self.board = board
+        self.score = score
+        if self.listeners:
+            self.notify('reset')
+
+    def encode_action(self, action):
+        return DIRECTIONS.index(action)
+
+    def decode_action(self, code):
+        return DIRECTIONS[code]
+
+    def legal_actions(self):
+        return [d for d in DIRECTIONS if move_board(self.board, d)[0] != self.board]
+
+    def is_terminal(self):
+        return not can_move(self.board)
+
+    def is_game_over(self):
+        return self.is_terminal()
+
+
+def tile_moves(grid, direction):
+    """Where every tile of ``grid`` goes when it slides ``direction``.
+
+    ``grid`` is a list of rows of tile values of any size. Returns
+    ``(source, destination, value)`` tuples of (row, col) cells, two tiles
+    that merge share a destination. Used to animate a move.
+    """
+    size = len(grid)
+    moves = []
+    for k in range(size):
+        if direction in ('left', 'right'):
+            line = [(k, c) for c in range(size)]
+        else:
+            line = [(r, k) for r in range(size)]
+        if direction in ('right', 'down'):
+            line.reverse()
+
+        values = [grid[r][c] for r, c in line]
+        for source, dest, _ in merge_plan(values):
+            moves.append((line[source], line[dest], values[source]))
+    return moves
+
+
+class GridGame2048Core(BaseCore):
+    """2048 rules on an NxN board, for sizes the bitboard can't hold.
+
+    Cells are a flat list of exponents. Empty cells are kept in a
+    swap-remove array like the Snake free cells, and the number of equal
+    neighbouring tiles is updated as cells change, so spawning a tile and
+    detecting the end of the game only cost what the move changed.
+    """
+
+    game_id = '2048-grid'
+
+    def __init__(self, size=8, seed=None):
+        super().__init__()
+        if size < 2:
+            raise ValueError("the board needs at least 2x2 cells")
+        self.size = size
+        cells = size * size
+        self.neighbours = [
+            tuple(j for j in (i - size, i + size) if 0 <= j < cells) +
+            tuple(j for j in (i - 1, i + 1) if j // size == i // size and 0 <= j)
+            for i in range(cells)
+        ]
+        # Cell indexes of every line, in the order tiles slide for a move
+        rows = [list(range(r * size, (r + 1) * size)) for r in range(size)]
+        cols = [list(range(c, cells, size)) for c in range(size)]
+        self.lines = {
+            'left': rows,
+            'right': [line[::-1] for line in rows],
+            'up': cols,
+            'down': [line[::-1] for line in cols],
+        }
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        self.seed_game(seed)
+        self.clear()
+        self.add_new_tile()
+        self.add_new_tile()
+        if self.listeners:
+            self.notify('reset')
+
+    def clear(self):
+        cells = self.size * self.size
+        self.cells = [0] * cells
+        self.free_cells = list(range(cells))
+        self.free_index = list(range(cells))
+        # Neighbouring pairs of equal tiles, no moves are left at 0 and full
+        self.pairs = 0
+        self.score = 0
+
+    @property
+    def board(self):
+        """The cells as a tuple, for cheap change checks in views"""
+        return tuple(self.cells)
+
+    @property
+    def grid(self):
+        size = self.size
+        return [[1 << e if e else 0 for e in self.cells[r * size:(r + 1) * size]]
+                for r in range(size)]
+
+    def set_cell(self, index, exponent):
+        old = self.cells[index]
+        if old == exponent:
+            return
+        for neighbour in self.neighbours[index]:
+            value = self.cells[neighbour]
+            if value:
+                self.pairs += (value == exponent) - (value == old)
+        self.cells[index] = exponent
+
+        if not old:
+            # Swap-remove from the free cells
+            position = self.free_index[index]
+            last = self.free_cells.pop()
+            if last != index:
+                self.free_cells[position] = last
+                self.free_index[last] = position
+            self.free_index[index] = -1
+        elif not exponent:
+            self.free_index[index] = len(self.free_cells)
+            self.free_cells.append(index)
+
+    def add_new_tile(self):
+        if self.free_cells:
+            index = self.free_cells[self.random.randrange(len(self.free_cells))]
+            self.set_cell(index, 1 if self.random.random() < 0.9 else 2)
+
+    def move(self, direction):
+        """Apply a move and spawn a tile. Returns True if the board changed."""
+        cells = self.cells
+        gained = 0
+        changed = False
+        for line in self.lines[direction]:
+            values = [cells[i] for i in line]
+            merged, line_gain = merge_exponents(values)
+            if merged == values:
+                continue
+            changed = True
+            gained += line_gain
+            for index, old, new in zip(line, values, merged):
+                if old != new:
+                    self.set_cell(index, new)
+        if not changed:
+            return False
+        self.score += gained
+        self.add_new_tile()
+        if self.listeners:
+            self.notify('move')
+        return True
+
+    def step(self, action):
+        self.record(action)
+        score = self.score
+        self.move(action)
+        return self.score - score, self.is_terminal()
+
+    def snapshot(self):
+        # Exponents stay below 128, so every cell is a single byte
+        data = bytearray()
+        write_varint(data, self.size)
+        write_varint(data, self.score)
+        data += bytes(self.cells)
+        return bytes(data)
+
+    def restore(self, data):
+        size, pos = read_varint(data, 0)
+        if size != self.size:
+            raise ValueError(f"snapshot is for a {size}x{size} board")
+        score, pos = read_varint(data, pos)
+        if len(data) - pos != size * size:
+            raise ValueError("truncated 2048 snapshot")
+        self.seed_game()
+        self.resumed = True
+        self.clear()
+        self.score = score
+        for index, exponent in enumerate(data[pos:]):
+            self.set_cell(index, exponent)
+        if self.listeners:
+            self.notify('reset')
+
+    def options(self):
+        return (self.size,)
+
+    def encode_action(self, action):
+        return DIRECTIONS.index(action)
+
+    def decode_action(self, code):
+        return DIRECTIONS[code]
+
+    def legal_actions(self):
+        legal = []
+        for direction in DIRECTIONS:
+            for line in self.lines[direction]:
+                values = [self.cells[i] for i in line]
+                if merge_exponents(values)[0] != values:
+                    legal.append(direction)
+                    break
+        return legal
+
+    def is_terminal(self):
+        return not self.free_cells and not self.pairs
+
+    def is_game_over(self):
+        return self.is_terminal()
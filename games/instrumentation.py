@@ -0,0 +1,240 @@
+"""Per-frame instrumentation for game windows.
+
+``Instrumentation`` wraps a game's hot methods on the instance and records
+how long each call took:
+
+* ``display``, the render of a frame
+* ``update``, one step of game logic (``tick``, ``process_input``,
+  ``move`` or ``make_move``)
+* ``input``, from an input handler being called to the resulting frame
+  being drawn, idle redraws included
+
+Live canvas item counts are sampled along with an on-screen overlay, and
+everything is written as JSON and CSV when the game is closed. Enabled in
+``main.py`` by ``--profile`` or ``GAMECENTER_PROFILE``; ``--cprofile``
+additionally profiles the whole session with ``cProfile``.
+"""
+import cProfile
+import csv
+import functools
+import json
+import os
+import statistics
+import sys
+import time
+import tkinter as tk
+from collections import deque
+
+# Game methods that are timed when a game has them, by reported kind
+TIMED_METHODS = {
+    'display': 'display',
+    'tick': 'update',
+    'move': 'update',
+    'make_move': 'update',
+    'process_input': 'update',
+}
+
+# Methods called straight from key and mouse handlers
+INPUT_METHODS = ('move', 'change_direction', 'make_move')
+
+# Where dumps go unless GAMECENTER_PROFILE_DIR says otherwise
+DEFAULT_DIRECTORY = 'profiles'
+
+
+def output_directory():
+    directory = os.environ.get('GAMECENTER_PROFILE_DIR', DEFAULT_DIRECTORY)
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+
+def summarize(values):
+    """Count, mean, median, 95th percentile and max of timings in ms"""
+    if not values:
+        return {'count': 0}
+    ordered = sorted(values)
+    return {
+        'count': len(ordered),
+        'mean_ms': statistics.fmean(ordered),
+        'p50_ms': ordered[len(ordered) // 2],
+        'p95_ms': ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        'max_ms': ordered[-1],
+    }
+
+
+class Instrumentation:
+    # Overlay refresh interval, also how often canvas items are counted
+    overlay_interval = 500
+    # Samples kept per session, the oldest are dropped past this
+    max_samples = 100000
+
+    def __init__(self, game, name, overlay=True):
+        self.game = game
+        self.name = name
+        self.overlay = overlay
+        self.start = time.perf_counter()
+        # (seconds since start, kind, milliseconds)
+        self.samples = deque(maxlen=self.max_samples)
+        self.pending_input = None
+        self.input_check_scheduled = False
+        self.overlay_label = None
+        self.overlay_after_id = None
+
+    def attach(self):
+        """Wrap the game's methods, call before ``game.play()``"""
+        game = self.game
+        for method, kind in TIMED_METHODS.items():
+            if hasattr(game, method):
+                setattr(game, method, self.timed(getattr(game, method), kind))
+        for method in INPUT_METHODS:
+            if hasattr(game, method):
+                setattr(game, method, self.input_handler(getattr(game, method)))
+
+        dispose = game.dispose
+
+        @functools.wraps(dispose)
+        def instrumented_dispose():
+            if not game.disposed:
+                self.detach()
+            dispose()
+
+        game.dispose = instrumented_dispose
+        if self.overlay:
+            self.overlay_label = tk.Label(game.master, font=('Courier', 9),
+                                          bg='#000000', fg='#50FA7B',
+                                          justify='left', anchor='nw')
+            self.overlay_label.place(x=4, y=4)
+            self.refresh_overlay()
+        return self
+
+    def timed(self, method, kind):
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            # Nested calls are recorded too, a 2048 move includes its display
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                end = time.perf_counter()
+                self.samples.append((start - self.start, kind, (end - start) * 1000))
+                if self.pending_input is not None and not self.input_check_scheduled:
+                    self.input_check_scheduled = True
+                    self.game.master.after_idle(self.finish_input)
+        return wrapper
+
+    def input_handler(self, method):
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            if self.pending_input is None:
+                self.pending_input = time.perf_counter()
+            return method(*args, **kwargs)
+        return wrapper
+
+    def finish_input(self):
+        """Close the latency of the oldest unanswered input.
+
+        Runs once the event that did the work has returned; flushing the
+        idle queue makes Tk draw the frame before the clock is read.
+        """
+        self.input_check_scheduled = False
+        if self.pending_input is None:
+            return
+        try:
+            self.game.master.update_idletasks()
+        except tk.TclError:
+            return
+        now = time.perf_counter()
+        self.samples.append((self.pending_input - self.start, 'input',
+                             (now - self.pending_input) * 1000))
+        self.pending_input = None
+
+    def canvas_items(self):
+        canvas = getattr(self.game, 'canvas', None)
+        if canvas is None:
+            return None
+        try:
+            return len(canvas.find_all())
+        except tk.TclError:
+            return None
+
+    def values(self, kind, since=None):
+        return [ms for t, k, ms in self.samples
+                if k == kind and (since is None or t >= since)]
+
+    def refresh_overlay(self):
+        self.overlay_after_id = None
+        now = time.perf_counter() - self.start
+        since = now - 5
+        items = self.canvas_items()
+        if items is not None:
+            self.samples.append((now, 'items', items))
+
+        lines = []
+        for kind in ('display', 'update', 'input'):
+            stats = summarize(self.values(kind, since))
+            if stats['count']:
+                lines.append(f"{kind:<8}{stats['mean_ms']:6.2f} ms  "
+                             f"p95 {stats['p95_ms']:6.2f}  max {stats['max_ms']:6.2f}")
+        frames = len(self.values('display', since))
+        lines.append(f"fps {frames / min(5, now or 1):5.1f}  items {items if items is not None else '-'}")
+        self.overlay_label.config(text="\n".join(lines))
+        self.overlay_label.lift()
+        self.overlay_after_id = self.game.master.after(self.overlay_interval,
+                                                       self.refresh_overlay)
+
+    def summary(self):
+        summary = {kind: summarize(self.values(kind))
+                   for kind in ('display', 'update', 'input')}
+        items = self.values('items')
+        summary['canvas_items'] = {'last': items[-1], 'max': max(items)} if items else {}
+        return summary
+
+    def detach(self):
+        """Stop the overlay and write the session's dump files"""
+        if self.overlay_after_id is not None:
+            try:
+                self.game.master.after_cancel(self.overlay_after_id)
+            except tk.TclError:
+                pass
+            self.overlay_after_id = None
+        paths = self.dump()
+        print(f"instrumentation: {self.name} written to {', '.join(paths)}",
+              file=sys.stderr)
+
+    def dump(self, directory=None):
+        """Write ``<game>-<time>.json`` and ``.csv``, return their paths"""
+        directory = directory or output_directory()
+        stem = f"{self.name.replace(' ', '_').lower()}-{time.strftime('%Y%m%d-%H%M%S')}"
+        json_path = os.path.join(directory, stem + '.json')
+        csv_path = os.path.join(directory, stem + '.csv')
+
+        with open(json_path, 'w') as f:
+            json.dump({
+                'game': self.name,
+                'duration_s': time.perf_counter() - self.start,
+                'summary': self.summary(),
+                'samples': list(self.samples),
+            }, f, indent=1)
+        with open(csv_path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(('time_s', 'kind', 'value'))
+            writer.writerows(self.samples)
+        return json_path, csv_path
+
+
+class SessionProfiler:
+    """cProfile capture of everything the Tk thread runs"""
+
+    def __init__(self):
+        self.profile = cProfile.Profile()
+
+    def start(self):
+        self.profile.enable()
+
+    def stop(self, directory=None):
+        """Stop profiling and write a ``.prof`` file for ``pstats``"""
+        self.profile.disable()
+        directory = directory or output_directory()
+        path = os.path.join(directory, f"session-{time.strftime('%Y%m%d-%H%M%S')}.prof")
+        self.profile.dump_stats(path)
+        print(f"instrumentation: cProfile stats written to {path}", file=sys.stderr)
+        return path
@@ -0,0 +1,92 @@
+"""Scale a game's board with its window.
+
+Dragging a window edge makes Tk send a <Configure> event for nearly every
+pixel. A ``Layout`` waits until they stop for ``delay`` ms, then works out
+one scale for the new window size and hands it to ``game.on_layout``.
+A canvas board is scaled in place with ``canvas.scale``, so a resize
+moves the existing items instead of rebuilding them; the game only swaps
+in sprites and fonts for the new cell size.
+"""
+import tkinter as tk
+
+
+class Layout:
+    """Fit ``widget``, a canvas or a frame, into the room its window leaves.
+
+    The window opens at scale 1: the first time it is configured the board
+    size and the space taken by everything else are measured, and the
+    window's minimum size is lowered so it can shrink to ``min_scale``.
+    Scales are rounded to ``step``, so small drags don't resize anything,
+    and the scale for each window size is kept in ``scales``.
+    """
+
+    delay = 120
+    step = 0.05
+    min_scale = 0.5
+    max_scale = 3.0
+
+    def __init__(self, game, widget):
+        self.game = game
+        self.widget = widget
+        self.scale = 1.0
+        # Board size at scale 1 and window space around it, see measure()
+        self.base_size = None
+        self.chrome = None
+        # Canvas width and height options at scale 1
+        self.canvas_size = None
+        self.window_size = None
+        self.scales = {}
+        self.after_id = None
+        # Resizes applied, for profiling
+        self.resizes = 0
+        game.bind_key('<Configure>', self.on_configure)
+
+    def on_configure(self, event):
+        if event.widget is not self.game.master:
+            # Every child's <Configure> reaches the window's bindings too
+            return
+        size = (event.width, event.height)
+        if size == self.window_size:
+            return
+        self.window_size = size
+        if self.base_size is None:
+            self.measure()
+            return
+        self.game.cancel(self.after_id)
+        self.after_id = self.game.schedule(self.delay, self.apply)
+
+    def measure(self):
+        widget = self.widget
+        self.base_size = (max(1, widget.winfo_reqwidth()), max(1, widget.winfo_reqheight()))
+        self.chrome = tuple(max(0, window - board)
+                            for window, board in zip(self.window_size, self.base_size))
+        if isinstance(widget, tk.Canvas):
+            self.canvas_size = (int(widget.cget('width')), int(widget.cget('height')))
+        self.game.master.minsize(*(round(chrome + board * self.min_scale)
+                                   for chrome, board in zip(self.chrome, self.base_size)))
+
+    def fit(self, width, height):
+        """Board scale for a window of ``width`` x ``height``"""
+        key = (width, height)
+        scale = self.scales.get(key)
+        if scale is None:
+            scale = min((width - self.chrome[0]) / self.base_size[0],
+                        (height - self.chrome[1]) / self.base_size[1])
+            scale = round(round(scale / self.step) * self.step, 2)
+            scale = self.scales[key] = min(self.max_scale, max(self.min_scale, scale))
+        return scale
+
+    def apply(self):
+        self.after_id = None
+        scale = self.fit(*self.window_size)
+        if scale == self.scale:
+            return
+        factor = scale / self.scale
+        self.scale = scale
+        widget = self.widget
+        if isinstance(widget, tk.Canvas):
+            widget.scale('all', 0, 0, factor, factor)
+            widget.config(width=round(self.canvas_size[0] * scale),
+                          height=round(self.canvas_size[1] * scale))
+        self.game.on_layout(scale)
+        self.resizes += 1
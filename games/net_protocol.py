@@ -0,0 +1,128 @@
+"""Wire format shared by the relay server and the game clients.
+
+Every message is a frame: a 4-byte big-endian payload length, then the
+payload. A payload is one byte of message kind followed by that kind's
+fields, integers as unsigned varints and text as a varint length plus
+UTF-8. Fields per kind::
+
+    HELLO   game id (text), option count, option...   client joins a match
+    START   seat, seed, input delay                   server, match is on
+    MOVE    tick, seat, action code                   either way
+    LEAVE   seat                                      server, opponent left
+    ERROR   message (text)                            server, then it hangs up
+    PUBLISH channel (text)                            game streams a session
+    WATCH   channel (text)                            viewer follows one
+    STATE   game id (text), seq, value count, value... whole game, keyframe
+    DELTA   seq, value count, value...                change since seq - 1
+    ACK     message count                             viewer, applied that many more
+
+For Tic Tac Toe a MOVE's tick is the move number and its code the cell
+``row * cols + col``; the server checks it and sends it back to both
+seats, which is when the clients apply it. For Snake the code is the
+player's turn for that tick (0 for none, else a DIRECTIONS index + 1) and
+the server relays it to the other seat.
+
+PUBLISH, WATCH, STATE, DELTA and ACK belong to the broadcast server, their
+values are laid out by the mirrors in games.broadcast.
+"""
+import struct
+
+from .action_log import read_varint, write_varint
+
+HELLO, START, MOVE, LEAVE, ERROR, PUBLISH, WATCH, STATE, DELTA, ACK = range(1, 11)
+
+# Field layout per kind: 'i' for an integer, 's' for text, '*' for an
+# integer count followed by that many integers
+FIELDS = {
+    HELLO: 's*',
+    START: 'iii',
+    MOVE: 'iii',
+    LEAVE: 'i',
+    ERROR: 's',
+    PUBLISH: 's',
+    WATCH: 's',
+    STATE: 'si*',
+    DELTA: 'i*',
+    ACK: 'i',
+}
+
+# Frames larger than this are a protocol error rather than a message
+MAX_FRAME = 1 << 16
+
+HEADER = struct.Struct('>I')
+
+
+def encode(kind, *fields):
+    """Frame bytes for one message"""
+    payload = bytearray([kind])
+    for layout, value in zip(FIELDS[kind], fields):
+        if layout == 's':
+            text = value.encode('utf-8')
+            write_varint(payload, len(text))
+            payload += text
+        elif layout == '*':
+            write_varint(payload, len(value))
+            for item in value:
+                write_varint(payload, item)
+        else:
+            write_varint(payload, value)
+    return HEADER.pack(len(payload)) + payload
+
+
+def decode(payload):
+    """``(kind, fields)`` from a payload, raises ValueError if malformed"""
+    if not payload or payload[0] not in FIELDS:
+        raise ValueError("unknown message kind")
+    kind = payload[0]
+    pos = 1
+    fields = []
+    for layout in FIELDS[kind]:
+        if layout == 's':
+            length, pos = read_varint(payload, pos)
+            if pos + length > len(payload):
+                raise ValueError("truncated message")
+            fields.append(bytes(payload[pos:pos + length]).decode('utf-8'))
+            pos += length
+        elif layout == '*':
+            count, pos = read_varint(payload, pos)
+            items = []
+            for _ in range(count):
+                item, pos = read_varint(payload, pos)
+                items.append(item)
+            fields.append(tuple(items))
+        else:
+            value, pos = read_varint(payload, pos)
+            fields.append(value)
+    if pos != len(payload):
+        raise ValueError("trailing bytes in message")
+    return kind, fields
+
+
+async def read_message(reader):
+    """Next ``(kind, fields)`` from an asyncio stream.
+
+    Raises ``asyncio.IncompleteReadError`` when the peer hangs up.
+    """
+    header = await reader.readexactly(HEADER.size)
+    (length,) = HEADER.unpack(header)
+    if length > MAX_FRAME:
+        raise ValueError("frame too large")
+    return decode(await reader.readexactly(length))
+
+
+def take_messages(buffer):
+    """Decode every complete frame at the start of ``buffer`` (a
+    bytearray) and remove them from it, a partial frame stays"""
+    messages = []
+    pos = 0
+    while len(buffer) - pos >= HEADER.size:
+        (length,) = HEADER.unpack_from(buffer, pos)
+        if length > MAX_FRAME:
+            raise ValueError("frame too large")
+        end = pos + HEADER.size + length
+        if end > len(buffer):
+            break
+        messages.append(decode(buffer[pos + HEADER.size:end]))
+        pos = end
+    del buffer[:pos]
+    return messages
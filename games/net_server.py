@@ -0,0 +1,202 @@
+"""Match-making relay for two-player network games.
+
+Clients say HELLO with a game id and options. The first client for a
+setup waits, the second starts a match: both get START with their seat
+and a shared RNG seed. Tic Tac Toe moves are checked against a server
+side core and echoed to both seats, so the server decides what was
+played. Snake turns are relayed to the other seat as they come; each
+client simulates the game itself (see games.netplay).
+
+HELLO options are checked against ``OPTION_LIMITS`` before any core is
+built, and a client that stops reading is disconnected once its unsent
+output passes ``Match.high_water``.
+
+Usage::
+
+    python -m games.net_server [--host 127.0.0.1] [--port 8765]
+"""
+import argparse
+import asyncio
+import random
+
+from . import net_protocol as proto
+from .arena_core import MAX_SNAKES, ArenaCore
+from .tictactoe_core import TicTacToeCore
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+
+CORES = {
+    TicTacToeCore.game_id: TicTacToeCore,
+    ArenaCore.game_id: ArenaCore,
+}
+
+# Inclusive (low, high) range of every option a HELLO must carry, in
+# constructor order. Cores allocate per cell, so sizes are capped here.
+OPTION_LIMITS = {
+    # rows, cols, win length
+    TicTacToeCore.game_id: ((3, 19), (3, 19), (3, 19)),
+    # board size, snakes, food, players
+    ArenaCore.game_id: ((8, 128), (2, MAX_SNAKES), (0, 256), (2, 2)),
+}
+
+
+def check_options(game_id, options):
+    """Raise ValueError unless ``options`` are within the game's limits"""
+    limits = OPTION_LIMITS[game_id]
+    if len(options) != len(limits):
+        raise ValueError(f"{game_id} takes {len(limits)} options, got {len(options)}")
+    for position, (value, (low, high)) in enumerate(zip(options, limits)):
+        if not low <= value <= high:
+            raise ValueError(f"{game_id} option {position} must be "
+                             f"{low} to {high}, got {value}")
+
+
+class Match:
+    # Bytes a seat may leave unread before it is disconnected. Moves can't
+    # be dropped without the seats drifting apart, so a peer that stops
+    # reading is cut off instead of buffered without end.
+    high_water = 64 * 1024
+
+    def __init__(self, game_id, options, input_delay):
+        self.game_id = game_id
+        self.options = options
+        self.input_delay = input_delay
+        self.seed = random.getrandbits(32)
+        self.writers = []
+        # Only Tic Tac Toe is refereed, Snake turns are relayed as they are
+        self.core = None
+        if game_id == TicTacToeCore.game_id:
+            self.core = TicTacToeCore(*options)
+            self.core.reset(self.seed)
+        # Next tick expected from each seat, relayed ticks only go forward
+        self.next_tick = [0, 0]
+
+    def send(self, seat, kind, *fields):
+        writer = self.writers[seat]
+        if writer.is_closing():
+            return
+        writer.write(proto.encode(kind, *fields))
+        if writer.transport.get_write_buffer_size() > self.high_water:
+            # Its handler sees the connection drop and leaves the match
+            writer.close()
+
+    def broadcast(self, kind, *fields):
+        for seat in range(len(self.writers)):
+            self.send(seat, kind, *fields)
+
+    def move(self, seat, tick, code):
+        if self.core is None:
+            if tick < self.next_tick[seat]:
+                return
+            self.next_tick[seat] = tick + 1
+            self.send(1 - seat, proto.MOVE, tick, seat, code)
+            return
+
+        core = self.core
+        row, col = divmod(code, core.cols)
+        turn = 0 if core.current_player == 'X' else 1
+        if (seat != turn or tick != core.move_count or core.is_terminal()
+                or not 0 <= row < core.rows or core.board[row][col] != ' '):
+            # Out of turn or stale, the client waits for the echo anyway
+            return
+        core.step((row, col))
+        self.broadcast(proto.MOVE, tick, seat, code)
+
+
+class RelayServer:
+    # Ticks a Snake client plays its own turns late, hiding the round trip
+    input_delay = 3
+
+    def __init__(self):
+        self.waiting = {}
+        self.matches = set()
+        self.server = None
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        self.server = await asyncio.start_server(self.handle, host, port)
+        return self.server
+
+    @property
+    def port(self):
+        return self.server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def handle(self, reader, writer):
+        match = seat = None
+        try:
+            kind, fields = await proto.read_message(reader)
+            if kind != proto.HELLO:
+                raise ValueError("expected HELLO")
+            match, seat = self.join(writer, *fields)
+            while True:
+                kind, fields = await proto.read_message(reader)
+                if kind == proto.MOVE and len(match.writers) == 2:
+                    tick, _, code = fields
+                    match.move(seat, tick, code)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except ValueError as error:
+            writer.write(proto.encode(proto.ERROR, str(error)))
+        finally:
+            self.leave(match, seat)
+            writer.close()
+
+    def join(self, writer, game_id, options):
+        if game_id not in CORES:
+            raise ValueError(f"unknown game {game_id!r}")
+        check_options(game_id, options)
+        # Building a core checks that the options fit together
+        try:
+            CORES[game_id](*options)
+        except (TypeError, ValueError) as error:
+            raise ValueError(f"bad options for {game_id}: {error}")
+
+        key = (game_id, options)
+        match = self.waiting.pop(key, None)
+        if match is None:
+            match = self.waiting[key] = Match(game_id, options, self.input_delay)
+            match.writers.append(writer)
+            return match, 0
+        match.writers.append(writer)
+        self.matches.add(match)
+        for seat in range(2):
+            match.send(seat, proto.START, seat, match.seed, match.input_delay)
+        return match, 1
+
+    def leave(self, match, seat):
+        if match is None:
+            return
+        key = (match.game_id, match.options)
+        if self.waiting.get(key) is match:
+            del self.waiting[key]
+        if match in self.matches:
+            self.matches.discard(match)
+            match.send(1 - seat, proto.LEAVE, seat)
+
+
+async def serve(host, port):
+    server = RelayServer()
+    await server.start(host, port)
+    print(f"relay listening on {host}:{server.port}")
+    async with server.server:
+        await server.server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,218 @@
+"""Client side of network play: connection, Tk pumping and Snake rollback.
+
+``NetClient`` talks to ``games.net_server`` over asyncio streams. A Tk
+game has no thread for asyncio, so ``AsyncioPump`` runs the event loop in
+short non-blocking slices from the game's ``schedule``: each slice handles
+whatever socket I/O and callbacks are ready and returns to Tk at once.
+
+Snake runs the same deterministic simulation on both clients. Each
+client plays its own turns ``input_delay`` ticks late and sends them right
+away, so on a quick connection the opponent's turn for a tick arrives
+before that tick is simulated. When it doesn't, ``RollbackSession``
+predicts no turn, keeps going, and if the real turn differs it rewinds to
+the saved state of that tick and re-simulates up to the present.
+"""
+import asyncio
+import os
+
+from . import net_protocol as proto
+from .snake_core import DIRECTIONS
+
+# Server picked when the environment does not name one
+DEFAULT_SERVER = ('127.0.0.1', 8765)
+
+
+def server_address(host=None, port=None):
+    """``host, port`` from the arguments or $GAMECENTER_SERVER ("host:port")"""
+    if host is None:
+        address = os.environ.get('GAMECENTER_SERVER')
+        if address:
+            host, _, port_text = address.rpartition(':')
+            port = port or int(port_text)
+        else:
+            host = DEFAULT_SERVER[0]
+    return host, port or DEFAULT_SERVER[1]
+
+
+class NetClient:
+    """One connection to the relay, reporting messages to ``on_message``.
+
+    ``on_message(kind, fields)`` gets every message from the server. A
+    lost or refused connection is reported as an ERROR message.
+    """
+
+    def __init__(self, game_id, options, on_message):
+        self.game_id = game_id
+        self.options = tuple(options)
+        self.on_message = on_message
+        self.writer = None
+        self.task = None
+        self.closed = False
+
+    async def connect(self, host, port):
+        try:
+            reader, self.writer = await asyncio.open_connection(host, port)
+        except OSError as error:
+            self.on_message(proto.ERROR, [f"can't reach {host}:{port}: {error.strerror}"])
+            return
+        self.send(proto.HELLO, self.game_id, self.options)
+        self.task = asyncio.ensure_future(self.receive(reader))
+
+    async def receive(self, reader):
+        try:
+            while True:
+                kind, fields = await proto.read_message(reader)
+                self.on_message(kind, fields)
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            if not self.closed:
+                self.on_message(proto.ERROR, ["connection to the server lost"])
+
+    def send(self, kind, *fields):
+        if self.writer is not None and not self.writer.is_closing():
+            self.writer.write(proto.encode(kind, *fields))
+
+    def close(self):
+        self.closed = True
+        if self.task is not None:
+            self.task.cancel()
+        if self.writer is not None:
+            self.writer.close()
+
+
+class AsyncioPump:
+    """Drive an asyncio loop from a Tk game without blocking its mainloop"""
+
+    def __init__(self, game, interval=10):
+        self.game = game
+        self.interval = interval
+        self.loop = asyncio.new_event_loop()
+        self.after_id = None
+        # The loop only holds weak references to tasks, these keep them alive
+        self.tasks = set()
+
+    def start(self):
+        # The game's cancel_all may have dropped our callback, check for it
+        if self.after_id not in self.game.after_ids:
+            self.after_id = self.game.schedule(self.interval, self.pump)
+
+    def run(self, coroutine):
+        """Start ``coroutine`` on the loop, it makes progress as we pump"""
+        self.start()
+        task = self.loop.create_task(coroutine)
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        return task
+
+    def pump(self):
+        self.after_id = None
+        # stop() queued first makes run_forever return after one pass
+        self.loop.call_soon(self.loop.stop)
+        self.loop.run_forever()
+        if not self.loop.is_closed():
+            self.start()
+
+    def close(self):
+        if self.after_id is not None:
+            self.game.cancel(self.after_id)
+            self.after_id = None
+        if self.loop.is_closed():
+            return
+        tasks = asyncio.all_tasks(self.loop)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            self.loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        self.loop.close()
+
+
+def encode_turn(direction):
+    return 0 if direction is None else DIRECTIONS.index(direction) + 1
+
+
+def decode_turn(code):
+    return DIRECTIONS[code - 1] if code else None
+
+
+class RollbackSession:
+    """Lockstep with input delay and rollback for a two-player ArenaCore.
+
+    ``send(tick, code)`` is called with the local player's turn for every
+    tick, the opponent's turns go to ``receive``. ``advance`` simulates one
+    tick and returns False instead when it would run more than
+    ``max_ahead`` ticks past the opponent's last known turn.
+    """
+
+    max_ahead = 8
+
+    def __init__(self, core, seat, input_delay, send):
+        self.core = core
+        self.seat = seat
+        self.input_delay = input_delay
+        self.send = send
+        self.tick = 0
+        self.local = {}
+        self.remote = {}
+        # Nobody turns before the first delayed input, those ticks are known
+        self.remote_tick = input_delay
+        # Opponent turn each simulated tick used, and the state before it
+        self.used = {}
+        self.history = {}
+        self.rollbacks = 0
+
+    @property
+    def finished(self):
+        """The game is over and no late turn of the opponent can undo it"""
+        return self.core.done and self.tick <= self.remote_tick
+
+    @property
+    def stalled(self):
+        """Too far ahead of the opponent to simulate another tick"""
+        return self.tick - self.remote_tick >= self.max_ahead
+
+    def advance(self, direction):
+        if self.core.done or self.stalled:
+            return False
+        target = self.tick + self.input_delay
+        self.local[target] = direction
+        self.send(target, encode_turn(direction))
+        self.simulate()
+        return True
+
+    def simulate(self):
+        tick = self.tick
+        theirs = self.remote.get(tick)
+        self.used[tick] = theirs
+        core = self.core
+        self.history[tick] = (core.snapshot(), core.random.getstate())
+        actions = [None, None]
+        actions[self.seat] = self.local.get(tick)
+        actions[1 - self.seat] = theirs
+        core.step(tuple(actions))
+        self.tick += 1
+
+    def receive(self, tick, code):
+        """Take the opponent's turn for ``tick``, rolling back if we guessed
+        wrong"""
+        direction = decode_turn(code)
+        self.remote[tick] = direction
+        self.remote_tick = max(self.remote_tick, tick + 1)
+        if tick < self.tick and self.used.get(tick) != direction:
+            self.rollback(tick)
+        self.forget()
+
+    def rollback(self, tick):
+        snapshot, state = self.history[tick]
+        self.core.restore(snapshot)
+        self.core.random.setstate(state)
+        present = self.tick
+        self.tick = tick
+        while self.tick < present and not self.core.done:
+            self.simulate()
+        self.rollbacks += 1
+
+    def forget(self):
+        """Drop saved states that no turn can roll back to any more"""
+        settled = min(self.remote_tick, self.tick)
+        for table in (self.history, self.used, self.remote, self.local):
+            for tick in [t for t in table if t < settled]:
+                del table[tick]
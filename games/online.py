@@ -0,0 +1,194 @@
+"""Two-player Tic Tac Toe and Snake against an opponent on the relay server.
+
+Start the server with ``python -m games.net_server`` and point the game
+center at it with GAMECENTER_SERVER=host:port (default 127.0.0.1:8765).
+Each window looks for an opponent when it opens; a second window on the
+same or another machine completes the match.
+"""
+from . import net_protocol as proto
+from .arena import Arena
+from .netplay import AsyncioPump, NetClient, RollbackSession, server_address
+from .tictactoe import TicTacToe
+
+
+class OnlineGame:
+    """Connection handling shared by the online views.
+
+    Subclasses call ``connect`` once their UI exists and implement
+    ``on_start``, ``on_move``, ``on_disconnect`` and ``show_status``.
+    """
+
+    client = None
+    pump = None
+
+    def connect(self):
+        """Drop any previous connection and wait for a new opponent"""
+        if self.client is not None:
+            self.client.close()
+        self.client = NetClient(self.core.game_id, self.core.options(), self.on_message)
+        if self.pump is None:
+            self.pump = AsyncioPump(self)
+        self.pump.run(self.client.connect(*server_address()))
+        self.show_status("Waiting for an opponent...")
+
+    def on_message(self, kind, fields):
+        if self.disposed:
+            return
+        if kind == proto.START:
+            self.on_start(*fields)
+        elif kind == proto.MOVE:
+            self.on_move(*fields)
+        elif kind == proto.LEAVE:
+            self.on_disconnect("Your opponent left")
+        elif kind == proto.ERROR:
+            self.on_disconnect(fields[0])
+
+    def dispose(self):
+        if self.disposed:
+            return
+        super().dispose()
+        if self.client is not None:
+            self.client.close()
+        if self.pump is not None:
+            self.pump.close()
+
+
+class OnlineTicTacToe(OnlineGame, TicTacToe):
+    """Tic Tac Toe where the server referees the moves.
+
+    A click only sends the move. It is drawn once the server echoes it, so
+    both windows always show the board the server has.
+    """
+
+    def __init__(self, master, rows=3, cols=3, win_length=3):
+        super().__init__(master, rows, cols, win_length)
+        self.master.title(self.master.title() + " - Online")
+        self.seat = None
+
+    def play(self):
+        # Restarting means finding a new match, so both go through here
+        self.seat = None
+        self.game_active = False
+        TicTacToe.play(self)
+        # Always two players
+        self.mode_button.pack_forget()
+        self.connect()
+
+    def show_status(self, text):
+        self.status.configure(text=text, fg=self.colors['text'])
+
+    @property
+    def mark(self):
+        return 'XO'[self.seat]
+
+    def make_move(self, row, col):
+        if (self.seat is None or not self.game_active or self.current_player != self.mark
+                or self.board[row][col] != ' '):
+            return
+        self.client.send(proto.MOVE, self.core.move_count, self.seat,
+                         row * self.core.cols + col)
+
+    def on_start(self, seat, seed, input_delay):
+        self.initialize_game(seed)
+        TicTacToe.play(self)
+        self.mode_button.pack_forget()
+        self.seat = seat
+        self.show_status(f"You are {self.mark}, X starts")
+
+    def on_move(self, tick, seat, code):
+        if tick == self.core.move_count:
+            self.core.step(divmod(code, self.core.cols))
+
+    def on_core_event(self, core, event):
+        super().on_core_event(core, event)
+        if event == 'move' and not core.is_terminal():
+            turn = "your" if core.current_player == self.mark else "their"
+            self.status.configure(text=f"You are {self.mark}, {turn} turn")
+
+    def on_disconnect(self, reason):
+        if not self.core.is_terminal():
+            self.game_active = False
+            self.show_status(reason)
+
+
+class OnlineSnake(OnlineGame, Arena):
+    """Two snakes, one per window, with rollback over the relay.
+
+    Both windows run the game; ``RollbackSession`` keeps them in step. The
+    game over screen waits until the opponent's turns up to the end are
+    known, so a late turn can't take it back.
+    """
+
+    def __init__(self, master, board_size=32, food_count=4):
+        super().__init__(master, board_size, 2, food_count, players=2)
+        self.master.title("Snake Duel - Online")
+        self.session = None
+
+    def play(self):
+        super().play()
+        self.stop_loop()
+        self.connect()
+
+    def show_status(self, text):
+        self.status = text
+        self.score_label.config(text=text)
+
+    def accept_input(self, direction, previous):
+        return self.session is not None and super().accept_input(direction, previous)
+
+    def on_start(self, seat, seed, input_delay):
+        self.seat = seat
+        self.core.reset(seed)
+        self.session = RollbackSession(self.core, seat, input_delay, self.send_turn)
+        self.status = None
+        self.display()
+        self.start_loop(self.speed)
+
+    def send_turn(self, tick, code):
+        self.client.send(proto.MOVE, tick, self.seat, code)
+
+    def on_move(self, tick, seat, code):
+        if self.session is not None:
+            self.session.receive(tick, code)
+            self.check_finished()
+
+    def on_core_event(self, core, event):
+        # A game over may still be rolled back, check_finished decides
+        pass
+
+    def tick(self):
+        if self.game_over_flag or self.session is None or self.session.stalled:
+            # Keep queued turns until the opponent catches up
+            return
+        self.session.advance(self.next_input())
+        self.check_finished()
+
+    def check_finished(self):
+        if self.session.finished and not self.game_over_flag:
+            self.display()
+            self.game_over()
+
+    def on_disconnect(self, reason):
+        if not self.game_over_flag:
+            self.session = None
+            self.stop_loop()
+            self.show_status(reason)
+
+    def record_score(self):
+        # Matches are not ranked, and rollbacks leave no replayable log
+        pass
+
+    def game_over_text(self):
+        winner = self.core.winner
+        title = "Draw!" if winner is None else "You Win!" if winner == self.seat else "You Lose!"
+        return f"{title}\nScore: {self.core.snakes[self.seat].score}"
+
+    def restart(self, seed=None):
+        self.session = None
+        self.game_over_flag = False
+        self.clear_input()
+        if self.restart_button:
+            self.restart_button.destroy()
+            self.restart_button = None
+        self.canvas.delete('overlay')
+        self.connect()
@@ -0,0 +1,75 @@
+"""Manifest of the games shown in the game center.
+
+Entries only hold the module path and display metadata, so building the
+menu imports nothing from the games themselves. A game module is imported
+the first time its entry is loaded, usually when "Play Now" is pressed.
+"""
+from functools import partial
+import importlib
+import time
+
+
+class GameEntry:
+    def __init__(self, name, module, attr, description, icon, options=None,
+                 network=False):
+        self.name = name
+        self.module = module
+        self.attr = attr
+        self.description = description
+        self.icon = icon
+        self.options = options or {}
+        # Connects to a relay or broadcast server when opened
+        self.network = network
+        self.game_class = None
+        self.load_time = None
+
+    def load(self):
+        """Import the game module once and return the game factory"""
+        if self.game_class is None:
+            start = time.perf_counter()
+            module = importlib.import_module(self.module)
+            game_class = getattr(module, self.attr)
+            if self.options:
+                game_class = partial(game_class, **self.options)
+            self.game_class = game_class
+            self.load_time = time.perf_counter() - start
+        return self.game_class
+
+    @property
+    def loaded(self):
+        return self.game_class is not None
+
+
+GAMES = [
+    GameEntry('Tic Tac Toe', 'games.tictactoe', 'TicTacToe',
+              'Classic X and O game', '❌'),
+    GameEntry('Gomoku', 'games.tictactoe', 'TicTacToe',
+              'Five in a row on a 15x15 board', '⚫',
+              options={'rows': 15, 'cols': 15, 'win_length': 5}),
+    GameEntry('Snake', 'games.snake', 'Snake',
+              'Classic snake game', '🐍'),
+    GameEntry('Snake Arena', 'games.arena', 'Arena',
+              'Snake against two dozen computer snakes', '🐉'),
+    GameEntry('Tic Tac Toe Online', 'games.online', 'OnlineTicTacToe',
+              'Tic Tac Toe against a player on the relay server', '🌐',
+              network=True),
+    GameEntry('Snake Duel Online', 'games.online', 'OnlineSnake',
+              'Two snakes, two players, one board over the network', '🤝',
+              network=True),
+    GameEntry('2048', 'games.game2048', 'Game2048',
+              'Merge numbers puzzle', '🎲'),
+    GameEntry('2048 Marathon', 'games.game2048', 'Game2048',
+              '2048 on an 8x8 board', '🧮',
+              options={'grid_size': 8}),
+    GameEntry('2048 Ultra', 'games.game2048', 'Game2048',
+              '2048 on a 16x16 board', '🏔',
+              options={'grid_size': 16}),
+    GameEntry('Spectator', 'games.spectator', 'Spectator',
+              'Watch a 2048 or Snake game broadcast from another screen', '📺',
+              network=True),
+]
+
+
+def get_games():
+    """Return the manifest as an ordered name -> entry mapping"""
+    return {entry.name: entry for entry in GAMES}
@@ -0,0 +1,144 @@
+"""Re-simulate recorded sessions headlessly or play them back in a view.
+
+Usage::
+
+    python -m games.replay verify SESSION.gcr [--score N]
+    python -m games.replay play SESSION.gcr [--speed 4]
+"""
+import argparse
+import importlib
+import sys
+
+from .action_log import Session
+from .arena_core import ArenaCore
+from .game2048_core import Game2048Core, GridGame2048Core
+from .snake_core import SnakeCore
+from .tictactoe_core import TicTacToeCore
+
+CORES = {
+    ArenaCore.game_id: ArenaCore,
+    Game2048Core.game_id: Game2048Core,
+    GridGame2048Core.game_id: GridGame2048Core,
+    SnakeCore.game_id: SnakeCore,
+    TicTacToeCore.game_id: TicTacToeCore,
+}
+
+# Tk views taking the same options as their core after the master window
+VIEWS = {
+    ArenaCore.game_id: ('games.arena', 'Arena'),
+    Game2048Core.game_id: ('games.game2048', 'Game2048'),
+    GridGame2048Core.game_id: ('games.game2048', 'Game2048'),
+    SnakeCore.game_id: ('games.snake', 'Snake'),
+    TicTacToeCore.game_id: ('games.tictactoe', 'TicTacToe'),
+}
+
+# Playback interval at 1x for games without their own tick rate
+DEFAULT_TICK_MS = 250
+
+
+def load(data):
+    """Parse an action log from bytes or a file path"""
+    if isinstance(data, str):
+        with open(data, 'rb') as f:
+            data = f.read()
+    return Session.from_bytes(data)
+
+
+def actions_by_tick(session, core):
+    """Yield the decoded action (or None) for every tick of the session"""
+    actions = iter(session.actions)
+    upcoming = next(actions, None)
+    for tick in range(session.ticks):
+        if upcoming is not None and upcoming[0] == tick:
+            yield core.decode_action(upcoming[1])
+            upcoming = next(actions, None)
+        else:
+            yield None
+
+
+def simulate(data):
+    """Re-run a session at full speed and return the final core"""
+    session = load(data) if not isinstance(data, Session) else data
+    core = CORES[session.game_id](*session.options)
+    core.reset(session.seed)
+    for action in actions_by_tick(session, core):
+        core.step(action)
+    return core
+
+
+def verify_score(data, claimed_score):
+    """Check a claimed score by re-simulating the session that produced it"""
+    core = simulate(data)
+    return getattr(core, 'score', None) == claimed_score
+
+
+class ReplayPlayer:
+    """Play a session back in a running Tk game view.
+
+    The view is restarted with the recorded seed and stepped through its
+    own ``schedule`` so closing the window stops playback. ``speed`` is a
+    multiplier on the game's normal pace.
+    """
+
+    def __init__(self, game, data, speed=1.0):
+        self.session = load(data) if not isinstance(data, Session) else data
+        core = game.core
+        if (core.game_id != self.session.game_id
+                or tuple(core.options()) != self.session.options):
+            raise ValueError("session was recorded with a different game setup")
+        self.game = game
+        self.speed = speed
+        self.tick_ms = getattr(game, 'speed', DEFAULT_TICK_MS)
+        self.actions = None
+
+    def start(self):
+        self.game.replaying = True
+        self.game.restart(seed=self.session.seed)
+        # Playback replaces the game's own loop and input
+        self.game.stop_loop()
+        self.actions = actions_by_tick(self.session, self.game.core)
+        self.game.schedule(self.interval(), self.advance)
+
+    def interval(self):
+        return max(1, round(self.tick_ms / self.speed))
+
+    def advance(self):
+        action = next(self.actions, StopIteration)
+        if action is StopIteration:
+            return
+        self.game.core.step(action)
+        self.game.display()
+        self.game.schedule(self.interval(), self.advance)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Verify or play back a recorded session")
+    parser.add_argument('command', choices=('verify', 'play'))
+    parser.add_argument('path')
+    parser.add_argument('--score', type=int, help="score to check the replay against")
+    parser.add_argument('--speed', type=float, default=1.0, help="playback speed multiplier")
+    args = parser.parse_args(argv)
+
+    session = load(args.path)
+    if args.command == 'verify':
+        core = simulate(session)
+        score = getattr(core, 'score', None)
+        print(f"{session.game_id}: {session.ticks} ticks, score {score}")
+        if args.score is not None and score != args.score:
+            print(f"claimed score {args.score} does not match")
+            return 1
+        return 0
+
+    import tkinter as tk
+    module, attr = VIEWS[session.game_id]
+    view_class = getattr(importlib.import_module(module), attr)
+    root = tk.Tk()
+    game = view_class(root, *session.options)
+    game.play()
+    ReplayPlayer(game, session, args.speed).start()
+    root.mainloop()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,13 +1,24 @@
 from .base_game import BaseGame
+from .snake_ai import SnakeAutopilot
+from .snake_core import OPPOSITES, SnakeCore
+from .sprites import SpriteCache
 import tkinter as tk
-import random
+from collections import deque
+import time
 
 class Snake(BaseGame):
-    def __init__(self, master):
+    resumable = True
+
+    def __init__(self, master, board_size=20):
         super().__init__(master)
         self.master.title("Snake")
-        self.canvas_size = 400
-        self.cell_size = 20
+        # Large boards shrink the cells so the canvas stays around 400px
+        self.board_size = board_size
+        self.cell_size = max(2, min(20, 400 // board_size))
+        # Cell size at the opening window size, see on_layout()
+        self.base_cell_size = self.cell_size
+        self.canvas_size = self.board_size * self.cell_size
+        self.inset = self.cell_size // 10
         self.speed = 100
         
         # Modern color scheme
@@ -24,7 +35,7 @@ class Snake(BaseGame):
         screen_width = self.master.winfo_screenwidth()
         screen_height = self.master.winfo_screenheight()
         window_width = self.canvas_size + 40
-        window_height = self.canvas_size + 150  # Increased from 100 to 150 for better button visibility
+        window_height = self.canvas_size + 190  # Room for the autopilot and restart buttons
         x = (screen_width - window_width) // 2
         y = (screen_height - window_height) // 2
         self.master.geometry(f'{window_width}x{window_height}+{x}+{y}')
@@ -38,19 +49,38 @@ class Snake(BaseGame):
         self.center_frame = tk.Frame(self.frame, bg=self.colors['bg'])
         self.center_frame.pack(expand=True, fill='both')
         
-        # Initialize game state
-        self.snake = [(5, 5)]
-        self.direction = 'Right'
-        self.food = None
-        self.score = 0
+        # Initialize game state, the rules live in the headless core
+        self.core = SnakeCore(board_size)
+        self.core.subscribe(self.on_core_event)
         self.game_over_flag = False
         self.restart_button = None
+        self.load_progress()
+
+        # The autopilot follows a Hamiltonian cycle, which only even-sized
+        # boards have
+        self.pilot = SnakeAutopilot(board_size) if board_size % 2 == 0 else None
+        self.autopilot = False
+        self.autopilot_button = None
+
+        # Moves made by the core that display() has not drawn yet
+        self.pending_moves = 0
+
+        # Canvas items mirroring self.snake, head first
+        self.snake_items = deque()
+        self.food_item = None
+        self.drawn_food = None
+
+        # Segments and food are single images rendered once per cell size
+        self.sprites = SpriteCache(self.master)
+
+        # Render time per frame as (snake length, seconds)
+        self.frame_times = deque(maxlen=1000)
         
         # Bind keys
-        self.master.bind('<Left>', lambda e: self.change_direction('Left'))
-        self.master.bind('<Right>', lambda e: self.change_direction('Right'))
-        self.master.bind('<Up>', lambda e: self.change_direction('Up'))
-        self.master.bind('<Down>', lambda e: self.change_direction('Down'))
+        self.bind_key('<Left>', lambda e: self.change_direction('Left'))
+        self.bind_key('<Right>', lambda e: self.change_direction('Right'))
+        self.bind_key('<Up>', lambda e: self.change_direction('Up'))
+        self.bind_key('<Down>', lambda e: self.change_direction('Down'))
 
     def play(self):
         # Create a frame to hold the game elements
@@ -79,9 +109,28 @@ class Snake(BaseGame):
             bg=self.colors['bg']
         )
         self.score_label.pack()
+
+        if self.pilot is not None:
+            self.autopilot_button = tk.Button(
+                self.game_frame,
+                text="Autopilot",
+                font=('Helvetica', 12, 'bold'),
+                fg=self.colors['text'],
+                bg=self.colors['grid'],
+                activebackground=self.colors['snake_head'],
+                activeforeground=self.colors['text'],
+                bd=0,
+                padx=20,
+                pady=5,
+                cursor='hand2',
+                command=self.toggle_autopilot
+            )
+            self.autopilot_button.pack(pady=(10, 0))
         
-        # Draw grid lines
-        for i in range(0, self.canvas_size, self.cell_size):
+        # Draw grid lines once, frames only touch snake and food items.
+        # Tiny cells on large boards would turn the grid into a solid fill.
+        grid_step = self.cell_size if self.cell_size >= 8 else self.canvas_size
+        for i in range(0, self.canvas_size, grid_step):
             self.canvas.create_line(
                 i, 0, i, self.canvas_size,
                 fill=self.colors['grid'], width=1
@@ -91,128 +140,191 @@ class Snake(BaseGame):
                 fill=self.colors['grid'], width=1
             )
         
-        self.spawn_food()
-        self.update()
+        self.enable_layout(self.canvas)
+        self.display()
+        self.start_loop(self.speed)
+        self.start_broadcast()
+
+    @property
+    def snake(self):
+        return self.core.snake
+
+    @property
+    def food(self):
+        return self.core.food
+
+    @property
+    def score(self):
+        return self.core.score
+
+    @property
+    def direction(self):
+        return self.core.direction
 
     def change_direction(self, new_direction):
-        opposites = {'Left': 'Right', 'Right': 'Left', 'Up': 'Down', 'Down': 'Up'}
-        if opposites[new_direction] != self.direction:
-            self.direction = new_direction
-
-    def spawn_food(self):
-        while True:
-            x = random.randint(0, (self.canvas_size//self.cell_size)-1)
-            y = random.randint(0, (self.canvas_size//self.cell_size)-1)
-            self.food = (x, y)
-            if self.food not in self.snake:
-                break
-
-    def update(self):
-        if not self.game_over_flag:
-            # Move snake
-            head = self.snake[0]
-            if self.direction == 'Left':
-                new_head = (head[0]-1, head[1])
-            elif self.direction == 'Right':
-                new_head = (head[0]+1, head[1])
-            elif self.direction == 'Up':
-                new_head = (head[0], head[1]-1)
-            else:  # Down
-                new_head = (head[0], head[1]+1)
-            
-            # Check collision with walls
-            if (new_head[0] < 0 or new_head[0] >= self.canvas_size//self.cell_size or
-                new_head[1] < 0 or new_head[1] >= self.canvas_size//self.cell_size or
-                new_head in self.snake):
-                self.game_over()
-                return
-            
-            self.snake.insert(0, new_head)
-            
-            # Check food collision
-            if new_head == self.food:
-                self.score += 10
-                self.score_label.config(text=f"Score: {self.score}")
-                self.spawn_food()
-            else:
-                self.snake.pop()
-            
+        if self.autopilot:
+            return
+        # Queued so two quick turns land on consecutive ticks, and applied
+        # through step() so they are logged
+        self.queue_input(new_direction)
+
+    def accept_input(self, direction, previous):
+        # Check against the direction the snake will have when this applies,
+        # so quick presses can't turn it back into its neck
+        current = previous or self.direction
+        return direction != current and direction != OPPOSITES[current]
+
+    def toggle_autopilot(self):
+        self.autopilot = not self.autopilot
+        self.autopilot_button.config(text="Stop" if self.autopilot else "Autopilot")
+        self.clear_input()
+        if self.autopilot:
+            self.pilot.take_over(self.core)
+
+    def tick(self):
+        if self.game_over_flag:
+            return
+        if self.autopilot:
+            # Planned inside the tick so the move always sees the current board
+            self.core.step(self.pilot.next_action(self.core))
+        else:
+            self.core.step(self.next_input())
+
+    def on_core_event(self, core, event):
+        if event == 'move':
+            self.pending_moves += 1
+        elif event == 'eat':
+            self.score_label.config(text=f"Score: {self.score}")
+        elif event == 'over':
             self.display()
-            self.master.after(self.speed, self.update)
+            self.game_over(won=core.won)
+
+    def segment_coords(self, segment):
+        """Top left corner of a segment image"""
+        x, y = segment
+        return (x * self.cell_size + self.inset, y * self.cell_size + self.inset)
+
+    def food_coords(self, food):
+        x, y = food
+        offset = (self.cell_size - self.food_size) // 2
+        return (x * self.cell_size + offset, y * self.cell_size + offset)
+
+    @property
+    def food_size(self):
+        return max(2, round(self.cell_size * 0.8))
+
+    def segment_image(self, head):
+        self.sprites.set_size(self.cell_size)
+        color = self.colors['snake_head'] if head else self.colors['snake_body']
+        return self.sprites.disc(round(self.cell_size - 2 * self.inset), color)
+
+    def food_image(self):
+        self.sprites.set_size(self.cell_size)
+        return self.sprites.disc(self.food_size, self.colors['food'],
+                                 outline='white', outline_width=2)
+
+    def on_layout(self, scale):
+        # canvas.scale already moved every item, new ones must land on the
+        # same grid, so the geometry scales without rounding
+        self.cell_size = self.base_cell_size * scale
+        self.inset = self.base_cell_size // 10 * scale
+        self.canvas_size = self.board_size * self.cell_size
+        for i, item in enumerate(self.snake_items):
+            self.canvas.itemconfig(item, image=self.segment_image(i == 0))
+        if self.food_item is not None:
+            self.canvas.itemconfig(self.food_item, image=self.food_image())
+            if self.drawn_food is not None:
+                self.canvas.coords(self.food_item, *self.food_coords(self.drawn_food))
 
     def display(self):
-        self.canvas.delete('all')
-        
-        # Draw grid
-        for i in range(0, self.canvas_size, self.cell_size):
-            self.canvas.create_line(
-                i, 0, i, self.canvas_size,
-                fill=self.colors['grid'], width=1
-            )
-            self.canvas.create_line(
-                0, i, self.canvas_size, i,
-                fill=self.colors['grid'], width=1
-            )
-        
-        # Draw snake with rounded corners
-        for i, segment in enumerate(self.snake):
-            x, y = segment
-            color = self.colors['snake_head'] if i == 0 else self.colors['snake_body']
-            
-            # Create rounded rectangle
-            x1 = x * self.cell_size + 2
-            y1 = y * self.cell_size + 2
-            x2 = (x + 1) * self.cell_size - 2
-            y2 = (y + 1) * self.cell_size - 2
-            
-            self.canvas.create_oval(
-                x1, y1, x2, y2,
-                fill=color, outline=''
-            )
-        
+        start = time.perf_counter()
+
+        if not self.snake_items:
+            # First frame after play or restart draws every segment
+            for i, segment in enumerate(self.snake):
+                self.snake_items.append(self.canvas.create_image(
+                    *self.segment_coords(segment), anchor='nw',
+                    image=self.segment_image(i == 0), tags='snake'
+                ))
+        elif self.pending_moves:
+            # The previous head becomes a body segment
+            self.canvas.itemconfig(self.snake_items[0], image=self.segment_image(False))
+
+            # Several ticks may have run since the last frame, oldest first
+            for i in range(min(self.pending_moves, len(self.snake)) - 1, -1, -1):
+                segment = self.snake[i]
+                image = self.segment_image(i == 0)
+                if len(self.snake_items) < len(self.snake):
+                    # Snake grew, the tail stays where it is
+                    item = self.canvas.create_image(
+                        *self.segment_coords(segment), anchor='nw',
+                        image=image, tags='snake'
+                    )
+                else:
+                    # Recycle the tail item as the new head
+                    item = self.snake_items.pop()
+                    self.canvas.coords(item, *self.segment_coords(segment))
+                    self.canvas.itemconfig(item, image=image)
+                self.snake_items.appendleft(item)
+        self.pending_moves = 0
+
         # Draw modern food
-        if self.food:
-            x, y = self.food
-            x1 = x * self.cell_size + 2
-            y1 = y * self.cell_size + 2
-            x2 = (x + 1) * self.cell_size - 2
-            y2 = (y + 1) * self.cell_size - 2
-            
-            # Create star-like shape for food
-            center_x = (x1 + x2) / 2
-            center_y = (y1 + y2) / 2
-            size = self.cell_size * 0.4
-            
-            self.canvas.create_oval(
-                center_x - size, center_y - size,
-                center_x + size, center_y + size,
-                fill=self.colors['food'],
-                outline='white',
-                width=2
-            )
+        if self.food != self.drawn_food:
+            self.drawn_food = self.food
+            if self.food is None:
+                self.canvas.itemconfig(self.food_item, state='hidden')
+            elif self.food_item is None:
+                self.food_item = self.canvas.create_image(
+                    *self.food_coords(self.food), anchor='nw',
+                    image=self.food_image()
+                )
+            else:
+                self.canvas.coords(self.food_item, *self.food_coords(self.food))
+                self.canvas.itemconfig(self.food_item, state='normal')
+
+        self.frame_times.append((len(self.snake), time.perf_counter() - start))
+
+    def frame_time_report(self, bucket=10):
+        """Average render time in ms grouped by snake length.
+
+        Retained-mode rendering keeps this flat as the snake grows.
+        """
+        totals = {}
+        for length, seconds in self.frame_times:
+            key = length // bucket * bucket
+            total, count = totals.get(key, (0.0, 0))
+            totals[key] = (total + seconds, count + 1)
+        return {
+            key: total / count * 1000
+            for key, (total, count) in sorted(totals.items())
+        }
 
-    def game_over(self):
+    def game_over(self, won=False):
         self.game_over_flag = True
+        self.stop_loop()
+        self.save_replay()
+        self.record_score()
+        title = "You Win!" if won else "Game Over!"
         
         # Semi-transparent overlay
         self.canvas.create_rectangle(
             0, 0, self.canvas_size, self.canvas_size,
-            fill='black', stipple='gray50'
+            fill='black', stipple='gray50', tags='overlay'
         )
         
         # Game over text with shadow
         self.canvas.create_text(
             self.canvas_size//2 + 2, self.canvas_size//2 - 18,
-            text=f"Game Over!\nScore: {self.score}",
+            text=f"{title}\nScore: {self.score}\nBest: {self.best_score}",
             fill='black', font=('Helvetica', 24, 'bold'),
-            justify=tk.CENTER
+            justify=tk.CENTER, tags='overlay'
         )
         self.canvas.create_text(
             self.canvas_size//2, self.canvas_size//2 - 20,
-            text=f"Game Over!\nScore: {self.score}",
+            text=f"{title}\nScore: {self.score}\nBest: {self.best_score}",
             fill=self.colors['text'],
             font=('Helvetica', 24, 'bold'),
-            justify=tk.CENTER
+            justify=tk.CENTER, tags='overlay'
         )
         
         # Modern restart button with updated colors
@@ -232,13 +344,14 @@ class Snake(BaseGame):
         )
         self.restart_button.pack(pady=10)
 
-    def restart(self):
+    def restart(self, seed=None):
         # Reset game state
-        self.snake = [(5, 5)]
-        self.direction = 'Right'
-        self.food = None
-        self.score = 0
+        self.core.reset(seed)
         self.game_over_flag = False
+        self.pending_moves = 0
+        self.clear_input()
+        if self.autopilot:
+            self.pilot.take_over(self.core)
         
         # Update score display
         self.score_label.config(text=f"Score: {self.score}")
@@ -248,10 +361,11 @@ class Snake(BaseGame):
             self.restart_button.destroy()
             self.restart_button = None
             
-        # Clear canvas and restart game
-        self.canvas.delete('all')
-        self.spawn_food()
-        self.update()
+        # Clear snake and overlay, the grid and food item are reused
+        self.canvas.delete('snake', 'overlay')
+        self.snake_items.clear()
+        self.display()
+        self.start_loop(self.speed)
 
     def is_game_over(self):
         return self.game_over_flag
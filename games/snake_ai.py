@@ -0,0 +1,260 @@
+"""Autopilot for Snake that can fill the whole board.
+
+The snake lives on a precomputed Hamiltonian cycle of the board. As long as
+it only ever moves forward in cycle order, its body stays between the tail
+and the head on the cycle and every cell ahead of the head up to the tail
+is free, so the tail can always be reached by following the cycle. That is
+the safety check, and following the cycle is the fallback when no shortcut
+is worth taking.
+
+Shortcuts come from an A* search from the head to the food restricted to
+moves that go forward in cycle order and stay clear of the tail. The
+search reuses its buffers between ticks (generation stamps instead of
+fresh visited sets) and gives up after ``max_expansions`` nodes, which keeps
+a tick well under a millisecond on a 100x100 board. A found path is
+followed until the food is eaten, so most ticks do no search at all.
+"""
+import heapq
+
+from .snake_core import DIRECTIONS, OFFSETS
+
+
+def hamiltonian_cycle(size):
+    """Cell ids (``y * size + x``) of a closed tour of an even-sized board.
+
+    Row 0 runs left to right, the other rows snake through columns 1 and
+    up, and column 0 leads back to the start.
+    """
+    if size < 2 or size % 2:
+        raise ValueError("a Hamiltonian cycle needs an even board size")
+    cells = [x for x in range(size)]
+    for y in range(1, size):
+        xs = range(size - 1, 0, -1) if y % 2 else range(1, size)
+        cells.extend(y * size + x for x in xs)
+    cells.extend(y * size for y in range(size - 1, 0, -1))
+    return cells
+
+
+class SnakeAutopilot:
+    # Nodes A* may expand in one tick before falling back to the cycle
+    max_expansions = 250
+    # Free cells kept between a shortcut and the tail, room to grow into
+    safety_margin = 4
+    # Ticks spent following the cycle after a search found nothing
+    retry_ticks = 10
+
+    def __init__(self, board_size):
+        size = self.size = board_size
+        cells = size * size
+        self.cycle = hamiltonian_cycle(size)
+        self.order = [0] * cells
+        for index, cell in enumerate(self.cycle):
+            self.order[cell] = index
+        self.neighbours = [
+            tuple(n for n, ok in ((cell - size, cell >= size),
+                                  (cell + size, cell < cells - size),
+                                  (cell - 1, cell % size > 0),
+                                  (cell + 1, cell % size < size - 1)) if ok)
+            for cell in range(cells)
+        ]
+        directions = {}
+        for name in DIRECTIONS:
+            dx, dy = OFFSETS[name]
+            directions[dy * size + dx] = name
+        self.directions = directions
+
+        # Search buffers, a cell is current when its stamp is the generation
+        self.stamp = [0] * cells
+        self.cost = [0] * cells
+        self.parent = [0] * cells
+        self.heap = []
+        self.generation = 0
+
+        self.plan = []
+        self.plan_food = None
+        self.backoff = 0
+        # Ticks left until a snake taken over mid-game lies on the cycle
+        self.settling = 0
+        self.expansions = 0
+
+    def take_over(self, core):
+        """Start steering ``core``, which may already have a long snake"""
+        self.plan = []
+        self.plan_food = None
+        self.backoff = 0
+        self.settling = len(core.snake) - 1
+
+    def cell_id(self, cell):
+        return cell[1] * self.size + cell[0]
+
+    def distance(self, a, b):
+        """Steps from cell ``a`` to cell ``b`` going forward on the cycle"""
+        return (self.order[b] - self.order[a]) % len(self.cycle)
+
+    def next_action(self, core):
+        """Direction for the next step of ``core``"""
+        if core.done:
+            return None
+        head = self.cell_id(core.snake[0])
+        if self.settling:
+            return self.settle(core, head)
+
+        if core.food is not None:
+            food = self.cell_id(core.food)
+            if food != self.plan_food:
+                self.plan_food = food
+                self.backoff = 0
+                self.plan = []
+            if not self.plan_valid(core, head):
+                if self.backoff:
+                    self.backoff -= 1
+                    self.plan = []
+                else:
+                    self.plan = self.search(core, head, food)
+                    if not self.plan:
+                        # Let the head move on along the cycle before retrying
+                        self.backoff = self.retry_ticks
+            if self.plan:
+                return self.directions[self.plan.pop() - head]
+        step = self.successor(head)
+        if step == self.behind(core, head):
+            # A lone head can't reverse, and any cell keeps it in cycle order
+            step = next(n for n in self.neighbours[head] if n != step)
+        return self.directions[step - head]
+
+    def successor(self, cell):
+        return self.cycle[(self.order[cell] + 1) % len(self.cycle)]
+
+    def behind(self, core, head):
+        """The cell the core would refuse to turn back into"""
+        dx, dy = OFFSETS[core.direction]
+        return head - dy * self.size - dx
+
+    def plan_valid(self, core, head):
+        if not self.plan:
+            return False
+        step = self.plan[-1]
+        return (step in self.neighbours[head] and core.free_index[step] != -1
+                and step != self.behind(core, head))
+
+    def search(self, core, head, food):
+        """Shortest forward-on-the-cycle path to the food, [] if none found.
+
+        The path is returned last step first so steps can be popped.
+        """
+        tail = self.cell_id(core.snake[-1])
+        room = self.distance(head, tail) if len(core.snake) > 1 else len(self.cycle)
+        goal = self.distance(head, food)
+        if goal >= room - self.safety_margin - len(core.snake):
+            # Cells a shortcut skips stay empty until the tail passes them.
+            # Keep a body length of room ahead so the snake can't eat its
+            # way up to its tail before then; the cycle gets there anyway.
+            return []
+
+        self.generation += 1
+        generation = self.generation
+        stamp, cost, parent, heap = self.stamp, self.cost, self.parent, self.heap
+        order, neighbours, free_index = self.order, self.neighbours, core.free_index
+        total = len(self.cycle)
+        head_order = order[head]
+        size = self.size
+        food_x, food_y = food % size, food // size
+        behind = self.behind(core, head)
+        # Cells before the wrap more than a row below the food can only
+        # reach it through column 0, see hamiltonian_cycle
+        wraps = order[food] < head_order
+
+        heap.clear()
+        stamp[head] = generation
+        cost[head] = 0
+        heap.append((0, 0, head))
+        expansions = 0
+        while heap:
+            _, depth, cell = heapq.heappop(heap)
+            steps = -depth
+            if cell == food:
+                break
+            if steps != cost[cell]:
+                continue
+            expansions += 1
+            if expansions > self.max_expansions:
+                self.expansions = expansions
+                return []
+            ahead = (order[cell] - head_order) % total
+            for n in neighbours[cell]:
+                # Only forward along the cycle, never past the food
+                n_ahead = (order[n] - head_order) % total
+                if n_ahead <= ahead or n_ahead > goal or free_index[n] == -1:
+                    continue
+                if cell == head and n == behind:
+                    continue
+                if stamp[n] == generation and cost[n] <= steps + 1:
+                    continue
+                stamp[n] = generation
+                cost[n] = steps + 1
+                parent[n] = cell
+                x, y = n % size, n // size
+                if wraps and y > food_y + 1 and order[n] >= head_order:
+                    estimate = x + food_x + y - food_y
+                else:
+                    estimate = abs(x - food_x) + abs(y - food_y)
+                heapq.heappush(heap, (steps + 1 + estimate, -steps - 1, n))
+        self.expansions = expansions
+        if stamp[food] != generation:
+            return []
+
+        path = []
+        cell = food
+        while cell != head:
+            path.append(cell)
+            cell = parent[cell]
+        return path
+
+    def settle(self, core, head):
+        """Follow the cycle until the old body has left the board.
+
+        A snake taken over mid-game may not lie in cycle order. Once it has
+        moved its own length along the cycle it does. Each of these ticks
+        floods up to a body length of cells, so they cost more than the
+        ticks after them.
+        """
+        self.settling -= 1
+        step = self.successor(head)
+        length = len(core.snake)
+        if (core.free_index[step] == -1 or step == self.behind(core, head)
+                or self.flood(core, step, length) < length):
+            # The old body is in the way or walls off the cycle ahead. Step
+            # aside into open space, as far round the cycle from the head as
+            # possible so the new body is gone before the cycle brings the
+            # head back here.
+            self.settling = length
+            best = None
+            for n in self.neighbours[head]:
+                if core.free_index[n] != -1 and n != self.behind(core, head):
+                    key = (self.flood(core, n, length), self.distance(n, head))
+                    if best is None or key > best:
+                        step, best = n, key
+        if core.food is not None and step == self.cell_id(core.food):
+            # Growing leaves one more old segment to wait for
+            self.settling += 1
+        return self.directions[step - head]
+
+    def flood(self, core, start, limit):
+        """Free cells reachable from ``start``, counting stops at ``limit``"""
+        self.generation += 1
+        generation = self.generation
+        # The parent buffer doubles as the queue, a flood needs no parents
+        stamp, queue, neighbours = self.stamp, self.parent, self.neighbours
+        free_index = core.free_index
+        stamp[start] = generation
+        queue[0] = start
+        read, write = 0, 1
+        while read < write and write < limit:
+            cell = queue[read]
+            read += 1
+            for n in neighbours[cell]:
+                if stamp[n] != generation and free_index[n] != -1:
+                    stamp[n] = generation
+                    queue[write] = n
+                    write += 1
+        return write
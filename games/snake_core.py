@@ -0,0 +1,218 @@
+from .action_log import read_varint, write_varint
+from .base_core import BaseCore
+from collections import deque
+import itertools
+
+DIRECTIONS = ('Left', 'Right', 'Up', 'Down')
+OPPOSITES = {'Left': 'Right', 'Right': 'Left', 'Up': 'Down', 'Down': 'Up'}
+OFFSETS = {'Left': (-1, 0), 'Right': (1, 0), 'Up': (0, -1), 'Down': (0, 1)}
+OFFSET_CODES = {OFFSETS[d]: i for i, d in enumerate(DIRECTIONS)}
+
+# Points scored per food item
+FOOD_REWARD = 10
+
+
+class SnakeCore(BaseCore):
+    """Headless snake rules on a square board.
+
+    Events sent to listeners: ``reset``, ``move`` after every step of the
+    snake, ``eat`` when food was eaten and ``over`` when the game ends.
+    """
+
+    game_id = 'snake'
+
+    def __init__(self, board_size=20, seed=None):
+        super().__init__()
+        self.board_size = board_size
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        self.seed_game(seed)
+        start = min(5, self.board_size // 2)
+        self.snake = deque([(start, start)])
+        self.direction = 'Right'
+        self.food = None
+        self.score = 0
+        self.done = False
+        self.won = False
+
+        # Occupied cells for O(1) collision checks
+        self.occupied = set(self.snake)
+
+        # Free cells as an array with swap-remove plus each cell's position
+        # in it (-1 when occupied), so food spawns in O(1) at any fill level
+        cells = self.board_size * self.board_size
+        self.free_cells = list(range(cells))
+        self.free_index = list(range(cells))
+        for segment in self.snake:
+            self.take_cell(segment)
+
+        self.spawn_food()
+        if self.listeners:
+            self.notify('reset')
+
+    def take_cell(self, cell):
+        cell_id = cell[1] * self.board_size + cell[0]
+        index = self.free_index[cell_id]
+        last = self.free_cells.pop()
+        if last != cell_id:
+            self.free_cells[index] = last
+            self.free_index[last] = index
+        self.free_index[cell_id] = -1
+
+    def release_cell(self, cell):
+        cell_id = cell[1] * self.board_size + cell[0]
+        self.free_index[cell_id] = len(self.free_cells)
+        self.free_cells.append(cell_id)
+
+    def spawn_food(self):
+        if not self.free_cells:
+            # The snake covers the whole board
+            self.food = None
+            return
+        cell_id = self.free_cells[self.random.randrange(len(self.free_cells))]
+        self.food = (cell_id % self.board_size, cell_id // self.board_size)
+
+    def change_direction(self, new_direction):
+        if OPPOSITES[new_direction] != self.direction:
+            self.direction = new_direction
+
+    def step(self, action=None):
+        """Turn towards ``action`` (None keeps going) and move one cell"""
+        if self.done:
+            return 0, True
+        self.record(action)
+        if action is not None:
+            self.change_direction(action)
+
+        head = self.snake[0]
+        dx, dy = OFFSETS[self.direction]
+        new_head = (head[0] + dx, head[1] + dy)
+
+        # Check collision with walls and body
+        if (new_head[0] < 0 or new_head[0] >= self.board_size or
+            new_head[1] < 0 or new_head[1] >= self.board_size or
+            new_head in self.occupied):
+            self.done = True
+            if self.listeners:
+                self.notify('over')
+            return 0, True
+
+        self.snake.appendleft(new_head)
+        self.occupied.add(new_head)
+        self.take_cell(new_head)
+
+        reward = 0
+        if new_head == self.food:
+            reward = FOOD_REWARD
+            self.score += reward
+            self.spawn_food()
+            if self.food is None:
+                self.done = True
+                self.won = True
+        else:
+            tail = self.snake.pop()
+            self.occupied.discard(tail)
+            self.release_cell(tail)
+
+        if self.listeners:
+            self.notify('move')
+            if reward:
+                self.notify('eat')
+            if self.done:
+                self.notify('over')
+        return reward, self.done
+
+    def snapshot(self):
+        """Encode the game as varints plus 2 bits per body segment.
+
+        The body is stored as the direction from each segment to the next
+        one, so a snake filling a 20x20 board takes about 100 bytes.
+        """
+        size = self.board_size
+        data = bytearray()
+        write_varint(data, size)
+        write_varint(data, self.score)
+        write_varint(data, DIRECTIONS.index(self.direction))
+        write_varint(data, 0 if self.food is None else self.food[1] * size + self.food[0] + 1)
+        write_varint(data, len(self.snake))
+        head = self.snake[0]
+        write_varint(data, head[1] * size + head[0])
+
+        packed = 0
+        shift = 0
+        previous = head
+        for segment in itertools.islice(self.snake, 1, None):
+            offset = (segment[0] - previous[0], segment[1] - previous[1])
+            packed |= OFFSET_CODES[offset] << shift
+            shift += 2
+            if shift == 8:
+                data.append(packed)
+                packed = shift = 0
+            previous = segment
+        if shift:
+            data.append(packed)
+        return bytes(data)
+
+    def restore(self, data):
+        size, pos = read_varint(data, 0)
+        if size != self.board_size:
+            raise ValueError(f"snapshot is for a {size}x{size} board")
+        score, pos = read_varint(data, pos)
+        direction, pos = read_varint(data, pos)
+        food, pos = read_varint(data, pos)
+        length, pos = read_varint(data, pos)
+        head, pos = read_varint(data, pos)
+        if pos + (length + 2) // 4 != len(data):
+            raise ValueError("truncated snake snapshot")
+        cells = size * size
+        if (direction >= len(DIRECTIONS) or food > cells or not 1 <= length <= cells
+                or head >= cells):
+            raise ValueError("snake snapshot does not fit the board")
+
+        segment = (head % size, head // size)
+        snake = deque([segment])
+        for i in range(length - 1):
+            code = (data[pos + i // 4] >> (2 * (i % 4))) & 3
+            dx, dy = OFFSETS[DIRECTIONS[code]]
+            segment = (segment[0] + dx, segment[1] + dy)
+            snake.append(segment)
+        # Checked before any state changes, so a bad save leaves the game as is
+        occupied = set(snake)
+        if len(occupied) != length or not all(
+                0 <= x < size and 0 <= y < size for x, y in occupied):
+            raise ValueError("snake snapshot has a body off the board or crossing itself")
+        food = None if food == 0 else ((food - 1) % size, (food - 1) // size)
+        if food in occupied:
+            raise ValueError("snake snapshot has food under the snake")
+
+        self.seed_game()
+        self.resumed = True
+        self.done = False
+        self.won = False
+        self.score = score
+        self.direction = DIRECTIONS[direction]
+        self.food = food
+        self.snake = snake
+        self.occupied = occupied
+        self.free_cells = list(range(size * size))
+        self.free_index = list(range(size * size))
+        for segment in snake:
+            self.take_cell(segment)
+        if self.listeners:
+            self.notify('reset')
+
+    def options(self):
+        return (self.board_size,)
+
+    def encode_action(self, action):
+        return DIRECTIONS.index(action)
+
+    def decode_action(self, code):
+        return DIRECTIONS[code]
+
+    def legal_actions(self):
+        return [d for d in DIRECTIONS if OPPOSITES[d] != self.direction]
+
+    def is_terminal(self):
+        return self.done
@@ -0,0 +1,325 @@
+import concurrent.futures
+import concurrent.futures.process
+import multiprocessing
+import os
+import random
+import time
+from collections import OrderedDict
+
+from .game2048_core import (
+    DIRECTIONS, ROW_MASK, empty_cells, ensure_tables, move_board, transpose
+)
+
+# Heuristic weights, tuned for a packed 4x4 board
+LOST_PENALTY = 200000.0
+MONOTONICITY_POWER = 4
+MONOTONICITY_WEIGHT = 47.0
+SUM_POWER = 3.5
+SUM_WEIGHT = 11.0
+MERGES_WEIGHT = 700.0
+EMPTY_WEIGHT = 270.0
+
+# Per-row heuristic scores, built lazily like the move tables
+_row_heuristic = None
+
+
+def _build_heuristic():
+    global _row_heuristic
+    table = [0.0] * 65536
+    for row in range(65536):
+        line = [(row >> (4 * i)) & 0xF for i in range(4)]
+
+        empty = line.count(0)
+        merges = 0
+        previous = 0
+        counter = 0
+        for exponent in line:
+            if not exponent:
+                continue
+            if exponent == previous:
+                counter += 1
+            elif counter:
+                merges += 1 + counter
+                counter = 0
+            previous = exponent
+        if counter:
+            merges += 1 + counter
+
+        mono_left = 0
+        mono_right = 0
+        for i in range(1, 4):
+            a = line[i - 1] ** MONOTONICITY_POWER
+            b = line[i] ** MONOTONICITY_POWER
+            if line[i - 1] > line[i]:
+                mono_left += a - b
+            else:
+                mono_right += b - a
+
+        total = sum(exponent ** SUM_POWER for exponent in line)
+        table[row] = (LOST_PENALTY + EMPTY_WEIGHT * empty
+                      + MERGES_WEIGHT * merges
+                      - MONOTONICITY_WEIGHT * min(mono_left, mono_right)
+                      - SUM_WEIGHT * total)
+    _row_heuristic = table
+
+
+def evaluate(board):
+    """Static score of a packed board, higher is better"""
+    if _row_heuristic is None:
+        _build_heuristic()
+    table = _row_heuristic
+    columns = transpose(board)
+    score = 0.0
+    for shift in (0, 16, 32, 48):
+        score += table[(board >> shift) & ROW_MASK]
+        score += table[(columns >> shift) & ROW_MASK]
+    return score
+
+
+class SearchTimeout(Exception):
+    """Raised inside a search when its time budget is exhausted"""
+
+
+class ExpectimaxSearch:
+    """Iterative deepening expectimax with an LRU transposition table"""
+
+    def __init__(self, cache_size=100000, min_probability=0.0001,
+                 max_depth=6):
+        self.cache_size = cache_size
+        self.min_probability = min_probability
+        self.max_depth = max_depth
+        self.cache = OrderedDict()
+        self.deadline = None
+        self.nodes = 0
+
+    def best_move(self, board, time_budget):
+        """Return the best direction for the board or None if stuck"""
+        ensure_tables()
+        if _row_heuristic is None:
+            _build_heuristic()
+
+        self.deadline = time.perf_counter() + time_budget
+        best = None
+        depth = 1
+        while depth <= self.max_depth:
+            try:
+                move = self._search_root(board, depth)
+            except SearchTimeout:
+                break
+            if move is None:
+                return best
+            best = move
+            depth += 1
+        if best is None:
+            # Not even depth one finished, fall back to a greedy choice
+            best = self._greedy(board)
+        return best
+
+    def _greedy(self, board):
+        best = None
+        best_value = None
+        for direction in DIRECTIONS:
+            moved, _ = move_board(board, direction)
+            if moved != board:
+                value = evaluate(moved)
+                if best_value is None or value > best_value:
+                    best, best_value = direction, value
+        return best
+
+    def _search_root(self, board, depth):
+        best = None
+        best_value = None
+        for direction in DIRECTIONS:
+            moved, _ = move_board(board, direction)
+            if moved == board:
+                continue
+            value = self._chance(moved, depth, 1.0)
+            if best_value is None or value > best_value:
+                best, best_value = direction, value
+        return best
+
+    def _chance(self, board, depth, probability):
+        if depth <= 0 or probability < self.min_probability:
+            return evaluate(board)
+
+        key = (board, depth)
+        cache = self.cache
+        value = cache.get(key)
+        if value is not None:
+            cache.move_to_end(key)
+            return value
+
+        self.nodes += 1
+        if time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+
+        empty = empty_cells(board)
+        count = len(empty)
+        total = 0.0
+        for index in empty:
+            shift = 4 * index
+            total += 0.9 * self._max(board | (1 << shift), depth - 1,
+                                     probability * 0.9 / count)
+            total += 0.1 * self._max(board | (2 << shift), depth - 1,
+                                     probability * 0.1 / count)
+        value = total / count
+
+        cache[key] = value
+        if len(cache) > self.cache_size:
+            cache.popitem(last=False)
+        return value
+
+    def _max(self, board, depth, probability):
+        best = 0.0
+        for direction in DIRECTIONS:
+            moved, _ = move_board(board, direction)
+            if moved != board:
+                value = self._chance(moved, depth, probability)
+                if value > best:
+                    best = value
+        return best
+
+
+def _random_rollouts(board, direction, rollouts, seed):
+    """Play random games after a first move and return the summed score"""
+    ensure_tables()
+    rng = random.Random(seed)
+    first, gained = move_board(board, direction)
+    directions = list(DIRECTIONS)
+    total = 0
+    for _ in range(rollouts):
+        current = first
+        score = gained
+        while True:
+            empty = empty_cells(current)
+            if empty:
+                exponent = 1 if rng.random() < 0.9 else 2
+                current |= exponent << (4 * rng.choice(empty))
+            rng.shuffle(directions)
+            for candidate in directions:
+                moved, points = move_board(current, candidate)
+                if moved != current:
+                    current = moved
+                    score += points
+                    break
+            else:
+                break
+        total += score
+    return total
+
+
+def _warm_up(_):
+    """Pool task that only makes sure a worker is running"""
+    return os.getpid()
+
+
+class MonteCarloSearch:
+    """Random rollouts per first move, spread over a process pool"""
+
+    def __init__(self, workers=None, batch_size=4):
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.pool = None
+        # Rollouts finished by the last search, for profiling
+        self.rollouts = 0
+
+    def _get_pool(self):
+        """The worker pool, started and warmed up on first use.
+
+        Spawned workers take a while to import and build their tables, so
+        this waits for them before a search starts its clock.
+        """
+        if self.pool is None:
+            # Spawn instead of fork, the parent runs a Tk event loop
+            context = multiprocessing.get_context('spawn')
+            self.pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=context,
+                initializer=ensure_tables
+            )
+            try:
+                # One task per worker makes the pool start all of them
+                list(self.pool.map(_warm_up, range(self.workers)))
+            except concurrent.futures.process.BrokenProcessPool:
+                self.close()
+                raise
+        return self.pool
+
+    def best_move(self, board, time_budget):
+        ensure_tables()
+        legal = [d for d in DIRECTIONS if move_board(board, d)[0] != board]
+        if len(legal) < 2:
+            return legal[0] if legal else None
+
+        pool = self._get_pool()
+        deadline = time.perf_counter() + time_budget
+        totals = dict.fromkeys(legal, 0)
+        counts = dict.fromkeys(legal, 0)
+        pending = {}
+        seed = random.getrandbits(32)
+
+        def submit(direction):
+            nonlocal seed
+            seed += 1
+            future = pool.submit(_random_rollouts, board, direction,
+                                 self.batch_size, seed)
+            pending[future] = direction
+
+        # Keep every worker busy, rotating through the legal moves
+        for i in range(max(self.workers, len(legal))):
+            submit(legal[i % len(legal)])
+
+        try:
+            while pending:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                done, _ = concurrent.futures.wait(
+                    pending, timeout=remaining,
+                    return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    direction = pending.pop(future)
+                    totals[direction] += future.result()
+                    counts[direction] += self.batch_size
+                    submit(direction)
+        except concurrent.futures.process.BrokenProcessPool:
+            # A worker died, the next search starts a fresh pool
+            self.close()
+            raise
+
+        for future in pending:
+            future.cancel()
+
+        self.rollouts = sum(counts.values())
+        scored = [d for d in legal if counts[d]]
+        if not scored:
+            return legal[0]
+        return max(scored, key=lambda d: totals[d] / counts[d])
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
+
+
+class Solver2048:
+    """Front end picking the search strategy used by hints and autopilot"""
+
+    MODES = ('expectimax', 'montecarlo')
+
+    def __init__(self, mode='expectimax', time_budget=0.1):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown solver mode: {mode}")
+        self.mode = mode
+        self.time_budget = time_budget
+        self.expectimax = ExpectimaxSearch()
+        self.montecarlo = MonteCarloSearch()
+
+    def best_move(self, board):
+        if self.mode == 'montecarlo':
+            return self.montecarlo.best_move(board, self.time_budget)
+        return self.expectimax.best_move(board, self.time_budget)
+
+    def close(self):
+        self.montecarlo.close()
@@ -0,0 +1,182 @@
+"""Read-only view of a 2048 or Snake game broadcast by another screen.
+
+Usage::
+
+    python -m games.spectator [host:port/channel]
+
+The address defaults to $GAMECENTER_BROADCAST, then 127.0.0.1:8766/main.
+"""
+from . import net_protocol as proto
+from .base_game import BaseGame
+from .broadcast import Board2048Mirror, MIRRORS, parse_address, watch
+from .netplay import AsyncioPump
+import colorsys
+import os
+import sys
+import tkinter as tk
+
+
+class Spectator(BaseGame):
+    """Mirror of a broadcast game, redrawing only the cells that change.
+
+    Each cell gets a rectangle and a label the first time it is drawn,
+    later frames only recolor them. Messages are applied as they arrive
+    and the canvas catches up once per pump slice.
+    """
+
+    canvas_size = 480
+
+    colors = {
+        'bg': '#1E1E2E',
+        'text': '#F8F8F2',
+        'empty': '#2A2A3C',
+        'snake_head': '#50FA7B',
+        'snake_body': '#43B466',
+        'food': '#FF5555',
+    }
+
+    # Tile colors by exponent, matching the 2048 view up to 2048
+    tile_colors = ['#2a2a40', '#50FA7B', '#43B466', '#FF5555', '#FF6E6E', '#BD93F9',
+                   '#A571F4', '#FFB86C', '#FFA54D', '#8BE9FD', '#59C2E6', '#F1FA8C']
+
+    def __init__(self, master, address=None):
+        super().__init__(master)
+        self.address = parse_address(address or os.environ.get('GAMECENTER_BROADCAST'))
+        self.master.title(f"Spectator - {self.address[2]}")
+        self.master.configure(bg=self.colors['bg'])
+        self.frame.configure(bg=self.colors['bg'])
+        self.mirror = None
+        self.cell_items = {}
+        self.cell_size = 1
+        # Board scale set by the window size, see on_layout()
+        self.scale = 1.0
+        # Cells changed by messages since the last redraw
+        self.dirty = set()
+        self.redraw_scheduled = False
+        self.status = None
+        self.pump = None
+
+    def play(self):
+        self.canvas = tk.Canvas(self.frame, width=self.canvas_size, height=self.canvas_size,
+                                bg=self.colors['bg'], highlightthickness=0)
+        self.canvas.pack(padx=20, pady=(20, 10))
+        self.status_label = tk.Label(self.frame, text="", font=('Helvetica', 16, 'bold'),
+                                     fg=self.colors['text'], bg=self.colors['bg'])
+        self.status_label.pack(pady=(0, 20))
+        self.enable_layout(self.canvas)
+        self.show_status(f"Waiting for {self.address[2]!r}...")
+
+        self.pump = AsyncioPump(self)
+        self.pump.run(watch(*self.address, self.on_message))
+
+    def show_status(self, text):
+        if text != self.status:
+            self.status = text
+            self.status_label.config(text=text)
+
+    def on_message(self, kind, fields):
+        if kind == proto.ERROR:
+            self.show_status(fields[0])
+            return
+        try:
+            if kind == proto.STATE:
+                game_id, seq, values = fields
+                self.mirror = MIRRORS[game_id]()
+                self.cell_size = max(1, self.canvas_size // max(1, values[0])) * self.scale
+                self.canvas.delete('cells')
+                self.cell_items.clear()
+                self.dirty = self.mirror.on_state(seq, values)
+            elif kind == proto.DELTA and self.mirror is not None:
+                self.dirty |= self.mirror.on_delta(*fields)
+        except (KeyError, ValueError) as error:
+            self.show_status(f"bad broadcast: {error}")
+            return
+        if not self.redraw_scheduled:
+            self.redraw_scheduled = True
+            self.schedule(0, self.display)
+
+    def cell_font(self):
+        return ('Helvetica', max(6, int(self.cell_size // 4)), 'bold')
+
+    def on_layout(self, scale):
+        self.cell_size *= scale / self.scale
+        self.scale = scale
+        self.canvas.itemconfig('labels', font=self.cell_font())
+
+    def cell_style(self, cell):
+        """``(color, text)`` to draw ``cell`` with, None when it is empty"""
+        mirror = self.mirror
+        if isinstance(mirror, Board2048Mirror):
+            exponent = mirror.cells[cell]
+            if not exponent:
+                return None
+            if exponent < len(self.tile_colors):
+                color = self.tile_colors[exponent]
+            else:
+                r, g, b = colorsys.hls_to_rgb((exponent - 12) * 0.13 % 1.0, 0.45, 0.8)
+                color = f'#{int(r * 255):02x}{int(g * 255):02x}{int(b * 255):02x}'
+            return color, str(1 << exponent)
+        if mirror.body and cell == mirror.body[0]:
+            return self.colors['snake_head'], ''
+        if cell in mirror.occupied:
+            return self.colors['snake_body'], ''
+        if cell == mirror.food:
+            return self.colors['food'], ''
+        return None
+
+    def display(self):
+        self.redraw_scheduled = False
+        if self.mirror is None:
+            return
+        size = self.mirror.size
+        step = self.cell_size
+        gap = 1 if step >= 6 else 0
+        font = self.cell_font()
+        for cell in self.dirty:
+            style = self.cell_style(cell)
+            items = self.cell_items.get(cell)
+            if style is None:
+                if items is not None:
+                    self.canvas.itemconfig(items[0], state='hidden')
+                    self.canvas.itemconfig(items[1], state='hidden')
+                continue
+            color, text = style
+            if items is None:
+                x, y = cell % size * step, cell // size * step
+                items = self.cell_items[cell] = (
+                    self.canvas.create_rectangle(x + gap, y + gap, x + step - gap, y + step - gap,
+                                                 width=0, tags='cells'),
+                    self.canvas.create_text(x + step / 2, y + step / 2, font=font,
+                                            fill=self.colors['text'], tags=('cells', 'labels')))
+            self.canvas.itemconfig(items[0], fill=color, state='normal')
+            self.canvas.itemconfig(items[1], text=text, state='normal')
+        self.dirty = set()
+
+        mirror = self.mirror
+        status = f"Score: {mirror.score}"
+        if mirror.done:
+            status += "   Game over"
+        self.show_status(status)
+
+    def is_game_over(self):
+        return self.mirror is not None and self.mirror.done
+
+    def dispose(self):
+        if self.disposed:
+            return
+        super().dispose()
+        if self.pump is not None:
+            self.pump.close()
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    root = tk.Tk()
+    spectator = Spectator(root, argv[0] if argv else None)
+    spectator.play()
+    root.protocol('WM_DELETE_WINDOW', spectator.close)
+    root.mainloop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""Pre-rendered tile and segment images for the canvas games.
+
+Smoothed polygons and ovals are re-rasterized by Tk on every redraw. A
+``SpriteCache`` renders each shape once into a ``PhotoImage`` so a tile or
+segment is a single ``create_image`` item that Tk only has to blit.
+Shapes are filled row by row with ``PhotoImage.put``; pixels outside the
+shape stay transparent.
+"""
+import math
+import tkinter as tk
+
+
+def _row_spans(height, inset):
+    """Merge rows with equal ``inset(y)`` into ``(x_inset, y1, y2)`` runs"""
+    spans = []
+    for y in range(height):
+        x = inset(y)
+        if spans and spans[-1][0] == x and spans[-1][2] == y:
+            spans[-1][2] = y + 1
+        else:
+            spans.append([x, y, y + 1])
+    return spans
+
+
+class SpriteCache:
+    """Images keyed by shape, size and color, kept for one cell size.
+
+    The images must stay referenced while the canvas shows them, so a view
+    keeps its cache for as long as it draws. ``set_size`` drops every image
+    when the cell size changes.
+    """
+
+    def __init__(self, master):
+        self.master = master
+        self.size = None
+        self.images = {}
+
+    def __len__(self):
+        return len(self.images)
+
+    def set_size(self, size):
+        if size != self.size:
+            self.size = size
+            self.images.clear()
+
+    def rounded_rect(self, width, height, radius, color):
+        key = ('rect', width, height, radius, color)
+        image = self.images.get(key)
+        if image is None:
+            image = tk.PhotoImage(master=self.master, width=width, height=height)
+            radius = min(radius, width // 2, height // 2)
+
+            def inset(y):
+                # Distance from the nearest corner circle's center row
+                dy = max(radius - y - 0.5, y + 0.5 - (height - radius), 0)
+                return round(radius - math.sqrt(max(0, radius * radius - dy * dy)))
+
+            for x, y1, y2 in _row_spans(height, inset):
+                image.put(color, to=(x, y1, width - x, y2))
+            self.images[key] = image
+        return image
+
+    def disc(self, diameter, color, outline=None, outline_width=0):
+        key = ('disc', diameter, color, outline, outline_width)
+        image = self.images.get(key)
+        if image is None:
+            image = tk.PhotoImage(master=self.master, width=diameter, height=diameter)
+            layers = [(diameter / 2, color)]
+            if outline:
+                layers = [(diameter / 2, outline), (diameter / 2 - outline_width, color)]
+            # An outline is a larger disc with the fill painted over it
+            for radius, fill in layers:
+                def inset(y, radius=radius):
+                    dy = y + 0.5 - diameter / 2
+                    if abs(dy) >= radius:
+                        return None
+                    return round(diameter / 2 - math.sqrt(radius * radius - dy * dy))
+
+                for x, y1, y2 in _row_spans(diameter, inset):
+                    if x is not None and x < diameter - x:
+                        image.put(fill, to=(x, y1, diameter - x, y2))
+            self.images[key] = image
+        return image
@@ -0,0 +1,71 @@
+"""Startup timing for the game center.
+
+``StartupTimer`` records named milestones since process start and, with its
+import hook installed, how long every module import took in the same
+self / cumulative layout as ``python -X importtime``.
+"""
+import builtins
+import sys
+import time
+
+
+class StartupTimer:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.marks = []
+        self.imports = []
+        self.original_import = None
+        self.stack = []
+
+    def install_import_hook(self):
+        self.original_import = builtins.__import__
+        builtins.__import__ = self.timed_import
+
+    def remove_import_hook(self):
+        if self.original_import is not None:
+            builtins.__import__ = self.original_import
+            self.original_import = None
+
+    def timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        modules = len(sys.modules)
+        # Time spent in nested imports is subtracted to get self time
+        self.stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            return self.original_import(name, globals, locals, fromlist, level)
+        finally:
+            cumulative = time.perf_counter() - start
+            nested = self.stack.pop()
+            if self.stack:
+                self.stack[-1] += cumulative
+            if len(sys.modules) != modules:
+                # Only record imports that actually loaded something
+                self.imports.append((self.module_name(name, globals, fromlist, level),
+                                     cumulative - nested, cumulative, len(self.stack)))
+
+    @staticmethod
+    def module_name(name, globals, fromlist, level):
+        if not level:
+            return name
+        # Resolve relative imports against the importing package
+        package = (globals or {}).get('__package__') or ''
+        if level > 1:
+            package = package.rsplit('.', level - 1)[0]
+        if name:
+            return f"{package}.{name}"
+        return f"{package}.{','.join(fromlist or ())}"
+
+    def mark(self, label):
+        self.marks.append((label, time.perf_counter() - self.start))
+
+    def record(self, label, seconds):
+        self.marks.append((label, seconds))
+
+    def report(self, file=None):
+        file = file or sys.stderr
+        print("import time: self [us] | cumulative | imported package", file=file)
+        for name, self_time, cumulative, depth in self.imports:
+            print(f"import time: {self_time * 1e6:9.0f} | {cumulative * 1e6:10.0f} | "
+                  f"{'  ' * depth}{name}", file=file)
+        for label, seconds in self.marks:
+            print(f"startup: {seconds * 1000:8.1f} ms  {label}", file=file)
@@ -0,0 +1,181 @@
+"""High scores and saved games in a local SQLite database.
+
+The database runs in WAL mode so reads never wait for the writer. Every
+write is queued and applied by a background thread in batches, one
+transaction per batch, so the Tk main loop never blocks on disk I/O.
+Reads use their own connection and hit the ``(game, score)`` index.
+``load_state`` first waits for queued writes, so a game closed and opened
+again at once resumes the save its close just queued.
+
+The database lives in ``~/.python_game_center/gamecenter.db`` unless
+``GAMECENTER_DB`` points somewhere else.
+"""
+import atexit
+import os
+import queue
+import sqlite3
+import sys
+import threading
+import time
+
+DEFAULT_PATH = os.path.join(os.path.expanduser('~'), '.python_game_center',
+                            'gamecenter.db')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    id INTEGER PRIMARY KEY,
+    game TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    played_at REAL NOT NULL,
+    replay BLOB
+);
+CREATE INDEX IF NOT EXISTS scores_game_score ON scores (game, score DESC);
+CREATE TABLE IF NOT EXISTS saves (
+    game TEXT PRIMARY KEY,
+    state BLOB NOT NULL,
+    saved_at REAL NOT NULL
+);
+"""
+
+_store = None
+
+
+def get_store():
+    """Return the shared store, opening it on first use"""
+    global _store
+    if _store is None:
+        _store = ScoreStore(os.environ.get('GAMECENTER_DB', DEFAULT_PATH))
+        atexit.register(_store.close)
+    return _store
+
+
+class ScoreStore:
+    """Score and save-state store with a batching writer thread"""
+
+    # Most writes committed in one transaction
+    batch_size = 256
+    # How long the writer waits for more writes before committing a batch
+    batch_delay = 0.05
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        connection = self.connect()
+        connection.executescript(SCHEMA)
+        connection.close()
+
+        self.writes = queue.Queue()
+        self.readers = threading.local()
+        self.closed = False
+        self.writer = threading.Thread(target=self.write_loop, daemon=True)
+        self.writer.start()
+
+    def connect(self):
+        connection = sqlite3.connect(self.path)
+        connection.execute('PRAGMA journal_mode=WAL')
+        # WAL keeps the database consistent without a sync on every commit
+        connection.execute('PRAGMA synchronous=NORMAL')
+        return connection
+
+    def reader(self):
+        """Read connection of the calling thread"""
+        connection = getattr(self.readers, 'connection', None)
+        if connection is None:
+            connection = self.readers.connection = self.connect()
+        return connection
+
+    # Writes, queued for the background thread
+
+    def add_score(self, game, score, replay=None):
+        """Record a finished game, ``replay`` is its action log if known"""
+        self.put('INSERT INTO scores (game, score, played_at, replay) VALUES (?, ?, ?, ?)',
+                 (game, score, time.time(), replay))
+
+    def save_state(self, game, state):
+        """Keep ``state`` (a core snapshot) as the game's resume point"""
+        self.put('INSERT OR REPLACE INTO saves (game, state, saved_at) VALUES (?, ?, ?)',
+                 (game, state, time.time()))
+
+    def delete_state(self, game):
+        self.put('DELETE FROM saves WHERE game = ?', (game,))
+
+    def put(self, sql, params):
+        if self.closed:
+            raise RuntimeError("score store is closed")
+        self.writes.put((sql, params))
+
+    def write_loop(self):
+        connection = self.connect()
+        running = True
+        while running:
+            batch = [self.writes.get()]
+            deadline = time.monotonic() + self.batch_delay
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(self.writes.get(timeout=timeout))
+                except queue.Empty:
+                    break
+
+            statements = [item for item in batch if item is not None]
+            running = len(statements) == len(batch)
+            try:
+                with connection:
+                    for sql, params in statements:
+                        connection.execute(sql, params)
+            except sqlite3.Error as error:
+                # The batch is rolled back, keep the writer alive for the next
+                print(f"score store: dropped {len(statements)} writes: {error}",
+                      file=sys.stderr)
+            for _ in batch:
+                self.writes.task_done()
+        connection.close()
+
+    def flush(self):
+        """Block until every queued write is committed"""
+        self.writes.join()
+
+    def close(self):
+        """Commit pending writes and stop the writer thread"""
+        if self.closed:
+            return
+        self.closed = True
+        self.writes.put(None)
+        self.writer.join()
+        connection = getattr(self.readers, 'connection', None)
+        if connection is not None:
+            connection.close()
+            self.readers.connection = None
+
+    # Reads, answered from the calling thread's connection
+
+    def top_scores(self, game, limit=10):
+        """Best ``limit`` scores of a game as ``(id, score, played_at)`` rows"""
+        return self.reader().execute(
+            'SELECT id, score, played_at FROM scores WHERE game = ? '
+            'ORDER BY score DESC LIMIT ?', (game, limit)).fetchall()
+
+    def best_score(self, game):
+        row = self.reader().execute(
+            'SELECT MAX(score) FROM scores WHERE game = ?', (game,)).fetchone()
+        return row[0] or 0
+
+    def load_state(self, game):
+        """Saved snapshot of a game, or None.
+
+        Waits for queued writes first: a save or delete still in the queue
+        would otherwise bring back the state before it.
+        """
+        self.flush()
+        row = self.reader().execute(
+            'SELECT state FROM saves WHERE game = ?', (game,)).fetchone()
+        return row[0] if row else None
+
+    def replay(self, score_id):
+        """Action log stored with a score, see ``games.replay``"""
+        row = self.reader().execute(
+            'SELECT replay FROM scores WHERE id = ?', (score_id,)).fetchone()
+        return row[0] if row else None
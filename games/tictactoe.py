@@ -1,11 +1,25 @@
 from .base_game import BaseGame
+from .tictactoe_core import TicTacToeCore
+from .tictactoe_ai import AlphaBetaAI
+from . import tictactoe_solver
 import tkinter as tk
 from tkinter import ttk
+import queue
+import threading
 
 class TicTacToe(BaseGame):
-    def __init__(self, master):
+    # Computer opponent settings
+    computer_player = 'O'
+    computer_delay = 300
+    computer_time_limit = 1.0
+    search_poll_interval = 15
+
+    def __init__(self, master, rows=3, cols=3, win_length=3):
         super().__init__(master)
-        self.master.title("Tic Tac Toe")
+        if (rows, cols, win_length) == (3, 3, 3):
+            self.master.title("Tic Tac Toe")
+        else:
+            self.master.title(f"Tic Tac Toe {rows}x{cols} - {win_length} in a row")
         # Modern color scheme
         self.colors = {
             'bg': '#1e1e2f',
@@ -19,25 +33,59 @@ class TicTacToe(BaseGame):
         }
         
         self.master.configure(bg=self.colors['bg'])
+        # Cells shrink as the board grows so large variants still fit
+        longest = max(rows, cols)
+        self.cell_font_size = max(8, 28 * 3 // longest)
+        # Font size at the opening window size, see on_layout()
+        self.base_cell_font_size = self.cell_font_size
+        self.cell_width = 3 if longest <= 5 else 2
+        self.cell_padding = 4 if longest <= 5 else 1
+        cell_px = max(32, 330 // longest)
+
         # Center window
-        window_width = 400
-        window_height = 500
+        window_width = max(400, cols * cell_px + 80)
+        window_height = rows * cell_px + 230
         screen_width = self.master.winfo_screenwidth()
         screen_height = self.master.winfo_screenheight()
         x = (screen_width - window_width) // 2
         y = (screen_height - window_height) // 2
         self.master.geometry(f'{window_width}x{window_height}+{x}+{y}')
         
+        # The rules live in the headless core, this class only draws it
+        self.core = TicTacToeCore(rows, cols, win_length)
+        self.core.subscribe(self.on_core_event)
+        self.vs_computer = False
+
+        # Classic boards use the solved table, larger ones a timed search
+        # that runs on a worker thread so the window stays responsive
+        self.ai = None
+        if not self.core.classic:
+            self.ai = AlphaBetaAI(rows, cols, win_length,
+                                  time_limit=self.computer_time_limit)
+        self.search_results = queue.Queue()
+        self.search_thread = None
+        self.search_generation = 0
         self.initialize_game()
 
-    def initialize_game(self):
-        self.current_player = 'X'
-        self.board = [[' ' for _ in range(3)] for _ in range(3)]
-        self.buttons = [[None for _ in range(3)] for _ in range(3)]
+    def initialize_game(self, seed=None):
+        self.cancel_all()
+        self.search_generation += 1
+        self.core.reset(seed)
+        self.buttons = [[None for _ in range(self.core.cols)] for _ in range(self.core.rows)]
         self.game_active = True
 
+    @property
+    def board(self):
+        return self.core.board
+
+    @property
+    def current_player(self):
+        return self.core.current_player
+
     def play(self):
-        self.frame.pack_forget()
+        # Destroy the previous board instead of hiding it, restarts would
+        # otherwise pile up hidden frames and buttons
+        self.frame.destroy()
         self.frame = tk.Frame(self.master, bg=self.colors['bg'])
         self.frame.pack(expand=True, padx=20, pady=20)
 
@@ -53,11 +101,11 @@ class TicTacToe(BaseGame):
         board_frame = tk.Frame(self.frame, bg=self.colors['bg'])
         board_frame.pack()
 
-        for i in range(3):
-            for j in range(3):
+        for i in range(self.core.rows):
+            for j in range(self.core.cols):
                 self.buttons[i][j] = tk.Button(board_frame, text='',
-                                             font=('Helvetica Neue', 28, 'bold'),
-                                             width=3, height=1,
+                                             font=self.cell_font(),
+                                             width=self.cell_width, height=1,
                                              bg=self.colors['button'],
                                              fg=self.colors['text'],
                                              activebackground=self.colors['button_hover'],
@@ -65,13 +113,15 @@ class TicTacToe(BaseGame):
                                              relief='flat',
                                              borderwidth=0,
                                              command=lambda row=i, col=j: self.make_move(row, col))
-                self.buttons[i][j].grid(row=i, column=j, padx=4, pady=4)
+                self.buttons[i][j].grid(row=i, column=j,
+                                        padx=self.cell_padding, pady=self.cell_padding)
                 
                 # Bind hover events
                 self.buttons[i][j].bind('<Enter>', 
                     lambda e, btn=self.buttons[i][j]: btn.configure(bg=self.colors['button_hover']))
                 self.buttons[i][j].bind('<Leave>', 
                     lambda e, btn=self.buttons[i][j]: btn.configure(bg=self.colors['button']))
+        self.enable_layout(board_frame)
 
         # Modern restart button
         self.restart_button = tk.Button(self.frame, 
@@ -86,36 +136,124 @@ class TicTacToe(BaseGame):
                                       padx=20,
                                       pady=10,
                                       command=self.restart_game)
-        self.restart_button.pack(pady=30)
+        self.restart_button.pack(pady=(30, 10))
+
+        # Toggle between hot-seat and playing against the computer
+        self.mode_button = tk.Button(self.frame,
+                                   text=self.mode_text(),
+                                   font=('Helvetica Neue', 12, 'bold'),
+                                   bg=self.colors['button'],
+                                   fg=self.colors['text'],
+                                   activebackground=self.colors['button_hover'],
+                                   activeforeground=self.colors['text'],
+                                   relief='flat',
+                                   borderwidth=0,
+                                   padx=20,
+                                   pady=10,
+                                   command=self.toggle_computer)
+        self.mode_button.pack()
         
-        # Bind hover events for restart button
-        self.restart_button.bind('<Enter>', 
-            lambda e: self.restart_button.configure(bg=self.colors['button_hover']))
-        self.restart_button.bind('<Leave>', 
-            lambda e: self.restart_button.configure(bg=self.colors['button']))
+        # Bind hover events for restart and mode buttons
+        for button in (self.restart_button, self.mode_button):
+            button.bind('<Enter>', 
+                lambda e, btn=button: btn.configure(bg=self.colors['button_hover']))
+            button.bind('<Leave>', 
+                lambda e, btn=button: btn.configure(bg=self.colors['button']))
+
+    def cell_font(self):
+        return ('Helvetica Neue', self.cell_font_size, 'bold')
+
+    def on_layout(self, scale):
+        # Buttons are sized by their font, so the font scales the board
+        self.cell_font_size = max(6, round(self.base_cell_font_size * scale))
+        font = self.cell_font()
+        for row in self.buttons:
+            for button in row:
+                if button is not None:
+                    button.configure(font=font)
+
+    def mode_text(self):
+        return "Mode: vs Computer" if self.vs_computer else "Mode: Two Players"
+
+    def toggle_computer(self):
+        self.vs_computer = not self.vs_computer
+        self.mode_button.configure(text=self.mode_text())
+        self.computer_turn()
+
+    def computer_turn(self):
+        if self.vs_computer and self.game_active and self.current_player == self.computer_player:
+            self.schedule(self.computer_delay, self.computer_move)
+
+    def computer_move(self):
+        if not self.game_active or self.current_player != self.computer_player:
+            return
+        if self.ai is None:
+            # Perfect play is a single lookup in the precomputed table
+            move = tictactoe_solver.best_move(self.core)
+            if move is not None:
+                self.core.step(move)
+            return
+
+        if self.search_thread is not None and self.search_thread.is_alive():
+            # A search from before a restart is still finishing
+            self.schedule(self.search_poll_interval, self.computer_move)
+            return
+        cells = self.core.cells()
+        player = 1 if self.computer_player == 'X' else 2
+        generation = self.search_generation
+
+        def worker():
+            self.search_results.put((generation, cells, self.ai.choose_move(cells, player)))
+
+        self.search_thread = threading.Thread(target=worker, daemon=True)
+        self.search_thread.start()
+        self.schedule(self.search_poll_interval, self.poll_search)
+
+    def poll_search(self):
+        try:
+            generation, cells, move = self.search_results.get_nowait()
+        except queue.Empty:
+            generation = None
+        if generation != self.search_generation:
+            # Nothing yet, or a stale result from before a restart
+            self.schedule(self.search_poll_interval, self.poll_search)
+            return
+        # Only play the move if the position is still the one searched
+        if move is not None and self.game_active and cells == self.core.cells():
+            self.core.step(move)
 
     def make_move(self, row, col):
+        if self.vs_computer and self.current_player == self.computer_player:
+            return
         if self.board[row][col] == ' ' and self.game_active:
-            self.board[row][col] = self.current_player
-            color = self.colors['x_color'] if self.current_player == 'X' else self.colors['o_color']
-            self.buttons[row][col].configure(text=self.current_player,
-                                           fg=color,
-                                           bg=self.colors['button'])
-            
-            if self.check_winner():
-                self.game_active = False
-                self.status.configure(text=f"Player {self.current_player} wins!",
-                                    fg=self.colors['win'])
-                self.highlight_winner()
-            elif self.is_game_over():
-                self.game_active = False
-                self.status.configure(text="It's a tie!",
-                                    fg=self.colors['tie'])
-            else:
-                self.current_player = 'O' if self.current_player == 'X' else 'X'
-                color = self.colors['x_color'] if self.current_player == 'X' else self.colors['o_color']
-                self.status.configure(text=f"Player {self.current_player}'s turn",
-                                    fg=color)
+            self.core.step((row, col))
+
+    def on_core_event(self, core, event):
+        if event != 'move':
+            return
+        row, col, player = core.last_move
+        color = self.colors['x_color'] if player == 'X' else self.colors['o_color']
+        self.buttons[row][col].configure(text=player,
+                                       fg=color,
+                                       bg=self.colors['button'])
+
+        if core.is_terminal():
+            self.save_replay()
+
+        if core.winner:
+            self.game_active = False
+            self.status.configure(text=f"Player {player} wins!",
+                                fg=self.colors['win'])
+            self.highlight_winner()
+        elif core.is_terminal():
+            self.game_active = False
+            self.status.configure(text="It's a tie!",
+                                fg=self.colors['tie'])
+        else:
+            color = self.colors['x_color'] if core.current_player == 'X' else self.colors['o_color']
+            self.status.configure(text=f"Player {core.current_player}'s turn",
+                                fg=color)
+            self.computer_turn()
 
     def highlight_winner(self):
         winning_combo = self.get_winning_combination()
@@ -124,44 +262,22 @@ class TicTacToe(BaseGame):
                 self.buttons[row][col].configure(bg=self.colors['win'])
 
     def get_winning_combination(self):
-        # Check rows
-        for i in range(3):
-            if self.board[i][0] == self.board[i][1] == self.board[i][2] != ' ':
-                return [(i,0), (i,1), (i,2)]
-        # Check columns
-        for i in range(3):
-            if self.board[0][i] == self.board[1][i] == self.board[2][i] != ' ':
-                return [(0,i), (1,i), (2,i)]
-        # Check diagonals
-        if self.board[0][0] == self.board[1][1] == self.board[2][2] != ' ':
-            return [(0,0), (1,1), (2,2)]
-        if self.board[0][2] == self.board[1][1] == self.board[2][0] != ' ':
-            return [(0,2), (1,1), (2,0)]
-        return None
-
-    def restart_game(self):
-        self.initialize_game()
+        return self.core.get_winning_combination()
+
+    def restart(self, seed=None):
+        self.restart_game(seed)
+
+    def restart_game(self, seed=None):
+        self.initialize_game(seed)
         self.play()
 
     def display(self):
-        for i in range(3):
-            for j in range(3):
+        for i in range(self.core.rows):
+            for j in range(self.core.cols):
                 self.buttons[i][j].config(text=self.board[i][j])
 
     def check_winner(self):
-        # Check rows, columns and diagonals
-        for i in range(3):
-            if self.board[i][0] == self.board[i][1] == self.board[i][2] != ' ':
-                return True
-            if self.board[0][i] == self.board[1][i] == self.board[2][i] != ' ':
-                return True
-        if self.board[0][0] == self.board[1][1] == self.board[2][2] != ' ':
-            return True
-        if self.board[0][2] == self.board[1][1] == self.board[2][0] != ' ':
-            return True
-        return False
+        return self.core.check_winner()
 
     def is_game_over(self):
-        if self.check_winner():
-            return True
-        return all(cell != ' ' for row in self.board for cell in row)
+        return self.core.is_terminal()
@@ -0,0 +1,245 @@
+"""Alpha-beta computer player for m,n,k boards such as Gomoku.
+
+The search is an iterative deepening negamax with a Zobrist-hashed
+transposition table. Every window of ``win_length`` cells keeps a count of
+each player's marks, so placing a mark updates the evaluation and detects
+wins by touching only the windows through that cell. Only empty cells near
+existing marks are searched, best-looking first.
+"""
+import random
+import time
+
+from .tictactoe_core import LINE_DIRECTIONS
+
+WIN_SCORE = 10 ** 9
+
+EXACT, LOWER, UPPER = range(3)
+
+
+class SearchTimeout(Exception):
+    """Raised inside a search when its time budget is exhausted"""
+
+
+class AlphaBetaAI:
+    def __init__(self, rows, cols, win_length, time_limit=1.0,
+                 max_candidates=12, neighbour_radius=2, table_size=200000,
+                 seed=None):
+        self.rows = rows
+        self.cols = cols
+        self.win_length = win_length
+        self.time_limit = time_limit
+        self.max_candidates = max_candidates
+        self.table_size = table_size
+        size = rows * cols
+
+        # Every run of win_length cells and the runs each cell belongs to
+        self.windows = []
+        for r in range(rows):
+            for c in range(cols):
+                for dr, dc in LINE_DIRECTIONS:
+                    end_r = r + dr * (win_length - 1)
+                    end_c = c + dc * (win_length - 1)
+                    if 0 <= end_r < rows and 0 <= end_c < cols:
+                        self.windows.append(tuple(
+                            (r + dr * i) * cols + c + dc * i
+                            for i in range(win_length)
+                        ))
+        self.cell_windows = [[] for _ in range(size)]
+        for w, window in enumerate(self.windows):
+            for cell in window:
+                self.cell_windows[cell].append(w)
+
+        # Score of a window holding n marks of a single player
+        self.weights = [0] + [10 ** (2 * n) for n in range(win_length - 1)] + [WIN_SCORE]
+
+        self.neighbours = []
+        for r in range(rows):
+            for c in range(cols):
+                self.neighbours.append([
+                    nr * cols + nc
+                    for nr in range(max(0, r - neighbour_radius), min(rows, r + neighbour_radius + 1))
+                    for nc in range(max(0, c - neighbour_radius), min(cols, c + neighbour_radius + 1))
+                    if (nr, nc) != (r, c)
+                ])
+
+        rng = random.Random(seed)
+        self.zobrist = [[0, rng.getrandbits(64), rng.getrandbits(64)] for _ in range(size)]
+        self.table = {}
+        self.nodes = 0
+
+    def load(self, cells):
+        """Set up search state for a flat board of 0 / 1 (X) / 2 (O)"""
+        self.board = [0] * len(cells)
+        self.counts = [None, [0] * len(self.windows), [0] * len(self.windows)]
+        self.near = [0] * len(cells)
+        self.hash = 0
+        self.score = 0
+        for cell, player in enumerate(cells):
+            if player:
+                self.place(cell, player)
+
+    def window_value(self, w):
+        x = self.counts[1][w]
+        o = self.counts[2][w]
+        if o == 0:
+            return self.weights[x]
+        if x == 0:
+            return -self.weights[o]
+        return 0
+
+    def place(self, cell, player):
+        """Put a mark down, returns True if it completes a line"""
+        self.board[cell] = player
+        self.hash ^= self.zobrist[cell][player]
+        counts = self.counts[player]
+        won = False
+        for w in self.cell_windows[cell]:
+            self.score -= self.window_value(w)
+            counts[w] += 1
+            self.score += self.window_value(w)
+            if counts[w] == self.win_length:
+                won = True
+        for other in self.neighbours[cell]:
+            self.near[other] += 1
+        return won
+
+    def remove(self, cell, player):
+        self.board[cell] = 0
+        self.hash ^= self.zobrist[cell][player]
+        counts = self.counts[player]
+        for w in self.cell_windows[cell]:
+            self.score -= self.window_value(w)
+            counts[w] -= 1
+            self.score += self.window_value(w)
+        for other in self.neighbours[cell]:
+            self.near[other] -= 1
+
+    def candidates(self, player, first=None):
+        board = self.board
+        near = self.near
+        moves = [cell for cell in range(len(board)) if not board[cell] and near[cell]]
+        if not moves:
+            empty = [cell for cell in range(len(board)) if not board[cell]]
+            if not empty:
+                return []
+            center = (self.rows // 2) * self.cols + self.cols // 2
+            return [center] if center in empty else empty[:1]
+
+        # Rank by how much a mark here builds our lines and blocks theirs
+        own = self.counts[player]
+        theirs = self.counts[3 - player]
+        weights = self.weights
+
+        def urgency(cell):
+            value = 0
+            for w in self.cell_windows[cell]:
+                if not theirs[w]:
+                    value += weights[own[w] + 1]
+                if not own[w]:
+                    value += weights[theirs[w] + 1]
+            return value
+
+        moves.sort(key=urgency, reverse=True)
+        moves = moves[:self.max_candidates]
+        if first is not None and first in moves:
+            moves.remove(first)
+            moves.insert(0, first)
+        return moves
+
+    def choose_move(self, cells, player):
+        """Best ``(row, col)`` for ``player`` (1 = X, 2 = O) in the time limit"""
+        self.deadline = time.perf_counter() + self.time_limit
+        self.nodes = 0
+        self.load(cells)
+
+        moves = self.candidates(player)
+        if not moves:
+            return None
+        best = moves[0]
+
+        depth = 1
+        max_depth = sum(1 for cell in cells if not cell)
+        while depth <= max_depth:
+            try:
+                move, score = self.search_root(depth, player)
+            except SearchTimeout:
+                break
+            best = move
+            if abs(score) >= WIN_SCORE:
+                # A forced result was found, deeper search cannot change it
+                break
+            depth += 1
+        return divmod(best, self.cols)
+
+    def search_root(self, depth, player):
+        entry = self.table.get(self.hash)
+        moves = self.candidates(player, entry[3] if entry else None)
+        alpha = -WIN_SCORE * 2
+        beta = WIN_SCORE * 2
+        best = moves[0]
+        for cell in moves:
+            if self.place(cell, player):
+                score = WIN_SCORE + depth
+            else:
+                score = -self.negamax(depth - 1, -beta, -alpha, 3 - player)
+            self.remove(cell, player)
+            if score > alpha:
+                alpha, best = score, cell
+        self.store(depth, alpha, EXACT, best)
+        return best, alpha
+
+    def negamax(self, depth, alpha, beta, player):
+        self.nodes += 1
+        if time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+
+        entry = self.table.get(self.hash)
+        if entry is not None and entry[0] >= depth:
+            _, score, flag, _ = entry
+            if flag == EXACT:
+                return score
+            if flag == LOWER:
+                alpha = max(alpha, score)
+            elif flag == UPPER:
+                beta = min(beta, score)
+            if alpha >= beta:
+                return score
+
+        if depth == 0:
+            return self.score if player == 1 else -self.score
+
+        moves = self.candidates(player, entry[3] if entry else None)
+        if not moves:
+            return 0  # board full, draw
+
+        original_alpha = alpha
+        best = -WIN_SCORE * 2
+        best_move = moves[0]
+        for cell in moves:
+            if self.place(cell, player):
+                score = WIN_SCORE + depth
+            else:
+                score = -self.negamax(depth - 1, -beta, -alpha, 3 - player)
+            self.remove(cell, player)
+            if score > best:
+                best, best_move = score, cell
+            if best > alpha:
+                alpha = best
+            if alpha >= beta:
+                break
+
+        if best <= original_alpha:
+            flag = UPPER
+        elif best >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.store(depth, best, flag, best_move)
+        return best
+
+    def store(self, depth, score, flag, move):
+        table = self.table
+        if len(table) >= self.table_size and self.hash not in table:
+            # Dicts keep insertion order, drop the oldest entry
+            del table[next(iter(table))]
+        table[self.hash] = (depth, score, flag, move)
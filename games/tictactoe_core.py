@@ -0,0 +1,132 @@
+from .base_core import BaseCore
+
+# Bit i of a player's mask is the cell (i // 3, i % 3) of the classic board
+LINES = (
+    (0, 1, 2), (3, 4, 5), (6, 7, 8),  # rows
+    (0, 3, 6), (1, 4, 7), (2, 5, 8),  # columns
+    (0, 4, 8), (2, 4, 6)              # diagonals
+)
+LINE_MASKS = tuple(sum(1 << i for i in line) for line in LINES)
+
+# Index of the first complete line for every 9-bit mask, -1 if none
+WINNING_LINE = tuple(
+    next((k for k, line in enumerate(LINE_MASKS) if mask & line == line), -1)
+    for mask in range(512)
+)
+
+# Row and column steps of the four line directions through a cell
+LINE_DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+
+class TicTacToeCore(BaseCore):
+    """Headless m,n,k game rules: get ``win_length`` marks in a row.
+
+    The defaults give classic Tic Tac Toe, 15x15 with 5 in a row is Gomoku.
+    Actions are ``(row, col)`` tuples. Events sent to listeners: ``reset``
+    and ``move`` after every placed mark.
+    """
+
+    game_id = 'tictactoe'
+
+    def __init__(self, rows=3, cols=3, win_length=3):
+        super().__init__()
+        if win_length > max(rows, cols):
+            raise ValueError("win_length does not fit on the board")
+        self.rows = rows
+        self.cols = cols
+        self.win_length = win_length
+        # The classic board uses the precomputed line mask tables
+        self.classic = (rows, cols, win_length) == (3, 3, 3)
+        self.reset()
+
+    def reset(self, seed=None):
+        # No chance in the rules, seeding still starts the action log
+        self.seed_game(seed)
+        self.current_player = 'X'
+        self.board = [[' ' for _ in range(self.cols)] for _ in range(self.rows)]
+        self.masks = {'X': 0, 'O': 0}
+        self.move_count = 0
+        self.winner = None
+        self.winning_line = None
+        self.last_move = None
+        if self.listeners:
+            self.notify('reset')
+
+    def step(self, action):
+        row, col = action
+        if self.is_terminal() or self.board[row][col] != ' ':
+            raise ValueError(f"Illegal move: {action}")
+        self.record(action)
+
+        player = self.current_player
+        self.board[row][col] = player
+        self.move_count += 1
+        self.last_move = (row, col, player)
+
+        if self.classic:
+            self.masks[player] |= 1 << (3 * row + col)
+            line = WINNING_LINE[self.masks[player]]
+            if line >= 0:
+                self.winning_line = [(i // 3, i % 3) for i in LINES[line]]
+        else:
+            self.winning_line = self.line_through(row, col, player)
+
+        if self.winning_line:
+            self.winner = player
+        elif not self.is_terminal():
+            self.current_player = 'O' if player == 'X' else 'X'
+
+        if self.listeners:
+            self.notify('move')
+        return (1 if self.winner else 0), self.is_terminal()
+
+    def line_through(self, row, col, player):
+        """Return the cells of a winning run through (row, col), if any.
+
+        Only the four lines through the last move can have changed, so this
+        is all the win detection a move needs.
+        """
+        for dr, dc in LINE_DIRECTIONS:
+            cells = [(row, col)]
+            for sign in (1, -1):
+                r = row + sign * dr
+                c = col + sign * dc
+                while (0 <= r < self.rows and 0 <= c < self.cols
+                       and self.board[r][c] == player):
+                    cells.append((r, c))
+                    r += sign * dr
+                    c += sign * dc
+            if len(cells) >= self.win_length:
+                return sorted(cells)
+        return None
+
+    def options(self):
+        return (self.rows, self.cols, self.win_length)
+
+    def encode_action(self, action):
+        return action[0] * self.cols + action[1]
+
+    def decode_action(self, code):
+        return divmod(code, self.cols)
+
+    def legal_actions(self):
+        if self.winner:
+            return []
+        return [(i, j) for i in range(self.rows) for j in range(self.cols)
+                if self.board[i][j] == ' ']
+
+    def is_terminal(self):
+        if self.winner:
+            return True
+        return self.move_count == self.rows * self.cols
+
+    def get_winning_combination(self):
+        return self.winning_line
+
+    def check_winner(self):
+        return self.winner is not None
+
+    def cells(self):
+        """Board as a flat list of 0 (empty), 1 (X) and 2 (O)"""
+        codes = {' ': 0, 'X': 1, 'O': 2}
+        return [codes[cell] for row in self.board for cell in row]
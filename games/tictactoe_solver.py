@@ -0,0 +1,139 @@
+"""Perfect-play Tic Tac Toe from a precomputed table.
+
+Boards are encoded in base 3 (cell i contributes ``value * 3**i`` with
+0 = empty, 1 = X, 2 = O) and reduced to the smallest encoding among their
+8 symmetries. The table holds one byte per encoding: the game value for the
+player to move in the high nibble (0 loss, 1 draw, 2 win) and the best cell
+of the canonical board in the low nibble. It is shipped as a file and
+memory-mapped, so a computer move is a single lookup.
+"""
+import mmap
+import os
+
+from .tictactoe_core import LINE_MASKS
+
+TABLE_PATH = os.path.join(os.path.dirname(__file__), 'data', 'tictactoe.bin')
+TABLE_SIZE = 3 ** 9
+UNKNOWN = 0xFF
+
+LOSS, DRAW, WIN = range(3)
+
+POW3 = tuple(3 ** i for i in range(9))
+
+
+def _rotate(perm):
+    # Cell (r, c) of the rotated board comes from (2 - c, r)
+    return tuple(perm[3 * (2 - c) + r] for r in range(3) for c in range(3))
+
+
+def _build_symmetries():
+    identity = tuple(range(9))
+    mirror = tuple(3 * r + (2 - c) for r in range(3) for c in range(3))
+    perms = []
+    for start in (identity, mirror):
+        perm = start
+        for _ in range(4):
+            perms.append(perm)
+            perm = _rotate(perm)
+    return tuple(perms)
+
+
+# perm[k] is the cell of the original board that lands on cell k
+SYMMETRIES = _build_symmetries()
+
+_table = None
+
+
+def canonical(cells):
+    """Return ``(index, perm)`` of the smallest symmetric encoding"""
+    best = None
+    best_perm = None
+    for perm in SYMMETRIES:
+        index = 0
+        for k in range(9):
+            index += cells[perm[k]] * POW3[k]
+        if best is None or index < best:
+            best, best_perm = index, perm
+    return best, best_perm
+
+
+def _wins(mask):
+    for line in LINE_MASKS:
+        if mask & line == line:
+            return True
+    return False
+
+
+def build_table():
+    """Solve the full game tree and return the table as a bytearray"""
+    table = bytearray([UNKNOWN]) * TABLE_SIZE
+    scores = {}
+    cells = [0] * 9
+
+    def solve(player, masks):
+        # Score for the player to move: the more empty cells left when a
+        # game is won, the better, so quick wins beat slow ones
+        index, perm = canonical(cells)
+        if index in scores:
+            return scores[index]
+
+        best = None
+        best_cell = None
+        for cell in range(9):
+            if cells[cell]:
+                continue
+            cells[cell] = player
+            masks[player - 1] |= 1 << cell
+            empty = cells.count(0)
+            if _wins(masks[player - 1]):
+                score = empty + 1
+            elif not empty:
+                score = 0
+            else:
+                score = -solve(3 - player, masks)
+            masks[player - 1] &= ~(1 << cell)
+            cells[cell] = 0
+            if best is None or score > best:
+                best, best_cell = score, cell
+
+        value = WIN if best > 0 else LOSS if best < 0 else DRAW
+        table[index] = (value << 4) | perm.index(best_cell)
+        scores[index] = best
+        return best
+
+    solve(1, [0, 0])
+    return table
+
+
+def write_table(path=TABLE_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(build_table())
+
+
+def load_table(path=TABLE_PATH):
+    """Memory-map the shipped table, building it first if it is missing"""
+    global _table
+    if _table is None:
+        if not os.path.exists(path):
+            write_table(path)
+        with open(path, 'rb') as f:
+            _table = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return _table
+
+
+def lookup(cells):
+    """Return ``(value, cell)`` for the player to move, cell is 0..8"""
+    index, perm = canonical(cells)
+    entry = load_table()[index]
+    if entry == UNKNOWN:
+        return None, None
+    return entry >> 4, perm[entry & 0xF]
+
+
+def best_move(core):
+    """Best ``(row, col)`` for the player to move in a TicTacToeCore"""
+    _, cell = lookup(core.cells())
+    if cell is None:
+        return None
+    return divmod(cell, 3)
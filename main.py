@@ -1,35 +1,51 @@
+import os
+import sys
+
+from games.startup import StartupTimer
+
+# Run with --startup-report (or GAMECENTER_STARTUP_REPORT=1) to print import
+# and time-to-first-frame timings, the hook has to go in before tkinter
+startup_timer = None
+if '--startup-report' in sys.argv or os.environ.get('GAMECENTER_STARTUP_REPORT'):
+    startup_timer = StartupTimer()
+    startup_timer.install_import_hook()
+
+# Run with --profile (or GAMECENTER_PROFILE=1) for per-frame timings of every
+# game, --cprofile (or GAMECENTER_PROFILE=cprofile) also runs cProfile
+profile_mode = os.environ.get('GAMECENTER_PROFILE')
+if '--profile' in sys.argv:
+    profile_mode = profile_mode or 'timings'
+if '--cprofile' in sys.argv:
+    profile_mode = 'cprofile'
+
 import tkinter as tk
 from tkinter import ttk
-from games.tictactoe import TicTacToe
-from games.snake import Snake
-from games.game2048 import Game2048
+from games.registry import get_games
 
 class GameCenter:
     def __init__(self):
         self.root = tk.Tk()
         self.root.title("Retro Gamehub")
-        self.root.state('zoomed')  # This makes the window maximized but not fullscreen
+        try:
+            self.root.state('zoomed')  # This makes the window maximized but not fullscreen
+        except tk.TclError:
+            # X11 has no zoomed state, the window manager attribute does the same
+            self.root.attributes('-zoomed', True)
         self.root.configure(bg='#1e1e2f')
         
         self.center_window(self.root)
         
-        self.games = {
-            'Tic Tac Toe': {
-                'class': TicTacToe,
-                'description': 'Classic X and O game',
-                'icon': '❌'
-            },
-            'Snake': {
-                'class': Snake,
-                'description': 'Classic snake game',
-                'icon': '🐍'
-            },
-            '2048': {
-                'class': Game2048,
-                'description': 'Merge numbers puzzle',
-                'icon': '🎲'
-            }
-        }
+        # Game modules are only imported when their Play Now button is pressed
+        self.games = get_games()
+
+        # One running game per entry, reused when Play Now is pressed again
+        self.open_games = {}
+
+        self.profiler = None
+        if profile_mode == 'cprofile':
+            from games.instrumentation import SessionProfiler
+            self.profiler = SessionProfiler()
+            self.profiler.start()
         
         self.setup_styles()
         self.create_widgets()
@@ -111,12 +127,12 @@ class GameCenter:
         # Create game cards in a grid
         row = 0
         col = 0
-        for game_name, game_info in self.games.items():
+        for game_name, game_entry in self.games.items():
             card = ttk.Frame(container, style='Game.TFrame', padding=15)
             card.grid(row=row, column=col, padx=10, pady=10, sticky='nsew')
             
             # Game icon
-            icon = ttk.Label(card, text=game_info['icon'], font=('Helvetica', 48), background='#2a2a40', foreground='#ffffff')
+            icon = ttk.Label(card, text=game_entry.icon, font=('Helvetica', 48), background='#2a2a40', foreground='#ffffff')
             icon.pack(pady=(0, 10))
             
             # Game title
@@ -124,14 +140,14 @@ class GameCenter:
             title.pack()
             
             # Game description
-            desc = ttk.Label(card, text=game_info['description'], 
+            desc = ttk.Label(card, text=game_entry.description, 
                            style='GameDescription.TLabel', wraplength=200)
             desc.pack(pady=(5, 15))
             
             # Play button
             play_btn = ttk.Button(card, text="Play Now",
                                 style='Modern.TButton',
-                                command=lambda g=game_info['class']: self.start_game(g))
+                                command=lambda g=game_entry: self.start_game(g))
             play_btn.pack()
             
             # Grid positioning
@@ -148,20 +164,71 @@ class GameCenter:
         # Quit button
         quit_btn = ttk.Button(self.root, text="Exit Game Center",
                             style='Quit.TButton',
-                            command=self.root.destroy)
+                            command=self.quit)
         quit_btn.pack(pady=20)
 
-    def start_game(self, game_class):
+    def start_game(self, game_entry):
+        game = self.open_games.get(game_entry.name)
+        if game is not None:
+            # Bring the running window back instead of opening another one
+            game.master.deiconify()
+            game.master.lift()
+            game.master.focus_force()
+            return game
+
+        first_load = not game_entry.loaded
+        game_class = game_entry.load()
+        if startup_timer and first_load:
+            startup_timer.record(f"import {game_entry.module} ({game_entry.name})",
+                                 game_entry.load_time)
+            startup_timer.report()
+            startup_timer.marks.clear()
+            startup_timer.imports.clear()
         game_window = tk.Toplevel(self.root)
         game_window.focus_force()  # Force focus to the new window
         game_window.lift()         # Bring window to front
         game = game_class(game_window)
         self.center_window(game_window)  # Center the game window
+        game_window.protocol('WM_DELETE_WINDOW',
+                             lambda name=game_entry.name: self.close_game(name))
+        self.open_games[game_entry.name] = game
+        if profile_mode:
+            from games.instrumentation import Instrumentation
+            Instrumentation(game, game_entry.name).attach()
         game.play()
+        return game
+
+    def close_game(self, name):
+        """Release a game's timers and bindings and destroy its window"""
+        game = self.open_games.pop(name, None)
+        if game is not None:
+            game.close()
+
+    def quit(self):
+        for name in list(self.open_games):
+            self.close_game(name)
+        if self.profiler:
+            self.profiler.stop()
+        self.root.destroy()
+
+    def report_startup(self):
+        # Force pending geometry and redraws so the menu is really on screen
+        self.root.update_idletasks()
+        startup_timer.mark("first frame")
+        startup_timer.report()
+        startup_timer.marks.clear()
+        startup_timer.imports.clear()
 
     def run(self):
+        if startup_timer:
+            startup_timer.mark("main loop")
+            self.root.after_idle(self.report_startup)
         self.root.mainloop()
 
 if __name__ == "__main__":
+    if startup_timer:
+        startup_timer.mark("imports")
     game_center = GameCenter()
+    if startup_timer:
+        startup_timer.mark("widgets built")
     game_center.run()
\ No newline at end of file
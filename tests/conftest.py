@@ -0,0 +1,76 @@
+"""Stand-ins for the Tk objects the game views use, so view logic can be
+tested without a display."""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class FakeMaster:
+    """``after`` callbacks are kept until ``run_pending`` calls them"""
+
+    def __init__(self):
+        self.pending = {}
+        self.next_id = 0
+
+    def after(self, delay, callback):
+        self.next_id += 1
+        after_id = f'after#{self.next_id}'
+        self.pending[after_id] = callback
+        return after_id
+
+    def after_cancel(self, after_id):
+        self.pending.pop(after_id, None)
+
+    def run_pending(self):
+        while self.pending:
+            after_id = next(iter(self.pending))
+            self.pending.pop(after_id)()
+
+
+class FakeCanvas:
+    """Remembers each item's coordinates and options"""
+
+    def __init__(self):
+        self.items = {}
+        self.next_id = 0
+
+    def create(self, kind, *coords, **options):
+        self.next_id += 1
+        options.setdefault('state', 'normal')
+        self.items[self.next_id] = dict(options, kind=kind, coords=list(coords))
+        return self.next_id
+
+    def create_image(self, *coords, **options):
+        return self.create('image', *coords, **options)
+
+    def create_text(self, *coords, **options):
+        return self.create('text', *coords, **options)
+
+    def create_rectangle(self, *coords, **options):
+        return self.create('rectangle', *coords, **options)
+
+    def itemconfig(self, item, **options):
+        self.items[item].update(options)
+
+    def coords(self, item, *coords):
+        self.items[item]['coords'] = list(coords)
+
+    def delete(self, *tags):
+        if 'all' in tags:
+            self.items.clear()
+            return
+        for item, options in list(self.items.items()):
+            item_tags = options.get('tags', ())
+            if isinstance(item_tags, str):
+                item_tags = (item_tags,)
+            if set(item_tags) & set(tags):
+                del self.items[item]
+
+
+class FakeLabel:
+    def __init__(self):
+        self.options = {}
+
+    def config(self, **options):
+        self.options.update(options)
@@ -0,0 +1,107 @@
+import pytest
+
+from games.arena_core import ArenaCore
+from games.snake_core import OPPOSITES
+
+
+def test_legal_actions_per_seat_and_joint():
+    core = ArenaCore(16, 4, 4, players=2, seed=3)
+    for seat in range(2):
+        direction = core.snakes[seat].direction
+        assert OPPOSITES[direction] not in core.legal_actions(seat)
+        assert len(core.legal_actions(seat)) == 3
+    joint = core.legal_actions()
+    # None (keep going) or one of three turns for each player
+    assert len(joint) == 16
+    assert (None, None) in joint
+    for action in joint:
+        ArenaCore(16, 4, 4, players=2, seed=3).step(action)
+
+
+def test_single_player_legal_actions_are_directions():
+    core = ArenaCore(16, 4, 4, seed=3)
+    assert core.legal_actions() == core.legal_actions(0)
+    assert OPPOSITES[core.player.direction] not in core.legal_actions()
+
+
+def test_winner_is_the_last_player_standing():
+    core = ArenaCore(16, 2, 0, players=2, seed=1)
+    # Both snakes run straight until at least one hits a wall
+    while not core.done:
+        core.step((None, None))
+    alive = [s.index for s in core.snakes if s.alive]
+    assert core.winner == (alive[0] if len(alive) == 1 else None)
+
+
+OPTIONS = (8, 3, 4, 1)
+
+
+def corrupt_snake_body(core):
+    core.snakes[0].body[1] = core.snakes[0].body[0]
+
+
+def off_board_snake(core):
+    core.snakes[0].body[0] = 64
+
+
+def broken_snake_body(core):
+    body = core.snakes[0].body
+    cell = next(c for c in range(64) if core.grid[c] == 0
+                and abs(c % 8 - body[1] % 8) + abs(c // 8 - body[1] // 8) > 1)
+    core.grid[body[0]] = 0
+    core.grid[cell] = core.snakes[0].value
+    body[0] = cell
+
+
+def off_board_food(core):
+    core.food.append(70)
+
+
+def food_on_a_snake(core):
+    core.food.append(core.snakes[1].body[0])
+
+
+def stray_grid_cell(core):
+    core.grid[core.grid.index(0)] = 2
+
+
+def bad_target(core):
+    core.snakes[1].target = 64
+
+
+def bad_winner(core):
+    core.winner = 1
+
+
+def bad_done(core):
+    core.done = 2
+
+
+@pytest.mark.parametrize('corrupt', [
+    corrupt_snake_body, off_board_snake, broken_snake_body, off_board_food,
+    food_on_a_snake, stray_grid_cell, bad_target, bad_winner, bad_done])
+def test_restore_rejects_corrupt_snapshots(corrupt):
+    source = ArenaCore(*OPTIONS, seed=2)
+    source.step(None)
+    corrupt(source)
+    core = ArenaCore(*OPTIONS, seed=5)
+    before = core.snapshot()
+    with pytest.raises(ValueError):
+        core.restore(source.snapshot())
+    assert core.snapshot() == before
+
+
+def test_restore_rejects_unknown_direction_and_truncation():
+    source = ArenaCore(*OPTIONS, seed=2)
+    data = bytearray(source.snapshot())
+    # Small enough that every varint is one byte: options, ticks, done,
+    # winner, the grid, then the first snake's length, body and direction
+    length = len(source.snakes[0].body)
+    data[len(OPTIONS) + 3 + 64 + 1 + length] = 9
+    core = ArenaCore(*OPTIONS, seed=5)
+    with pytest.raises(ValueError):
+        core.restore(bytes(data))
+    with pytest.raises(ValueError):
+        core.restore(source.snapshot()[:-1])
+    core.restore(source.snapshot())
+    assert core.snapshot() == source.snapshot()
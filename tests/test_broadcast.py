@@ -0,0 +1,162 @@
+import random
+
+import pytest
+
+from games import net_protocol as proto
+from games.broadcast import MIRRORS
+from games.broadcast_server import Channel, Viewer
+from games.game2048_core import Game2048Core, GridGame2048Core
+from games.snake_core import SnakeCore
+
+
+def receive(mirror, message):
+    """Apply one encoded message the way a spectator does"""
+    kind, fields = proto.decode(message[proto.HEADER.size:])
+    if kind == proto.STATE:
+        game_id, seq, values = fields
+        assert type(mirror) is MIRRORS[game_id]
+        return mirror.on_state(seq, values)
+    assert kind == proto.DELTA
+    return mirror.on_delta(*fields)
+
+
+def expected_keyframe(core):
+    mirror = MIRRORS[core.game_id]()
+    mirror.capture(core)
+    return mirror.keyframe()
+
+
+class Stream:
+    """A publisher mirror fed by a core's events, and what it sent"""
+
+    def __init__(self, core):
+        self.core = core
+        self.mirror = MIRRORS[core.game_id]()
+        self.messages = []
+        core.subscribe(self.on_core_event)
+        core.reset(1)
+
+    def on_core_event(self, core, event):
+        message = self.mirror.publish(core, event)
+        if message is not None:
+            self.messages.append(message)
+
+    def take(self):
+        messages, self.messages = self.messages, []
+        return messages
+
+
+def play(core, rng, moves):
+    for _ in range(moves):
+        if core.is_terminal():
+            core.reset(rng.randrange(1000))
+        else:
+            core.step(rng.choice(core.legal_actions()))
+        yield
+
+
+@pytest.mark.parametrize('make_core', [
+    lambda: SnakeCore(10), lambda: Game2048Core(), lambda: GridGame2048Core(5)])
+def test_viewer_mirror_follows_the_core(make_core):
+    core = make_core()
+    stream = Stream(core)
+    viewer = MIRRORS[core.game_id]()
+    for _ in play(core, random.Random(2), 400):
+        for message in stream.take():
+            changed = receive(viewer, message)
+            assert all(0 <= cell < viewer.size * viewer.size for cell in changed)
+        assert viewer.keyframe() == expected_keyframe(core)
+        assert viewer.seq == stream.mirror.seq
+
+
+@pytest.mark.parametrize('make_core', [lambda: SnakeCore(10), lambda: Game2048Core()])
+def test_dropped_delta_is_refused_until_a_keyframe(make_core):
+    core = make_core()
+    stream = Stream(core)
+    viewer = MIRRORS[core.game_id]()
+    rng = random.Random(5)
+    dropped = resyncs = 0
+    for _ in play(core, rng, 200):
+        for message in stream.take():
+            if viewer.seq == 4 and not dropped:
+                dropped = viewer.seq + 1
+                continue
+            try:
+                receive(viewer, message)
+            except ValueError:
+                assert viewer.seq == dropped - 1
+                # Behind, resync from the publisher's keyframe
+                receive(viewer, stream.mirror.state_message())
+                resyncs += 1
+                break
+        if viewer.seq == stream.mirror.seq:
+            assert viewer.keyframe() == expected_keyframe(core)
+    assert dropped and resyncs == 1
+
+
+class RecordingWriter:
+    def __init__(self):
+        self.buffer = bytearray()
+
+    def is_closing(self):
+        return False
+
+    def write(self, data):
+        self.buffer += data
+
+
+def decode_all(writer):
+    return proto.take_messages(writer.buffer)
+
+
+def test_slow_viewer_skips_deltas_and_resyncs_with_a_keyframe():
+    core = Game2048Core()
+    stream = Stream(core)
+    channel = Channel('main')
+    channel.mirror = MIRRORS[core.game_id]()
+    writer = RecordingWriter()
+    viewer = Viewer(channel, writer)
+    seen = MIRRORS[core.game_id]()
+    rng = random.Random(9)
+
+    def move():
+        core.step(rng.choice(core.legal_actions()))
+        # What BroadcastServer.publish does with each message
+        for message in stream.take():
+            receive(channel.mirror, message)
+            viewer.push(message, keyframe=False)
+
+    receive(channel.mirror, stream.mirror.state_message())
+    viewer.push(channel.state_message(), keyframe=True)
+    # Never acknowledged: the viewer stops getting deltas at max_lag
+    while not viewer.behind:
+        move()
+    assert viewer.in_flight == viewer.sent == Viewer.max_lag
+    assert viewer.resyncs == 1
+    for _ in range(20):
+        move()
+    assert viewer.sent == Viewer.max_lag
+
+    messages = decode_all(writer)
+    assert len(messages) == Viewer.max_lag
+    for kind, fields in messages:
+        if kind == proto.STATE:
+            seen.on_state(fields[1], fields[2])
+        else:
+            seen.on_delta(*fields)
+    # Acknowledging everything brings one keyframe of the present
+    viewer.ack(Viewer.max_lag - 1)
+    assert viewer.behind and not decode_all(writer)
+    viewer.ack(1)
+    assert not viewer.behind
+    assert viewer.in_flight == 1
+    ((kind, fields),) = decode_all(writer)
+    assert kind == proto.STATE
+    seen.on_state(fields[1], fields[2])
+    assert seen.keyframe() == expected_keyframe(core) == channel.mirror.keyframe()
+
+    # Caught up, deltas flow again
+    move()
+    for kind, fields in decode_all(writer):
+        seen.on_delta(*fields)
+    assert seen.keyframe() == expected_keyframe(core)
@@ -0,0 +1,101 @@
+import random
+
+import pytest
+
+from games import replay
+from games.arena_core import ArenaCore
+from games.game2048_core import Game2048Core, GridGame2048Core
+from games.snake_core import SnakeCore
+from games.tictactoe_core import TicTacToeCore
+
+
+def play_random(core, rng, ticks):
+    for _ in range(ticks):
+        if core.is_terminal():
+            break
+        actions = core.legal_actions()
+        core.step(rng.choice(actions) if actions else None)
+
+
+CORES = [
+    lambda: Game2048Core(seed=11),
+    lambda: GridGame2048Core(6, seed=12),
+    lambda: SnakeCore(12, seed=13),
+    lambda: ArenaCore(24, 6, 8, seed=14),
+    lambda: ArenaCore(24, 4, 8, players=2, seed=15),
+    lambda: TicTacToeCore(5, 5, 4),
+]
+
+
+@pytest.mark.parametrize('make_core', CORES)
+def test_action_log_replays_to_the_same_state(make_core):
+    core = make_core()
+    play_random(core, random.Random(1), 200)
+    replayed = replay.simulate(core.log.to_bytes())
+    assert replayed.log.ticks == core.log.ticks
+    assert replayed.is_terminal() == core.is_terminal()
+    if hasattr(core, 'snapshot') and not isinstance(core, TicTacToeCore):
+        assert replayed.snapshot() == core.snapshot()
+    else:
+        assert replayed.board == core.board
+
+
+@pytest.mark.parametrize('make_core', CORES[:4])
+def test_snapshot_restore_round_trip(make_core):
+    core = make_core()
+    play_random(core, random.Random(2), 60)
+    data = core.snapshot()
+    copy = make_core()
+    copy.restore(data)
+    assert copy.snapshot() == data
+    assert copy.resumed
+    # The restored game plays on like the original
+    rng = random.Random(3)
+    action = rng.choice(core.legal_actions()) if core.legal_actions() else None
+    if not core.is_terminal():
+        copy.step(action)
+
+
+@pytest.mark.parametrize('make_core', CORES[:4])
+def test_restore_rejects_other_setups(make_core):
+    data = make_core().snapshot()
+    other = ArenaCore(8, 1, 1) if not isinstance(make_core(), ArenaCore) else SnakeCore(8)
+    with pytest.raises(ValueError):
+        other.restore(data)
+
+
+def recount(core):
+    size = core.size
+    cells = core.cells
+    pairs = 0
+    for index, value in enumerate(cells):
+        if not value:
+            continue
+        row, col = divmod(index, size)
+        if col + 1 < size and cells[index + 1] == value:
+            pairs += 1
+        if row + 1 < size and cells[index + size] == value:
+            pairs += 1
+    empty = sorted(i for i, value in enumerate(cells) if not value)
+    return pairs, empty
+
+
+def test_grid_core_tracks_pairs_and_empty_cells():
+    rng = random.Random(4)
+    for size in (3, 5, 8):
+        core = GridGame2048Core(size, seed=size)
+        for _ in range(300):
+            pairs, empty = recount(core)
+            assert core.pairs == pairs
+            assert sorted(core.free_cells) == empty
+            for position, index in enumerate(core.free_cells):
+                assert core.free_index[index] == position
+            if core.is_terminal():
+                break
+            core.step(rng.choice(core.legal_actions()))
+    # A 3x3 board fills up quickly, the tracked game over agrees with
+    # trying every move
+    core = GridGame2048Core(3, seed=5)
+    while not core.is_terminal():
+        core.step(rng.choice(core.legal_actions()))
+    assert core.legal_actions() == []
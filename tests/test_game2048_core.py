@@ -0,0 +1,77 @@
+import random
+
+from games.game2048_core import (
+    DIRECTIONS, GridGame2048Core, board_to_grid, grid_to_board, merge_line,
+    move_board, tile_moves)
+
+
+def random_grid(rng, size=4, fill=0.7):
+    return [[2 ** rng.randint(1, 6) if rng.random() < fill else 0 for _ in range(size)]
+            for _ in range(size)]
+
+
+def reference_move(grid, direction):
+    """Move a grid line by line with ``merge_line``"""
+    size = len(grid)
+    result = [[0] * size for _ in range(size)]
+    gained = 0
+    for k in range(size):
+        cells = [(k, c) if direction in ('left', 'right') else (c, k) for c in range(size)]
+        if direction in ('right', 'down'):
+            cells.reverse()
+        merged, line_gain = merge_line([grid[r][c] for r, c in cells])
+        gained += line_gain
+        for (r, c), value in zip(cells, merged):
+            result[r][c] = value
+    return result, gained
+
+
+def slide(grid, direction):
+    """Apply the animation's tile moves to an empty grid"""
+    size = len(grid)
+    result = [[0] * size for _ in range(size)]
+    for source, (r, c), value in tile_moves(grid, direction):
+        result[r][c] += value
+    return result
+
+
+def test_merge_line():
+    assert merge_line([2, 2, 2, 2]) == ([4, 4, 0, 0], 8)
+    assert merge_line([4, 0, 4, 8]) == ([8, 8, 0, 0], 8)
+    assert merge_line([2, 4, 2, 4]) == ([2, 4, 2, 4], 0)
+
+
+def test_bitboard_matches_reference_and_animation():
+    rng = random.Random(0)
+    for _ in range(500):
+        grid = random_grid(rng)
+        board = grid_to_board(grid)
+        for direction in DIRECTIONS:
+            moved, gained = move_board(board, direction)
+            expected, expected_gain = reference_move(grid, direction)
+            assert board_to_grid(moved) == expected
+            assert gained == expected_gain
+            assert slide(grid, direction) == expected
+
+
+def test_grid_core_matches_bitboard():
+    rng = random.Random(1)
+    for _ in range(200):
+        grid = random_grid(rng)
+        direction = rng.choice(DIRECTIONS)
+        expected, gained = reference_move(grid, direction)
+
+        core = GridGame2048Core(4, seed=rng.getrandbits(32))
+        for index in range(16):
+            value = grid[index // 4][index % 4]
+            core.set_cell(index, value.bit_length() - 1 if value else 0)
+        core.score = 0
+        if not core.move(direction):
+            assert expected == grid
+            continue
+        assert core.score == gained
+        # Everything but the one spawned tile matches the bitboard move
+        spawned = [(r, c) for r in range(4) for c in range(4)
+                   if core.grid[r][c] != expected[r][c]]
+        assert len(spawned) == 1
+        assert expected[spawned[0][0]][spawned[0][1]] == 0
@@ -0,0 +1,90 @@
+import queue
+
+from conftest import FakeCanvas, FakeLabel, FakeMaster
+
+from games.animation import Animator
+from games.game2048 import Game2048
+from games.game2048_core import Game2048Core
+from games.sprites import SpriteCache
+
+
+def make_view(seed):
+    """Game2048 wired to fake widgets, tile images are their colors"""
+    game = Game2048.__new__(Game2048)
+    game.master = FakeMaster()
+    game.after_ids = set()
+    game.grid_size = 4
+    game.cell_size, game.padding, game.corner_radius = 100, 10, 10
+    game.colors = {'grid_bg': 'bg', 'text': 'white'}
+    game.colors.update({2 ** e: f'color{e}' for e in range(1, 12)})
+    game.colors[0] = 'empty'
+    game.canvas = FakeCanvas()
+    game.score_label = FakeLabel()
+    game.hint_label = FakeLabel()
+    game.sprites = SpriteCache(None)
+    game.tile_image = lambda color: color
+    game.animator = Animator(game)
+    game.game_over_flag = False
+    game.core = Game2048Core(seed=seed)
+    game.core.subscribe(game.on_core_event)
+    game.draw_board()
+    game.display()
+    return game
+
+
+def assert_shows_core(game):
+    grid = game.core.grid
+    for (i, j), (tile, label) in game.cell_items.items():
+        value = grid[i][j]
+        items = game.canvas.items
+        assert game.drawn_values[(i, j)] == value
+        assert items[tile]['state'] == ('normal' if value else 'hidden'), (i, j)
+        if value:
+            assert items[label]['text'] == str(value)
+
+
+def test_move_during_slide_lands_on_the_core_board():
+    for seed in range(20):
+        game = make_view(seed)
+        moves = 0
+        for direction in ('right', 'left', 'down', 'up', 'right'):
+            if direction in game.core.legal_actions():
+                # Each move arrives while the previous slide is running
+                game.core.step(direction)
+                moves += 1
+        assert moves >= 2
+        game.animator.finish()
+        assert_shows_core(game)
+        # Timers left over from the slides must not undo the board
+        game.master.run_pending()
+        assert_shows_core(game)
+
+
+def test_slide_lands_on_its_board():
+    game = make_view(3)
+    direction = game.core.legal_actions()[0]
+    game.core.step(direction)
+    assert game.animator.active
+    game.master.run_pending()
+    assert not game.animator.active
+    assert_shows_core(game)
+
+
+class FailingSolver:
+    def best_move(self, board):
+        raise RuntimeError("worker pool died")
+
+
+def test_failed_search_suggests_no_move():
+    game = make_view(1)
+    game.solver = FailingSolver()
+    game.search_results = queue.Queue()
+    game.search_thread = None
+    game.search_poll_interval = 1
+    results = []
+    game.start_search(results.append)
+    game.search_thread.join()
+    game.master.run_pending()
+    assert results == [None]
+    # The next search is not blocked by the failed one
+    assert game.search_thread is None
@@ -0,0 +1,52 @@
+import pytest
+
+from games import net_protocol as proto
+
+
+@pytest.mark.parametrize('kind, fields', [
+    (proto.HELLO, ['arena', (32, 2, 4, 2)]),
+    (proto.START, [1, 2 ** 32 - 1, 3]),
+    (proto.MOVE, [300, 0, 4]),
+    (proto.LEAVE, [1]),
+    (proto.ERROR, ["can't reach the server: ünïcode"]),
+    (proto.PUBLISH, ['main']),
+    (proto.WATCH, ['']),
+    (proto.STATE, ['2048', 7, (4, 1024, 0, *range(16))]),
+    (proto.DELTA, [8, ()]),
+    (proto.ACK, [64]),
+])
+def test_frame_round_trip(kind, fields):
+    frame = proto.encode(kind, *fields)
+    (length,) = proto.HEADER.unpack_from(frame)
+    assert length == len(frame) - proto.HEADER.size
+    assert proto.decode(frame[proto.HEADER.size:]) == (kind, fields)
+
+
+def test_take_messages_keeps_partial_frames():
+    frames = proto.encode(proto.MOVE, 1, 0, 2) + proto.encode(proto.ACK, 2 ** 40)
+    buffer = bytearray(frames[:-1])
+    assert proto.take_messages(buffer) == [(proto.MOVE, [1, 0, 2])]
+    # The incomplete ACK is left for the next read
+    assert buffer == frames[len(proto.encode(proto.MOVE, 1, 0, 2)):-1]
+    buffer += frames[-1:]
+    assert proto.take_messages(buffer) == [(proto.ACK, [2 ** 40])]
+    assert buffer == bytearray()
+
+
+@pytest.mark.parametrize('payload', [
+    b'',
+    b'\x00',                                      # unknown kind
+    bytes([proto.MOVE, 1, 2]),                    # missing field
+    bytes([proto.MOVE, 1, 2, 3, 4]),              # trailing byte
+    bytes([proto.ERROR, 5]) + b'abc',             # text shorter than its length
+    bytes([proto.ACK, 0x80]),                     # unterminated varint
+])
+def test_malformed_payload_raises_value_error(payload):
+    with pytest.raises(ValueError):
+        proto.decode(payload)
+
+
+def test_oversized_frame_is_rejected():
+    buffer = bytearray(proto.HEADER.pack(proto.MAX_FRAME + 1))
+    with pytest.raises(ValueError):
+        proto.take_messages(buffer)
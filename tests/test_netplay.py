@@ -0,0 +1,254 @@
+import asyncio
+import random
+
+import pytest
+
+from games import net_protocol as proto
+from games.arena_core import ArenaCore
+from games.net_server import Match, RelayServer
+from games.netplay import NetClient, RollbackSession, decode_turn
+from games.snake_core import DIRECTIONS
+
+# The options OnlineSnake plays with
+ARENA_OPTIONS = (32, 2, 4, 2)
+TURNS = (None,) * 4 + DIRECTIONS
+
+
+def reference_core(seed, sent, ticks):
+    """The game both clients should agree on, stepped with the real turns"""
+    core = ArenaCore(*ARENA_OPTIONS)
+    core.reset(seed)
+    for tick in range(ticks):
+        if core.done:
+            break
+        core.step(tuple(decode_turn(sent[seat].get(tick, 0)) for seat in range(2)))
+    return core
+
+
+def test_rollback_converges_on_both_clients():
+    rng = random.Random(7)
+    seed = 1234
+    input_delay, latency, ticks = 2, 5, 300
+    in_flight = []   # (delivery frame, receiving seat, tick, code)
+    sent = [{}, {}]
+    frame = 0
+
+    def sender(seat):
+        def send(tick, code):
+            sent[seat][tick] = code
+            # Later than the input delay hides, so turns arrive too late
+            in_flight.append((frame + rng.randint(1, latency), 1 - seat, tick, code))
+        return send
+
+    sessions = []
+    for seat in range(2):
+        core = ArenaCore(*ARENA_OPTIONS)
+        core.reset(seed)
+        sessions.append(RollbackSession(core, seat, input_delay, sender(seat)))
+
+    def deliver(until):
+        for message in sorted(m for m in in_flight if m[0] <= until):
+            in_flight.remove(message)
+            sessions[message[1]].receive(*message[2:])
+
+    while any(s.tick < ticks and not s.core.done for s in sessions):
+        frame += 1
+        for session in sessions:
+            if session.tick < ticks:
+                session.advance(rng.choice(TURNS))
+        deliver(frame)
+    deliver(float('inf'))
+
+    assert sum(s.rollbacks for s in sessions) > 0
+    a, b = sessions
+    assert a.tick == b.tick
+    assert a.core.snapshot() == b.core.snapshot()
+    assert reference_core(seed, sent, a.tick).snapshot() == a.core.snapshot()
+
+
+async def start_server():
+    server = RelayServer()
+    await server.start('127.0.0.1', 0)
+    return server
+
+
+async def wait_for(condition, timeout=5):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not condition():
+        assert loop.time() < deadline, "timed out"
+        await asyncio.sleep(0.001)
+
+
+def test_snake_duel_over_localhost_relay():
+    async def play():
+        server = await start_server()
+        rng = random.Random(3)
+        ticks = 200
+        inboxes = [[], []]
+        clients = [NetClient('arena', ARENA_OPTIONS,
+                             lambda kind, fields, inbox=inbox: inbox.append((kind, fields)))
+                   for inbox in inboxes]
+        for client in clients:
+            await client.connect('127.0.0.1', server.port)
+        await wait_for(lambda: all(inboxes))
+        starts = [inbox.pop(0) for inbox in inboxes]
+        assert all(kind == proto.START for kind, _ in starts)
+        assert sorted(fields[0] for _, fields in starts) == [0, 1]
+        seed = starts[0][1][1]
+        assert starts[1][1][1] == seed
+
+        sent = [{}, {}]
+        sessions = []
+        for client, (_, (seat, _, input_delay)) in zip(clients, starts):
+            def send(tick, code, client=client, seat=seat):
+                sent[seat][tick] = code
+                client.send(proto.MOVE, tick, seat, code)
+            core = ArenaCore(*ARENA_OPTIONS)
+            core.reset(seed)
+            sessions.append(RollbackSession(core, seat, input_delay, send))
+
+        def receive():
+            for inbox, session in zip(inboxes, sessions):
+                while inbox:
+                    kind, fields = inbox.pop(0)
+                    assert kind == proto.MOVE
+                    tick, _, code = fields
+                    session.receive(tick, code)
+
+        while any(s.tick < ticks and not s.core.done for s in sessions):
+            for session in sessions:
+                if session.tick < ticks:
+                    session.advance(rng.choice(TURNS))
+            await asyncio.sleep(0)
+            receive()
+        # Every turn has been relayed once both know the other's last one
+        final = max(s.tick for s in sessions)
+        last = [max(turns) for turns in sent]
+        await wait_for(lambda: (receive() or True) and all(
+            s.remote_tick > last[1 - s.seat] for s in sessions))
+
+        a, b = sessions
+        assert a.tick == b.tick <= final
+        assert a.core.snapshot() == b.core.snapshot()
+        assert reference_core(seed, sent, a.tick).snapshot() == a.core.snapshot()
+        for client in clients:
+            client.close()
+        await server.close()
+
+    asyncio.run(play())
+
+
+def test_tictactoe_server_drops_invalid_moves():
+    async def play():
+        server = await start_server()
+        connections = []
+        for _ in range(2):
+            reader, writer = await asyncio.open_connection('127.0.0.1', server.port)
+            writer.write(proto.encode(proto.HELLO, 'tictactoe', (3, 3, 3)))
+            connections.append((reader, writer))
+        seats = {}
+        for reader, writer in connections:
+            kind, (seat, _, _) = await proto.read_message(reader)
+            assert kind == proto.START
+            seats[seat] = (reader, writer)
+        x, o = seats[0], seats[1]
+
+        def send(connection, tick, seat, cell):
+            connection[1].write(proto.encode(proto.MOVE, tick, seat, cell))
+
+        async def echoed():
+            moves = []
+            for reader, _ in (x, o):
+                moves.append(await asyncio.wait_for(proto.read_message(reader), 5))
+            assert moves[0] == moves[1]
+            return moves[0]
+
+        send(o, 0, 1, 4)            # O moving first
+        send(x, 0, 0, 4)
+        assert await echoed() == (proto.MOVE, [0, 0, 4])
+        send(x, 1, 0, 0)            # X twice in a row
+        send(o, 1, 1, 4)            # taken cell
+        send(o, 0, 1, 0)            # stale move number
+        send(o, 1, 1, 9)            # off the board
+        send(o, 1, 1, 0)
+        # The first echo after the bad moves is the good one
+        assert await echoed() == (proto.MOVE, [1, 1, 0])
+
+        for _, writer in (x, o):
+            writer.close()
+        await server.close()
+
+    asyncio.run(play())
+
+
+@pytest.mark.parametrize('game_id, options', [
+    ('arena', (10 ** 9,)),
+    ('arena', (10 ** 9, 2, 4, 2)),
+    ('arena', (32, 2, 4, 3)),
+    ('arena', (32, 10 ** 6, 4, 2)),
+    ('tictactoe', (10 ** 6, 10 ** 6, 3)),
+    ('tictactoe', (3, 3, 4)),
+    ('tictactoe', ()),
+    ('chess', ()),
+])
+def test_relay_rejects_bad_hello(game_id, options):
+    async def play():
+        server = await start_server()
+        reader, writer = await asyncio.open_connection('127.0.0.1', server.port)
+        writer.write(proto.encode(proto.HELLO, game_id, options))
+        kind, _ = await asyncio.wait_for(proto.read_message(reader), 5)
+        assert kind == proto.ERROR
+        assert await asyncio.wait_for(reader.read(), 5) == b''
+        writer.close()
+        assert not server.waiting
+
+        # The relay still matches the next clients
+        connections = []
+        for _ in range(2):
+            reader, writer = await asyncio.open_connection('127.0.0.1', server.port)
+            writer.write(proto.encode(proto.HELLO, 'arena', ARENA_OPTIONS))
+            connections.append((reader, writer))
+        for reader, writer in connections:
+            kind, _ = await asyncio.wait_for(proto.read_message(reader), 5)
+            assert kind == proto.START
+            writer.close()
+        await server.close()
+
+    asyncio.run(play())
+
+
+class StalledWriter:
+    """A peer that never reads: everything written stays buffered"""
+
+    def __init__(self):
+        self.buffered = 0
+        self.closed = False
+        self.transport = self
+
+    def get_write_buffer_size(self):
+        return self.buffered
+
+    def is_closing(self):
+        return self.closed
+
+    def write(self, data):
+        self.buffered += len(data)
+
+    def close(self):
+        self.closed = True
+
+
+def test_relay_cuts_off_a_peer_that_stops_reading():
+    match = Match('arena', ARENA_OPTIONS, 3)
+    sender, stalled = StalledWriter(), StalledWriter()
+    match.writers = [sender, stalled]
+    tick = 0
+    while not stalled.closed:
+        match.move(0, tick, 1)
+        tick += 1
+        assert stalled.buffered <= Match.high_water + 16
+    buffered = stalled.buffered
+    match.move(0, tick, 1)
+    assert stalled.buffered == buffered
+    assert not sender.closed
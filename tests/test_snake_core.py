@@ -0,0 +1,47 @@
+import pytest
+
+from games.action_log import write_varint
+from games.snake_core import DIRECTIONS, SnakeCore
+
+
+def snapshot_bytes(size, direction=0, food=0, length=1, head=0, body=b''):
+    data = bytearray()
+    for value in (size, 0, direction, food, length, head):
+        write_varint(data, value)
+    return bytes(data + body)
+
+
+def test_snapshot_round_trip():
+    core = SnakeCore(10, seed=4)
+    for _ in range(30):
+        if core.done:
+            break
+        core.step(core.legal_actions()[0] if core.direction == 'Up' else None)
+    data = core.snapshot()
+    copy = SnakeCore(10)
+    copy.restore(data)
+    assert list(copy.snake) == list(core.snake)
+    assert (copy.food, copy.score, copy.direction) == (core.food, core.score, core.direction)
+    assert copy.snapshot() == data
+    # The free cell index is rebuilt from the body
+    assert len(copy.free_cells) == 100 - len(copy.snake)
+
+
+@pytest.mark.parametrize('data', [
+    snapshot_bytes(10, head=100),                        # head off the board
+    snapshot_bytes(10, head=9, length=2, body=b'\x01'),  # body steps past the right edge
+    snapshot_bytes(10, head=0, length=2, body=b'\x02'),  # body steps above the top row
+    snapshot_bytes(10, head=5, length=3, body=b'\x04'),  # body turns back onto the head
+    snapshot_bytes(10, food=101),
+    snapshot_bytes(10, food=1, head=0),                  # food under the head
+    snapshot_bytes(10, direction=len(DIRECTIONS)),
+    snapshot_bytes(10, length=0),
+    snapshot_bytes(12),
+    snapshot_bytes(10)[:-1],
+])
+def test_corrupt_snapshot_raises_value_error(data):
+    core = SnakeCore(10, seed=1)
+    before = core.snapshot()
+    with pytest.raises(ValueError):
+        core.restore(data)
+    assert core.snapshot() == before
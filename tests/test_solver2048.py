@@ -0,0 +1,16 @@
+from games.game2048_core import DIRECTIONS, Game2048Core, move_board
+from games.solver2048 import MonteCarloSearch
+
+
+def test_montecarlo_scores_moves_within_a_tiny_budget():
+    # Starting the worker pool does not count against the budget, so even
+    # the first search gets rollouts done
+    core = Game2048Core(seed=5)
+    search = MonteCarloSearch(workers=2)
+    try:
+        direction = search.best_move(core.board, 0.05)
+    finally:
+        search.close()
+    legal = [d for d in DIRECTIONS if move_board(core.board, d)[0] != core.board]
+    assert direction in legal
+    assert search.rollouts > 0
@@ -0,0 +1,136 @@
+import sqlite3
+
+import pytest
+
+from conftest import FakeMaster
+
+from games import storage
+from games.base_game import BaseGame
+from games.game2048_core import Game2048Core
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = storage.ScoreStore(str(tmp_path / 'gamecenter.db'))
+    yield store
+    store.close()
+
+
+def committed(store, sql, params=()):
+    """Rows as another process would see them, without waiting for the queue"""
+    connection = sqlite3.connect(store.path)
+    try:
+        return connection.execute(sql, params).fetchall()
+    finally:
+        connection.close()
+
+
+def test_load_sees_a_save_still_in_the_queue(store):
+    store.save_state('g', b'abc')
+    assert store.load_state('g') == b'abc'
+
+
+def test_load_sees_a_delete_still_in_the_queue(store):
+    store.save_state('g', b'abc')
+    store.flush()
+    store.delete_state('g')
+    assert store.load_state('g') is None
+
+
+def test_last_queued_write_wins(store):
+    store.save_state('g', b'one')
+    store.save_state('g', b'two')
+    store.delete_state('g')
+    store.save_state('g', b'three')
+    assert store.load_state('g') == b'three'
+    assert store.load_state('other') is None
+
+
+def test_flush_commits_queued_writes(store):
+    store.add_score('g', 10)
+    store.save_state('g', b'abc')
+    store.flush()
+    assert committed(store, 'SELECT score FROM scores') == [(10,)]
+    assert committed(store, 'SELECT state FROM saves') == [(b'abc',)]
+
+
+def test_close_commits_queued_writes(tmp_path):
+    path = str(tmp_path / 'gamecenter.db')
+    store = storage.ScoreStore(path)
+    for score in range(300):
+        store.add_score('g', score)
+    store.save_state('g', b'abc')
+    store.close()
+    store.close()
+    with pytest.raises(RuntimeError):
+        store.add_score('g', 1)
+
+    reopened = storage.ScoreStore(path)
+    try:
+        assert reopened.best_score('g') == 299
+        assert reopened.load_state('g') == b'abc'
+    finally:
+        reopened.close()
+
+
+def test_scores_and_replays_round_trip(store):
+    store.add_score('g', 5, b'log5')
+    store.add_score('g', 20)
+    store.add_score('g', 12, b'log12')
+    store.add_score('other', 100)
+    store.flush()
+    rows = store.top_scores('g', limit=2)
+    assert [score for _, score, _ in rows] == [20, 12]
+    ids = {score: score_id for score_id, score, _ in store.top_scores('g')}
+    assert store.replay(ids[12]) == b'log12'
+    assert store.replay(ids[20]) is None
+    assert store.replay(max(ids.values()) + 100) is None
+    assert store.best_score('g') == 20
+    assert store.best_score('missing') == 0
+
+
+class HeadlessGame(BaseGame):
+    resumable = True
+
+    def play(self):
+        pass
+
+    def display(self):
+        pass
+
+    def is_game_over(self):
+        return self.core.is_terminal()
+
+
+def open_game(seed):
+    game = HeadlessGame.__new__(HeadlessGame)
+    game.master = FakeMaster()
+    game.replaying = False
+    game.best_score = 0
+    game.core = Game2048Core(seed=seed)
+    return game
+
+
+def test_close_then_reopen_resumes_the_save(store, monkeypatch):
+    monkeypatch.setattr(storage, '_store', store)
+    game = open_game(1)
+    game.core.step(game.core.legal_actions()[0])
+    game.save_progress()
+
+    reopened = open_game(2)
+    assert reopened.load_progress()
+    assert reopened.core.snapshot() == game.core.snapshot()
+
+
+def test_close_then_reopen_after_a_finished_game(store, monkeypatch):
+    monkeypatch.setattr(storage, '_store', store)
+    store.save_state(Game2048Core().score_key, Game2048Core(seed=3).snapshot())
+    store.flush()
+    game = open_game(1)
+    game.core.step(game.core.legal_actions()[0])
+    game.core.score = 1234
+    game.record_score()
+
+    reopened = open_game(2)
+    assert not reopened.load_progress()
+    assert reopened.best_score == 1234
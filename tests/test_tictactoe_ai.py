@@ -0,0 +1,98 @@
+import random
+import time
+
+import pytest
+
+from games.tictactoe_ai import AlphaBetaAI
+
+X, O = 1, 2
+
+
+def board(rows):
+    """Flat 0 / 1 / 2 cells from rows of '.', 'X' and 'O'"""
+    return [' XO'.index(mark) if mark != '.' else 0 for row in rows for mark in row]
+
+
+def ai(time_limit=1.0):
+    return AlphaBetaAI(5, 5, 4, time_limit=time_limit, seed=1)
+
+
+@pytest.mark.parametrize('rows, player, wins', [
+    # X completes its row, ahead of blocking O's column
+    (['XXX..',
+      'O....',
+      'O....',
+      'O....',
+      '.....'], X, {(0, 3)}),
+    # O completes a diagonal
+    (['O.X..',
+      '.O.X.',
+      '..O..',
+      '.....',
+      '.X..X'], O, {(3, 3)}),
+    # Either end finishes an open three
+    (['.....',
+      '.OOO.',
+      '.....',
+      '.X.X.',
+      'X...X'], O, {(1, 0), (1, 4)}),
+])
+def test_takes_an_immediate_win(rows, player, wins):
+    assert ai().choose_move(board(rows), player) in wins
+
+
+@pytest.mark.parametrize('rows, player, blocks', [
+    # O's three on the top row has one open end left
+    (['XOOO.',
+      '.....',
+      '..X..',
+      '.....',
+      '.X...'], X, {(0, 4)}),
+    # X's column is capped at the top, only the bottom is left
+    (['.O...',
+      '.X...',
+      '.X..O',
+      '.X...',
+      '.....'], O, {(4, 1)}),
+])
+def test_blocks_an_immediate_loss(rows, player, blocks):
+    assert ai().choose_move(board(rows), player) in blocks
+
+
+def test_returns_within_its_time_limit():
+    rng = random.Random(3)
+    for rows, cols, win_length in ((5, 5, 4), (15, 15, 5)):
+        cells = [0] * (rows * cols)
+        for cell in rng.sample(range(len(cells)), 8):
+            cells[cell] = X if cell % 2 else O
+        player = AlphaBetaAI(rows, cols, win_length, time_limit=0.2, seed=1)
+        started = time.perf_counter()
+        row, col = player.choose_move(cells, X)
+        # The deadline is checked on every node, one node of slack
+        assert time.perf_counter() - started < 0.2 + 0.3
+        assert cells[row * cols + col] == 0
+        assert player.nodes > 0
+
+
+def test_zobrist_hash_depends_only_on_the_position():
+    cells = board(['X.O..',
+                   '.XO..',
+                   '..X..',
+                   '...O.',
+                   '.....'])
+    player = ai(time_limit=0.2)
+    player.load(cells)
+    expected = player.hash
+    marks = [(cell, mark) for cell, mark in enumerate(cells) if mark]
+    for seed in range(5):
+        random.Random(seed).shuffle(marks)
+        player.load([0] * len(cells))
+        for cell, mark in marks:
+            player.place(cell, mark)
+        assert player.hash == expected
+
+    # A search undoes every move it tries and leaves its entries behind
+    player.choose_move(cells, X)
+    assert player.hash == expected
+    assert player.table and len(player.table) <= player.table_size
+    assert player.board == cells